@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Benchmarks for the Jinja bytecode cache.
+
+The cache backend is a simple cache adding a fixed latency to each round
+trip, standing in for Redis.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_bccache.py
+"""
+
+import os
+import shutil
+import tempfile
+import time
+
+from cachelib import SimpleCache
+from flask import Flask, render_template
+
+from invenio_cache import BytecodeCache, InvenioCache
+
+INCLUDES = 40
+ROUND_TRIP = 0.0005
+"""Latency of a cache round trip, in seconds."""
+
+
+class SlowCache(SimpleCache):
+    """Simple cache adding a latency to each round trip."""
+
+    def get(self, key):
+        """Get a value."""
+        time.sleep(ROUND_TRIP)
+        return super().get(key)
+
+    def get_many(self, *keys):
+        """Get values in a single round trip."""
+        time.sleep(ROUND_TRIP)
+        return [super(SlowCache, self).get(key) for key in keys]
+
+
+backend = SlowCache(threshold=10000)
+"""Backend shared by all the workers."""
+
+
+def shared_backend(app, config, args, kwargs):
+    """Cache factory returning the shared backend."""
+    return backend
+
+
+def create_templates():
+    """Create a page including many templates."""
+    path = tempfile.mkdtemp()
+    for i in range(INCLUDES):
+        with open(os.path.join(path, f"include_{i}.html"), "w") as f:
+            f.write("{% for x in range(3) %}<p>" + str(i) + " {{ x }}</p>{% endfor %}")
+    with open(os.path.join(path, "page.html"), "w") as f:
+        f.write("".join(f'{{% include "include_{i}.html" %}}' for i in range(INCLUDES)))
+    return path
+
+
+def create_worker(template_folder):
+    """Create an application, as done by a fresh worker."""
+    app = Flask("bench", template_folder=template_folder)
+    app.config.update(CACHE_TYPE=f"{__name__}.shared_backend")
+    InvenioCache(app)
+    app.jinja_env.bytecode_cache = BytecodeCache(app)
+    return app
+
+
+def first_render(template_folder, warm_up):
+    """Return the time of the first render of a page in a fresh worker."""
+    app = create_worker(template_folder)
+    with app.app_context():
+        start = time.perf_counter()
+        if warm_up:
+            app.jinja_env.bytecode_cache.warm_up(app.jinja_env)
+        render_template("page.html")
+        return time.perf_counter() - start
+
+
+def bench_first_render():
+    """Compare the first render latency with and without warm-up."""
+    template_folder = create_templates()
+    try:
+        # fill the bytecode cache
+        first_render(template_folder, warm_up=False)
+
+        cold = min(first_render(template_folder, False) for _ in range(5))
+        warm = min(first_render(template_folder, True) for _ in range(5))
+    finally:
+        shutil.rmtree(template_folder)
+
+    print(f"first render ({INCLUDES} includes, {ROUND_TRIP * 1000} ms per trip)")
+    print(f"without warm-up: {cold * 1000:8.1f} ms")
+    print(f"with warm-up:    {warm * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    bench_first_render()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Benchmarks for the ``cached_unless_authenticated`` decorator.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_cached_unless_authenticated.py
+"""
+
+import time
+from functools import wraps
+
+from flask import Flask
+
+from invenio_cache import InvenioCache, cached_unless_authenticated
+from invenio_cache.proxies import current_cache, current_cache_ext
+
+REQUESTS = 5000
+
+
+def rebuilt_per_request(timeout=50, key_prefix="default"):
+    """Previous implementation, building the cached view on every request."""
+
+    def caching(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            cache_fun = current_cache.cached(
+                timeout=timeout,
+                key_prefix=key_prefix,
+                unless=lambda: current_cache_ext.is_authenticated_callback(),
+            )
+            return cache_fun(f)(*args, **kwargs)
+
+        return wrapper
+
+    return caching
+
+
+def create_app():
+    """Create an application with a view cached by each implementation."""
+    app = Flask("bench")
+    app.config.update(CACHE_TYPE="SimpleCache")
+    InvenioCache(app).is_authenticated_callback = lambda: False
+
+    @app.route("/rebuilt")
+    @rebuilt_per_request(key_prefix="rebuilt")
+    def rebuilt():
+        return "rebuilt"
+
+    @app.route("/hoisted")
+    @cached_unless_authenticated(key_prefix="hoisted")
+    def hoisted():
+        return "hoisted"
+
+    return app
+
+
+def requests_per_second(client, url, requests=REQUESTS):
+    """Return the number of requests per second served for ``url``."""
+    client.get(url)
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(url)
+    return requests / (time.perf_counter() - start)
+
+
+def bench_cached_view():
+    """Compare cached requests per second of both implementations."""
+    app = create_app()
+    with app.test_client() as client:
+        rebuilt = requests_per_second(client, "/rebuilt")
+        hoisted = requests_per_second(client, "/hoisted")
+
+    print(f"req/s, decorator rebuilt per request: {rebuilt:10.0f}")
+    print(f"req/s, decorator built once:          {hoisted:10.0f}")
+    print(f"ratio:                                {hoisted / rebuilt:10.2f}")
+
+
+if __name__ == "__main__":
+    bench_cached_view()
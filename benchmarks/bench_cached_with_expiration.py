@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Benchmarks for the ``cached_with_expiration`` decorator.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_cached_with_expiration.py
+"""
+
+import threading
+import time
+import timeit
+
+from invenio_cache.decorators import cached_with_expiration
+
+THREADS = 4
+DURATION = 1.0
+NUMBER = 100000
+
+SHAPES = {
+    "single int": lambda i: ((i,), {}),
+    "single str": lambda i: ((f"key-{i}",), {}),
+    "3 positional": lambda i: ((i, "name", 3), {}),
+    "positional + kwargs": lambda i: ((i,), {"lang": "en", "page": 1}),
+}
+"""Argument shapes, built from an integer to get distinct keys."""
+
+
+def hit_throughput(func, duration=DURATION, threads=THREADS):
+    """Return the number of hits per second on a hot key over ``threads``."""
+    func("hot")
+    stop = threading.Event()
+    counts = [0] * threads
+
+    def run(i):
+        n = 0
+        while not stop.is_set():
+            func("hot")
+            n += 1
+        counts[i] = n
+
+    workers = [threading.Thread(target=run, args=(i,)) for i in range(threads)]
+    for w in workers:
+        w.start()
+    time.sleep(duration)
+    stop.set()
+    for w in workers:
+        w.join()
+    return sum(counts) / duration
+
+
+def bench_hits_during_slow_miss():
+    """Compare hit throughput with and without a slow miss in progress."""
+
+    @cached_with_expiration
+    def func(arg):
+        if arg == "slow":
+            time.sleep(DURATION * 2)
+        return arg
+
+    idle = hit_throughput(func)
+
+    slow = threading.Thread(target=func, args=("slow",))
+    slow.start()
+    busy = hit_throughput(func)
+    slow.join()
+
+    print(f"hits/s without a miss in progress: {idle:12.0f}")
+    print(f"hits/s during a slow miss:         {busy:12.0f}")
+    print(f"ratio:                             {busy / idle:12.2f}")
+
+
+def bench_latency(number=NUMBER):
+    """Measure hit and miss latency for several argument shapes."""
+
+    @cached_with_expiration
+    def func(*args, **kwargs):
+        return args
+
+    print(f"{'shape':<22}{'hit (ns)':>12}{'miss (ns)':>12}")
+    for name, shape in SHAPES.items():
+        args, kwargs = shape(0)
+        func(*args, **kwargs)
+        hit = timeit.timeit(lambda: func(*args, **kwargs), number=number)
+
+        # every call uses new arguments, and is a miss
+        calls = iter([shape(i) for i in range(1, number + 1)])
+
+        def call_miss():
+            args, kwargs = next(calls)
+            func(*args, **kwargs)
+
+        miss = timeit.timeit(call_miss, number=number)
+        func.cache_clear()
+
+        print(f"{name:<22}{hit / number * 1e9:>12.0f}{miss / number * 1e9:>12.0f}")
+
+
+if __name__ == "__main__":
+    bench_latency()
+    print()
+    bench_hits_during_slow_miss()
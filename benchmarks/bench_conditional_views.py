@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Conditional requests benchmarks for ``cached_unless_authenticated``.
+
+A crawler revalidates a large cached page with ``If-None-Match``. Compares the
+bytes read from the cache backend, the bytes sent, and the requests per second
+of a cached view and of a cached view answering conditional requests.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_conditional_views.py
+"""
+
+import time
+
+from flask import Flask
+
+from invenio_cache import InvenioCache, cached_unless_authenticated
+
+REQUESTS = 2000
+PAGE_SIZE = 200 * 1024
+
+
+def create_app():
+    """Create an application with a large page, cached with each option."""
+    app = Flask("bench")
+    app.config.update(CACHE_TYPE="SimpleCache", CACHE_METRICS_SINK="memory")
+    InvenioCache(app).is_authenticated_callback = lambda: False
+    page = "x" * PAGE_SIZE
+
+    @app.route("/cached")
+    @cached_unless_authenticated(key_prefix="cached")
+    def cached():
+        return page
+
+    @app.route("/conditional")
+    @cached_unless_authenticated(key_prefix="conditional", conditional=True)
+    def conditional():
+        return page
+
+    return app
+
+
+def run(app, url):
+    """Return the bytes read and sent per request, and the requests per second."""
+    sink = app.extensions["invenio-cache"].metrics
+    with app.test_client() as client:
+        etag = client.get(url).headers.get("ETag", '"none"')
+        sink.reset()
+        sent = 0
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            sent += len(client.get(url, headers={"If-None-Match": etag}).data)
+        duration = time.perf_counter() - start
+    read = sum(
+        series["size_sum"]
+        for prefixes in sink.snapshot().values()
+        for series in prefixes.values()
+    )
+    return read / REQUESTS, sent / REQUESTS, REQUESTS / duration
+
+
+def bench_revalidation():
+    """Compare the revalidations of a large page."""
+    app = create_app()
+    print(f"{REQUESTS} revalidations of a {PAGE_SIZE // 1024} KiB page")
+    print(f"{'view':<14}{'read (B)':>12}{'sent (B)':>12}{'req/s':>10}")
+    for url in ("/cached", "/conditional"):
+        read, sent, rps = run(app, url)
+        print(f"{url:<14}{read:>12.0f}{sent:>12.0f}{rps:>10.0f}")
+
+
+if __name__ == "__main__":
+    bench_revalidation()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Deferred reads benchmarks.
+
+A list view renders cached fragments, reading them one by one or deferring
+the reads to batch them. The backend is a simple cache adding a round trip
+latency to each call, standing in for Redis.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_deferred_reads.py
+"""
+
+import time
+
+from cachelib import SimpleCache
+from flask import Flask
+
+from invenio_cache import InvenioCache, current_cache, current_cache_ext
+
+ROUND_TRIP = 0.0005
+"""Latency of a round trip to the Redis stand-in, in seconds."""
+
+
+class SlowCache(SimpleCache):
+    """Simple cache adding a latency to each round trip."""
+
+    def get(self, key):
+        """Get a value."""
+        time.sleep(ROUND_TRIP)
+        return super().get(key)
+
+    def get_many(self, *keys):
+        """Get values in a single round trip."""
+        time.sleep(ROUND_TRIP)
+        return [super(SlowCache, self).get(key) for key in keys]
+
+
+def slow(app, config, args, kwargs):
+    """Cache factory of the Redis stand-in."""
+    return SlowCache()
+
+
+def render_sequential(ids):
+    """Render a list reading the fragments one by one."""
+    return "".join(current_cache.get(f"fragment::{i}") for i in ids)
+
+
+def render_deferred(ids):
+    """Render a list deferring the reads of the fragments."""
+    handles = [current_cache_ext.defer(f"fragment::{i}") for i in ids]
+    return "".join(handle.get() for handle in handles)
+
+
+def bench_list_view():
+    """Compare sequential and deferred reads of fragments."""
+    app = Flask("bench")
+    app.config.update(CACHE_TYPE=f"{__name__}.slow")
+    InvenioCache(app)
+
+    print(f"{ROUND_TRIP * 1000} ms per trip")
+    print(f"{'fragments':<10}{'sequential (ms)':>18}{'deferred (ms)':>16}")
+    for count in (10, 50, 200):
+        ids = range(count)
+        with app.app_context():
+            current_cache.set_many({f"fragment::{i}": f"<li>{i}</li>" for i in ids})
+        durations = []
+        for render in (render_sequential, render_deferred):
+            with app.app_context():
+                start = time.perf_counter()
+                render(ids)
+                durations.append(time.perf_counter() - start)
+        sequential, deferred = durations
+        print(f"{count:<10}{sequential * 1000:>18.1f}{deferred * 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    bench_list_view()
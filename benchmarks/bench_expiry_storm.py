@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Expiry storm benchmarks for ``cached_unless_authenticated``.
+
+Many threads request the same anonymous pages for a while, with a short cache
+timeout, and count the recomputations of each page: without early
+recomputation, with early recomputation (XFetch), and with early
+recomputation guarded by a lock.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_expiry_storm.py
+"""
+
+import threading
+import time
+
+from flask import Flask
+
+from invenio_cache import InvenioCache, cached_unless_authenticated
+
+THREADS = 32
+DURATION = 6
+"""Duration of the benchmark, in seconds."""
+TIMEOUT = 1
+"""Cache timeout of the pages, in seconds."""
+COMPUTE = 0.05
+"""Time taken to compute a page, in seconds."""
+PAGES = 4
+
+
+def create_app(**kwargs):
+    """Create an application with cached pages."""
+    app = Flask("bench")
+    app.config.update(CACHE_TYPE="SimpleCache")
+    InvenioCache(app).is_authenticated_callback = lambda: False
+    computes = {}
+
+    @app.route("/<int:page>")
+    @cached_unless_authenticated(timeout=TIMEOUT, key_prefix="page/%s", **kwargs)
+    def page(page):
+        computes[page] = computes.get(page, 0) + 1
+        time.sleep(COMPUTE)
+        return str(page)
+
+    return app, computes
+
+
+def run(**kwargs):
+    """Return the recomputations per page and expiration, and the slowest request."""
+    app, computes = create_app(**kwargs)
+    slowest = [0]
+    deadline = time.monotonic() + DURATION
+
+    def worker(i):
+        with app.test_client() as client:
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                client.get(f"/{i % PAGES}")
+                slowest[0] = max(slowest[0], time.perf_counter() - start)
+                time.sleep(0.005)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(THREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    expirations = DURATION / TIMEOUT
+    return sum(computes.values()) / PAGES / expirations, slowest[0]
+
+
+def bench_expiry_storm():
+    """Compare the recomputations of expired pages."""
+    print(f"{THREADS} threads, {PAGES} pages cached {TIMEOUT} s, {DURATION} s")
+    print(f"{'mode':<16}{'computes/expiry':>16}{'slowest (ms)':>14}")
+    for name, kwargs in (
+        ("expiration", {}),
+        ("xfetch", {"beta": 1.0}),
+        ("xfetch + lock", {"beta": 1.0, "lock": True}),
+    ):
+        computes, slowest = run(**kwargs)
+        print(f"{name:<16}{computes:>16.2f}{slowest * 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    bench_expiry_storm()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Lock contention benchmarks.
+
+Many threads acquire the same lock, hold it for a short time and release it.
+The backends are a simple cache, and a simple cache adding a round trip
+latency to each call, standing in for Redis.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_locks.py
+"""
+
+import threading
+import time
+
+from cachelib import SimpleCache
+from flask import Flask
+
+from invenio_cache import InvenioCache
+from invenio_cache.errors import LockAcquireFailed
+from invenio_cache.lock import CachedMutex
+
+THREADS = 16
+ACQUIRES = 20
+"""Number of acquisitions per thread."""
+HOLD = 0.002
+"""Time the lock is held, in seconds."""
+ROUND_TRIP = 0.0002
+"""Latency of a round trip to the Redis stand-in, in seconds."""
+
+
+class CountingCache(SimpleCache):
+    """Simple cache counting the calls to ``add``."""
+
+    latency = 0
+
+    def __init__(self, *args, **kwargs):
+        """Initialize the cache."""
+        super().__init__(*args, **kwargs)
+        self.adds = 0
+        self._adds_lock = threading.Lock()
+
+    def add(self, key, value, timeout=None):
+        """Add a value."""
+        with self._adds_lock:
+            self.adds += 1
+        time.sleep(self.latency)
+        return super().add(key, value, timeout=timeout)
+
+    def delete(self, key):
+        """Delete a value."""
+        time.sleep(self.latency)
+        return super().delete(key)
+
+
+class SlowCache(CountingCache):
+    """Counting cache with a round trip latency."""
+
+    latency = ROUND_TRIP
+
+
+def simple(app, config, args, kwargs):
+    """Cache factory of the simple cache."""
+    return CountingCache()
+
+
+def slow(app, config, args, kwargs):
+    """Cache factory of the Redis stand-in."""
+    return SlowCache()
+
+
+def acquire_with_loop(lock):
+    """Acquire a lock with a fixed-interval retry loop, as done by callers."""
+    while True:
+        try:
+            return lock.acquire(timeout=10)
+        except LockAcquireFailed:
+            time.sleep(0.001)
+
+
+def acquire_blocking(lock):
+    """Acquire a lock with a blocking call and jittered backoff."""
+    return lock.acquire(timeout=10, blocking=True)
+
+
+def run(factory, acquire):
+    """Return the number of ``add`` calls per acquisition and the duration."""
+    app = Flask("bench")
+    app.config.update(CACHE_TYPE=f"{__name__}.{factory}")
+    InvenioCache(app)
+
+    def worker():
+        with app.app_context():
+            for _ in range(ACQUIRES):
+                lock = CachedMutex("bench-lock")
+                acquire(lock)
+                time.sleep(HOLD)
+                lock.release()
+
+    threads = [threading.Thread(target=worker) for _ in range(THREADS)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    duration = time.perf_counter() - start
+
+    backend = app.extensions["cache"][app.extensions["invenio-cache"].cache]
+    return backend.adds / (THREADS * ACQUIRES), duration
+
+
+def bench_contention():
+    """Compare retry loops and blocking acquisitions under contention."""
+    print(f"{THREADS} threads x {ACQUIRES} acquisitions, lock held {HOLD * 1000} ms")
+    print(f"{'backend':<10}{'strategy':<10}{'adds/acquire':>14}{'duration (s)':>14}")
+    for factory in ("simple", "slow"):
+        for name, acquire in (
+            ("loop", acquire_with_loop),
+            ("backoff", acquire_blocking),
+        ):
+            adds, duration = run(factory, acquire)
+            print(f"{factory:<10}{name:<10}{adds:>14.1f}{duration:>14.2f}")
+
+
+if __name__ == "__main__":
+    bench_contention()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Instrumentation overhead benchmarks.
+
+Reads and writes a small value through ``current_cache`` on a simple cache,
+without metrics and with each of the sinks. The simple cache is the fastest
+backend, so the overhead is the largest relative one; a round trip to Redis
+takes tens of microseconds.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_metrics.py
+"""
+
+import timeit
+
+from flask import Flask
+
+from invenio_cache import InvenioCache, current_cache
+
+NUMBER = 20000
+
+
+def make_app(sink):
+    """Make an application with a simple cache and a metrics sink."""
+    app = Flask("bench")
+    app.config.update(CACHE_TYPE="SimpleCache", CACHE_METRICS_SINK=sink)
+    InvenioCache(app)
+    return app
+
+
+def bench_overhead():
+    """Compare the duration of the operations with and without metrics."""
+    print(f"{'sink':<12}{'get (us)':>10}{'set (us)':>10}")
+    for sink in (None, "memory", "prometheus", "statsd"):
+        with make_app(sink).app_context():
+            current_cache.set("view//records", {"hits": [1, 2, 3]})
+            get = timeit.timeit(
+                lambda: current_cache.get("view//records"), number=NUMBER
+            )
+            set_ = timeit.timeit(
+                lambda: current_cache.set("view//records", {"hits": [1, 2, 3]}),
+                number=NUMBER,
+            )
+        print(f"{str(sink):<12}{get / NUMBER * 1e6:>10.2f}{set_ / NUMBER * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    bench_overhead()
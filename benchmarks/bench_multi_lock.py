@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Bulk lock acquisition benchmarks.
+
+A batch job locks many record ids, either with one ``CachedMutex`` per id or
+with a single ``MultiLock``. The backend is a simple cache adding a round
+trip latency to each call, standing in for Redis.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_multi_lock.py
+"""
+
+import time
+
+from cachelib import SimpleCache
+from flask import Flask
+
+from invenio_cache import InvenioCache
+from invenio_cache.lock import CachedMutex, MultiLock
+
+IDS = 1000
+ROUND_TRIP = 0.0002
+"""Latency of a round trip to the Redis stand-in, in seconds."""
+
+
+class SlowCache(SimpleCache):
+    """Simple cache counting the round trips, and adding a latency to each."""
+
+    trips = 0
+
+    def _trip(self):
+        """Make a round trip."""
+        self.trips += 1
+        time.sleep(ROUND_TRIP)
+
+    def add(self, key, value, timeout=None):
+        """Add a value."""
+        self._trip()
+        return super().add(key, value, timeout=timeout)
+
+    def get(self, key):
+        """Get a value."""
+        self._trip()
+        return super().get(key)
+
+    def delete(self, key):
+        """Delete a value."""
+        self._trip()
+        return super().delete(key)
+
+    def get_many(self, *keys):
+        """Get values in a single round trip."""
+        self._trip()
+        return [super(SlowCache, self).get(key) for key in keys]
+
+    def set_many(self, mapping, timeout=None):
+        """Set values in a single round trip."""
+        self._trip()
+        return [
+            key
+            for key, value in mapping.items()
+            if super(SlowCache, self).set(key, value, timeout=timeout)
+        ]
+
+    def delete_many(self, *keys):
+        """Delete values in a single round trip."""
+        self._trip()
+        return [key for key in keys if super(SlowCache, self).delete(key)]
+
+
+def slow(app, config, args, kwargs):
+    """Cache factory of the Redis stand-in."""
+    return SlowCache(threshold=10 * IDS)
+
+
+def lock_with_loop(lock_ids):
+    """Acquire and release the locks one by one."""
+    locks = [CachedMutex(lock_id) for lock_id in lock_ids]
+    for lock in locks:
+        lock.acquire(timeout=60)
+    for lock in locks:
+        lock.release()
+
+
+def lock_in_bulk(lock_ids):
+    """Acquire and release the locks with a single lock."""
+    lock = MultiLock(lock_ids)
+    lock.acquire(timeout=60)
+    lock.release()
+
+
+def bench_bulk_locking():
+    """Compare per-lock loops and bulk acquisitions."""
+    app = Flask("bench")
+    app.config.update(CACHE_TYPE=f"{__name__}.slow")
+    InvenioCache(app)
+    backend = app.extensions["cache"][app.extensions["invenio-cache"].cache]
+    lock_ids = [f"record-{i}" for i in range(IDS)]
+
+    print(f"{IDS} locks, {ROUND_TRIP * 1000} ms per trip")
+    print(f"{'strategy':<10}{'trips':>8}{'duration (ms)':>16}")
+    with app.app_context():
+        for name, run in (("loop", lock_with_loop), ("bulk", lock_in_bulk)):
+            backend.trips = 0
+            start = time.perf_counter()
+            run(lock_ids)
+            duration = time.perf_counter() - start
+            print(f"{name:<10}{backend.trips:>8}{duration * 1000:>16.1f}")
+
+
+if __name__ == "__main__":
+    bench_bulk_locking()
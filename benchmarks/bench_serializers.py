@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Serializers benchmarks.
+
+Serializes records shaped as Invenio RDM records, and search results made of
+such records, with the default Redis serializer and the tagged serializers.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_serializers.py
+"""
+
+import timeit
+
+from cachelib.serializers import RedisSerializer
+
+from invenio_cache.serializers import TaggedSerializer, codecs
+
+NUMBER = 200
+
+
+def make_record(i):
+    """Make a record, as returned by the records REST API."""
+    return {
+        "id": f"{i:05d}-abcd",
+        "created": "2025-01-01T10:00:00.000000+00:00",
+        "updated": "2025-01-02T10:00:00.000000+00:00",
+        "links": {
+            name: f"https://example.org/api/records/{i:05d}-abcd/{name}"
+            for name in ("self", "files", "versions", "access", "parent")
+        },
+        "metadata": {
+            "resource_type": {"id": "publication-article", "title": {"en": "Article"}},
+            "title": f"Record number {i} about something quite interesting",
+            "description": "<p>" + "A long description of the record. " * 20 + "</p>",
+            "publication_date": "2025-01-01",
+            "creators": [
+                {
+                    "person_or_org": {
+                        "type": "personal",
+                        "name": f"Doe, Jane {j}",
+                        "given_name": f"Jane {j}",
+                        "family_name": "Doe",
+                        "identifiers": [
+                            {"scheme": "orcid", "identifier": "0000-0002-1825-0097"}
+                        ],
+                    },
+                    "affiliations": [{"id": "01ggx4157", "name": "CERN"}],
+                }
+                for j in range(10)
+            ],
+            "subjects": [{"subject": f"subject {j}"} for j in range(5)],
+            "rights": [{"id": "cc-by-4.0", "title": {"en": "CC BY 4.0"}}],
+        },
+        "files": {
+            "enabled": True,
+            "count": 2,
+            "total_bytes": 123456,
+            "entries": {
+                f"file{j}.pdf": {
+                    "key": f"file{j}.pdf",
+                    "size": 61728,
+                    "checksum": "md5:2942bfabb3d05332b66eb128e0842cff",
+                    "mimetype": "application/pdf",
+                }
+                for j in range(2)
+            },
+        },
+        "stats": {"this_version": {"views": 10 * i, "downloads": i}},
+        "versions": {"index": 1, "is_latest": True},
+        "revision_id": 3,
+    }
+
+
+PAYLOADS = {
+    "record": make_record(1),
+    "search (25 hits)": {
+        "hits": {"total": 1000, "hits": [make_record(i) for i in range(25)]},
+        "aggregations": {"type": {"buckets": [{"key": "article", "doc_count": 1000}]}},
+    },
+}
+
+
+def get_serializers():
+    """Get the serializers to compare, skipping the missing packages."""
+    serializers = {"redis (default)": RedisSerializer()}
+    for name in ("pickle", "json", "msgpack"):
+        try:
+            serializers[name] = TaggedSerializer(name)
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+    return serializers
+
+
+def bench_serializers():
+    """Compare the time to serialize and deserialize payloads."""
+    serializers = get_serializers()
+    json_codec = codecs["json"]()
+    print(f"json codec: {json_codec.dumps.__module__}")
+    for payload_name, payload in PAYLOADS.items():
+        print(f"\n{payload_name}")
+        print(f"{'serializer':<18}{'bytes':>10}{'dumps (us)':>12}{'loads (us)':>12}")
+        for name, serializer in serializers.items():
+            data = serializer.dumps(payload)
+            assert serializer.loads(data) == payload
+            dumps = timeit.timeit(lambda: serializer.dumps(payload), number=NUMBER)
+            loads = timeit.timeit(lambda: serializer.loads(data), number=NUMBER)
+            print(
+                f"{name:<18}{len(data):>10}"
+                f"{dumps / NUMBER * 1e6:>12.1f}{loads / NUMBER * 1e6:>12.1f}"
+            )
+
+
+if __name__ == "__main__":
+    bench_serializers()
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Vary-aware cache key benchmarks.
+
+Makes the cache key of a search page varying with its query arguments, the
+``Accept`` header and the locale, for requests with the same values: memoized
+by raw request values, and canonicalized and hashed on every request.
+
+Run with:
+
+.. code-block:: console
+
+    $ python benchmarks/bench_vary_keys.py
+"""
+
+import timeit
+
+from flask import Flask, request
+
+from invenio_cache import InvenioCache
+from invenio_cache.decorators import VaryKey
+
+NUMBER = 100000
+VARY = ["query:q", "query:page", "query:size", "header:Accept", "locale"]
+
+
+def bench_vary_keys():
+    """Compare the time to make a key with and without memoization."""
+    app = Flask("bench")
+    app.config.update(CACHE_TYPE="SimpleCache")
+    InvenioCache(app)
+    key = VaryKey("search/%s", VARY)
+    with app.test_request_context(
+        "/records?q=title:physics&page=2&size=20",
+        headers={"Accept": "text/html, application/xhtml+xml"},
+    ):
+        memoized = timeit.timeit(key, number=NUMBER)
+        canonical = timeit.timeit(
+            lambda: key._make_key(
+                tuple(getter(request) for getter in key._getters) + (request.path,)
+            ),
+            number=NUMBER,
+        )
+    print(f"{'key':<12}{'us/key':>8}")
+    print(f"{'memoized':<12}{memoized / NUMBER * 1e6:>8.2f}")
+    print(f"{'canonical':<12}{canonical / NUMBER * 1e6:>8.2f}")
+
+
+if __name__ == "__main__":
+    bench_vary_keys()
@@ -0,0 +1,605 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Asyncio API of the cache.
+
+The asyncio cache of an application is available, in an application context,
+through the ``current_async_cache`` proxy:
+
+.. code-block:: python
+
+    from invenio_cache.proxies import current_async_cache
+
+    async def get_record(recid):
+        record = await current_async_cache.get(recid)
+        if record is None:
+            record = await fetch_record(recid)
+            await current_async_cache.set(recid, record, timeout=60)
+        return record
+
+By default, it uses an asyncio Redis client when the cache backend is Redis
+(it requires ``redis>=4.2``), and runs the calls to other backends in threads.
+Values are shared with ``current_cache`` in both cases. Another cache can be
+configured with ``CACHE_ASYNC_TYPE``, e.g. the in-memory cache in tests:
+
+.. code-block:: python
+
+    CACHE_ASYNC_TYPE = "invenio_cache.aio.InMemoryAsyncCache"
+
+Locks are acquired with :class:`AsyncCachedMutex`, which is compatible with
+:class:`invenio_cache.lock.CachedMutex`:
+
+.. code-block:: python
+
+    async with AsyncCachedMutex(lock_id) as lock:
+        await lock.acquire(timeout=60)
+        ...
+
+Coroutine functions decorated with
+:func:`invenio_cache.decorators.cached_with_expiration` coalesce the concurrent
+awaits of the same key.
+"""
+
+import asyncio
+import time
+import uuid
+from functools import partial
+
+from cachelib.serializers import RedisSerializer
+from flask import current_app
+from werkzeug.utils import import_string
+
+from ._compat import string_types
+from .errors import LockAcquireFailed, LockReleaseFailed, LockRenewPermissionDenied
+from .lock import _RELEASE_SCRIPT, _RENEW_SCRIPT, Backoff, Lock, _fallback_lock
+from .proxies import current_async_cache
+
+
+class AsyncCache(object):
+    """Base class of the asyncio caches.
+
+    Timeouts are in seconds, ``None`` meaning the default timeout and ``0`` no
+    expiration, as for the cache backends.
+    """
+
+    async def get(self, key):
+        """Get a value, ``None`` if missing."""
+        raise NotImplementedError
+
+    async def get_many(self, *keys):
+        """Get values, in the order of the keys."""
+        raise NotImplementedError
+
+    async def set(self, key, value, timeout=None):
+        """Set a value."""
+        raise NotImplementedError
+
+    async def add(self, key, value, timeout=None):
+        """Set a value if the key does not exist, atomically."""
+        raise NotImplementedError
+
+    async def delete(self, key):
+        """Delete a value."""
+        raise NotImplementedError
+
+    async def compare_and_delete(self, key, value):
+        """Delete a value if it is equal to ``value``, atomically."""
+        raise NotImplementedError
+
+    async def compare_and_expire(self, key, value, timeout):
+        """Set the timeout of a value if it is equal to ``value``, atomically."""
+        raise NotImplementedError
+
+    async def close(self):
+        """Close the connections to the backend."""
+
+
+class InMemoryAsyncCache(AsyncCache):
+    """Cache in the memory of the process, meant for tests.
+
+    As the operations do not await anything, they are atomic within an event loop.
+    """
+
+    def __init__(self, app=None, default_timeout=300):
+        """Initialize the cache.
+
+        :param default_timeout: Default timeout of the values.
+        """
+        self.default_timeout = default_timeout
+        # entries are (value, expiration time or None)
+        self._entries = {}
+
+    def _expires(self, timeout):
+        """Expiration time of a value set with ``timeout``."""
+        if timeout is None:
+            timeout = self.default_timeout
+        return time.monotonic() + timeout if timeout else None
+
+    def _get(self, key):
+        """Get a value, deleting it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[0]
+
+    async def get(self, key):
+        """Get a value, ``None`` if missing."""
+        return self._get(key)
+
+    async def get_many(self, *keys):
+        """Get values, in the order of the keys."""
+        return [self._get(key) for key in keys]
+
+    async def set(self, key, value, timeout=None):
+        """Set a value."""
+        self._entries[key] = (value, self._expires(timeout))
+        return True
+
+    async def add(self, key, value, timeout=None):
+        """Set a value if the key does not exist."""
+        if self._get(key) is not None:
+            return False
+        self._entries[key] = (value, self._expires(timeout))
+        return True
+
+    async def delete(self, key):
+        """Delete a value."""
+        return self._entries.pop(key, None) is not None
+
+    async def compare_and_delete(self, key, value):
+        """Delete a value if it is equal to ``value``."""
+        if self._get(key) != value:
+            return False
+        del self._entries[key]
+        return True
+
+    async def compare_and_expire(self, key, value, timeout):
+        """Set the timeout of a value if it is equal to ``value``."""
+        if self._get(key) != value:
+            return False
+        self._entries[key] = (value, self._expires(timeout))
+        return True
+
+
+class RedisAsyncCache(AsyncCache):
+    """Cache using an asyncio Redis client.
+
+    Keys and values are stored the same way as by the Redis backend of the
+    synchronous cache.
+
+    The connections of a ``redis.asyncio`` client belong to the event loop
+    which opened them, so a client is created per event loop (e.g. per
+    ``asyncio.run`` call), with the connection pool configuration of the cache
+    (see :mod:`invenio_cache.clients`).
+    """
+
+    def __init__(
+        self,
+        app=None,
+        client=None,
+        key_prefix=None,
+        default_timeout=None,
+        serializer=None,
+    ):
+        """Initialize the cache.
+
+        :param app: The application, configuring the Redis clients from
+            ``CACHE_REDIS_URL``, the key prefix and the default timeout.
+        :param client: A ``redis.asyncio`` client used in all the event loops,
+            instead of creating one per event loop.
+        :param key_prefix: The key prefix, instead of the configured one.
+        :param default_timeout: The default timeout, instead of the configured one.
+        :param serializer: The serializer of the values, the one of the Redis
+            backend by default.
+        """
+        self._client = client
+        self._redis_clients = None
+        if client is None:
+            self._redis_clients = app.extensions["invenio-cache"].redis_clients
+        # clients by event loop
+        self._clients = {}
+        if key_prefix is None:
+            key_prefix = app.config["CACHE_KEY_PREFIX"] if app else ""
+        self.key_prefix = key_prefix
+        if default_timeout is None:
+            default_timeout = (
+                app.config.get("CACHE_DEFAULT_TIMEOUT", 300) if app else 300
+            )
+        self.default_timeout = default_timeout
+        self.serializer = serializer or RedisSerializer()
+
+    @property
+    def client(self):
+        """The client of the running event loop."""
+        if self._client is not None:
+            return self._client
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            # drop the clients of the event loops which are done
+            for other in [other for other in self._clients if other.is_closed()]:
+                del self._clients[other]
+            client = self._clients[loop] = self._redis_clients.create_async()
+        return client
+
+    def _timeout(self, timeout):
+        """Expiration in seconds of a value set with ``timeout``, ``None`` for none."""
+        if timeout is None:
+            timeout = self.default_timeout
+        return timeout or None
+
+    async def get(self, key):
+        """Get a value, ``None`` if missing."""
+        return self.serializer.loads(await self.client.get(self.key_prefix + key))
+
+    async def get_many(self, *keys):
+        """Get values in a single round trip."""
+        if not keys:
+            return []
+        values = await self.client.mget([self.key_prefix + key for key in keys])
+        return [self.serializer.loads(value) for value in values]
+
+    async def set(self, key, value, timeout=None):
+        """Set a value."""
+        return bool(
+            await self.client.set(
+                self.key_prefix + key,
+                self.serializer.dumps(value),
+                ex=self._timeout(timeout),
+            )
+        )
+
+    async def add(self, key, value, timeout=None):
+        """Set a value if the key does not exist."""
+        return bool(
+            await self.client.set(
+                self.key_prefix + key,
+                self.serializer.dumps(value),
+                ex=self._timeout(timeout),
+                nx=True,
+            )
+        )
+
+    async def delete(self, key):
+        """Delete a value."""
+        return bool(await self.client.delete(self.key_prefix + key))
+
+    async def compare_and_delete(self, key, value):
+        """Delete a value if it is equal to ``value``, with a script."""
+        return bool(
+            await self.client.eval(
+                _RELEASE_SCRIPT,
+                1,
+                self.key_prefix + key,
+                self.serializer.dumps(value),
+            )
+        )
+
+    async def compare_and_expire(self, key, value, timeout):
+        """Set the timeout of a value if it is equal to ``value``, with a script."""
+        return bool(
+            await self.client.eval(
+                _RENEW_SCRIPT,
+                1,
+                self.key_prefix + key,
+                self.serializer.dumps(value),
+                self._timeout(timeout) or 0,
+            )
+        )
+
+    async def close(self):
+        """Close the connections to Redis of the running event loop."""
+        client = self.client
+        self._clients.pop(asyncio.get_running_loop(), None)
+        # ``close`` is deprecated since redis 5
+        close = getattr(client, "aclose", None) or client.close
+        await close()
+
+
+class ThreadedAsyncCache(AsyncCache):
+    """Cache running the calls to a synchronous cache backend in threads.
+
+    The compare operations are only atomic within a process, as for
+    :class:`invenio_cache.lock.CachedMutex`.
+    """
+
+    def __init__(self, app=None, backend=None, executor=None):
+        """Initialize the cache.
+
+        :param app: The application, whose cache backend is used.
+        :param backend: A cache backend, instead of the application's one.
+        :param executor: ``concurrent.futures.Executor`` running the calls.
+            Default is the event loop's default executor.
+        """
+        if backend is None:
+            backend = app.extensions["cache"][app.extensions["invenio-cache"].cache]
+        self.backend = backend
+        self.executor = executor
+
+    def _run(self, func, *args, **kwargs):
+        """Run a synchronous function in a thread."""
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    async def get(self, key):
+        """Get a value, ``None`` if missing."""
+        return await self._run(self.backend.get, key)
+
+    async def get_many(self, *keys):
+        """Get values, in the order of the keys."""
+        return await self._run(self.backend.get_many, *keys)
+
+    async def set(self, key, value, timeout=None):
+        """Set a value."""
+        return await self._run(self.backend.set, key, value, timeout=timeout)
+
+    async def add(self, key, value, timeout=None):
+        """Set a value if the key does not exist."""
+        return await self._run(self.backend.add, key, value, timeout=timeout)
+
+    async def delete(self, key):
+        """Delete a value."""
+        return await self._run(self.backend.delete, key)
+
+    def _compare_and_delete(self, key, value):
+        """Delete a value if it is equal to ``value``, in a thread."""
+        with _fallback_lock:
+            if self.backend.get(key) != value:
+                return False
+            return self.backend.delete(key)
+
+    def _compare_and_expire(self, key, value, timeout):
+        """Set the timeout of a value if it is equal to ``value``, in a thread."""
+        with _fallback_lock:
+            if self.backend.get(key) != value:
+                return False
+            return self.backend.set(key, value, timeout=timeout)
+
+    async def compare_and_delete(self, key, value):
+        """Delete a value if it is equal to ``value``."""
+        return await self._run(self._compare_and_delete, key, value)
+
+    async def compare_and_expire(self, key, value, timeout):
+        """Set the timeout of a value if it is equal to ``value``."""
+        return await self._run(self._compare_and_expire, key, value, timeout)
+
+
+def create_async_cache(app):
+    """Create the asyncio cache of an application.
+
+    The cache is created by ``CACHE_ASYNC_TYPE`` if set, or else is a
+    :class:`RedisAsyncCache` for a Redis backend when ``redis.asyncio`` is
+    available, and a :class:`ThreadedAsyncCache` otherwise.
+    """
+    factory = app.config["CACHE_ASYNC_TYPE"]
+    if factory is not None:
+        if isinstance(factory, string_types):
+            factory = import_string(factory)
+        return factory(app)
+
+    backend = app.extensions["cache"][app.extensions["invenio-cache"].cache]
+    if getattr(backend, "_write_client", None) is not None:
+        try:
+            import redis.asyncio  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            return RedisAsyncCache(
+                app,
+                key_prefix=backend._get_prefix(),
+                default_timeout=backend.default_timeout,
+                serializer=backend.serializer,
+            )
+    return ThreadedAsyncCache(backend=backend)
+
+
+class AsyncCachedMutex(Lock):
+    """Implements a Mutex using the asyncio cache.
+
+    It is the asyncio version of :class:`invenio_cache.lock.CachedMutex`, and can
+    lock the same ids. With a ``lease``, ``async with`` starts a task renewing the
+    lock while it is held.
+    """
+
+    _cache = current_async_cache
+
+    default_backoff = Backoff()
+    """Backoff used by blocking ``acquire`` calls."""
+
+    attempts = 0
+    """Number of attempts made by the last ``acquire`` call."""
+
+    wait_time = 0
+    """Time in seconds spent by the last ``acquire`` call."""
+
+    lost = False
+    """Whether the lease expired and the lock was acquired by someone else."""
+
+    def __init__(self, lock_id, token=None, lease=None):
+        """Initialises the lock instance.
+
+        :param lock_id: id of the lock.
+        :type lock_id: str
+        :param token: owner token, see :class:`invenio_cache.lock.CachedMutex`.
+        :type token: str
+        :param lease: timeout, in seconds, the lock is renewed with by the heartbeat.
+            ``None`` disables the heartbeat.
+        :type lease: int
+        """
+        super().__init__(lock_id)
+        self.token = token or uuid.uuid4().hex
+        self.lease = lease
+        # Interval, in seconds, between renewals of the lease
+        self.heartbeat_interval = lease / 3 if lease else None
+        self._held = False
+        self._held_lock = None
+        self._heartbeat = None
+
+    async def acquire(self, timeout, blocking=False, wait_timeout=None, backoff=None):
+        """Attempts to acquire the lock, see :meth:`CachedMutex.acquire`.
+
+        :raises: Exception, LockAcquireFailed
+        """
+        if self._heartbeat is not None:
+            # Renewed by the heartbeat while held
+            timeout = min(timeout, self.lease) if timeout else self.lease
+        backoff = backoff or self.default_backoff
+        start = time.monotonic()
+        self.attempts = 0
+        while True:
+            self.attempts += 1
+            success = await self._try_acquire(timeout)
+            if success or not blocking:
+                break
+
+            delay = backoff.delay(self.attempts)
+            if wait_timeout is not None:
+                remaining = wait_timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+            await asyncio.sleep(delay)
+        self.wait_time = time.monotonic() - start
+
+        if not success:
+            raise LockAcquireFailed(self)
+
+        self._held = True
+        return success
+
+    async def _try_acquire(self, timeout):
+        """Makes a single attempt to acquire the lock."""
+        try:
+            # Atomic operation to get the lock
+            return await self._cache.add(self.lock_id, self.token, timeout=timeout)
+        except:
+            # Unexpected error with the cache, we just log it and re-raise
+            current_app.logger.error(
+                f"Unexpected backend failure when acquiring lock {self.lock_id}."
+            )
+            raise
+
+    async def release(self):
+        """Attempts to release the lock, see :meth:`CachedMutex.release`.
+
+        :raises: Exception, LockReleaseFailed
+        """
+        if self._held_lock is not None:
+            # Not released concurrently with a renewal, which would recreate it
+            async with self._held_lock:
+                return await self._release()
+        return await self._release()
+
+    async def _release(self):
+        """Releases the lock."""
+        success = False
+        self._held = False
+        try:
+            success = await self._cache.compare_and_delete(self.lock_id, self.token)
+        except:
+            # Unexpected error with the cache, we just log it and re-raise
+            current_app.logger.error(
+                f"Unexpected backend failure when releasing lock {self.lock_id}."
+            )
+            raise
+
+        if not success:
+            raise LockReleaseFailed(self)
+
+        return success
+
+    async def exists(self):
+        """Checks if the lock exists.
+
+        :raises: Exception
+        """
+        try:
+            return await self._cache.get(self.lock_id) is not None
+        except:
+            # Unexpected error with the cache, we just log it and re-raise
+            current_app.logger.error(
+                f"Unexpected backend failure when checking lock {self.lock_id}."
+            )
+            raise
+
+    async def acquire_or_renew(self, timeout):
+        """Attempts to acquire the lock, or renews it if owned.
+
+        See :meth:`CachedMutex.acquire_or_renew`.
+
+        :raises: Exception, LockAcquireFailed, LockRenewPermissionDenied
+        """
+        try:
+            return await self.acquire(timeout=timeout)
+        except LockAcquireFailed:
+            # Renew the lock if it already existed before, and is owned by this instance
+            try:
+                success = await self._cache.compare_and_expire(
+                    self.lock_id, self.token, timeout
+                )
+            except:
+                # Unexpected error with the cache, we just log it and re-raise
+                current_app.logger.error(
+                    f"Unexpected backend failure when renewing lock {self.lock_id}."
+                )
+                raise
+            if not success:
+                raise LockRenewPermissionDenied(self)
+            return success
+
+    async def _renew_lease(self):
+        """Renews the lease every ``heartbeat_interval`` seconds while held."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            async with self._held_lock:
+                if not self._held:
+                    continue
+                try:
+                    await self.acquire_or_renew(self.lease)
+                except LockRenewPermissionDenied:
+                    # The lease expired and the lock was acquired by someone else
+                    self._held = False
+                    self.lost = True
+                    current_app.logger.warning(
+                        f"Lost the lease of lock {self.lock_id}."
+                    )
+                    return
+                except Exception:
+                    # Already logged, retried at the next beat
+                    pass
+
+    async def __aenter__(self):
+        """Entering the context, starts the heartbeat when a lease is given."""
+        if self.lease:
+            self._held_lock = asyncio.Lock()
+            self._heartbeat = asyncio.ensure_future(self._renew_lease())
+        return self
+
+    async def __aexit__(self, exc_type, *args):
+        """Stops the heartbeat and releases the lock."""
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            try:
+                await self._heartbeat
+            except asyncio.CancelledError:
+                pass
+            self._heartbeat = None
+        # Release the lock only when acquired the lock
+        if exc_type is not LockAcquireFailed:
+            await self.release()
+
+    def __enter__(self):
+        """Synchronous contexts are not supported."""
+        raise TypeError("Use 'async with' with an AsyncCachedMutex.")
+
+    def __repr__(self):
+        """Lock string representation."""
+        return f"<AsyncCachedMutex {self.lock_id}>"
@@ -0,0 +1,550 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Cache backends.
+
+Two-tier cache
+--------------
+The two-tier cache keeps the most recently read values in a small, bounded
+in-process cache (L1) in front of the configured cache backend (L2). Reads
+are served from L1 when possible and otherwise read through to L2, writes are
+written through to both tiers.
+
+Enable it by setting the cache type and the type of the L2 backend:
+
+.. code-block:: python
+
+    CACHE_TYPE = "invenio_cache.backends.TwoTierCache"
+    CACHE_L2_TYPE = "redis"
+
+Values are kept in L1 for at most ``CACHE_L1_DEFAULT_TIMEOUT`` seconds, so
+writes made by other processes are seen after that delay at the latest.
+Values read from L1 are shared between callers, and must not be mutated.
+
+With an invalidation transport (see :mod:`invenio_cache.invalidation`), the
+writes are published to the other processes which drop their L1 copies.
+Expirations in L2 are not published: a value read through from L2 is kept in
+L1 until it expires in L2, when L2 tells its remaining time to live (Redis and
+the simple cache do), and at most ``CACHE_L1_DEFAULT_TIMEOUT`` seconds. A
+longer ``CACHE_L1_DEFAULT_TIMEOUT`` can then be used, as long as the L2
+backend tells the time to live of its values.
+
+Request memoization
+-------------------
+A single request often reads the same keys many times. With
+``CACHE_REQUEST_MEMOIZATION = True``, the values read through ``current_cache``
+during a request are kept for the duration of the request, and read again from
+there instead of from the cache backend:
+
+.. code-block:: python
+
+    CACHE_REQUEST_MEMOIZATION = True
+    CACHE_REQUEST_MEMOIZATION_MAX_SIZE = 1000
+
+Writes made through ``current_cache`` in the same request are seen, while
+writes made by other requests are only seen in the next requests. Missing keys
+are not memoized, and at most ``CACHE_REQUEST_MEMOIZATION_MAX_SIZE`` values are
+kept, the oldest ones being dropped first. Outside of a request (e.g. in a
+Celery task or a CLI command), the reads are passed to the backend. The values
+are shared between the callers, and must not be mutated. The number of round
+trips saved is logged at the ``DEBUG`` level when the request is torn down.
+
+Code waiting for values written by other requests (e.g. locks) reads through
+:func:`unmemoized` instead.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, g, has_request_context
+from flask_caching.backends.base import BaseCache
+from werkzeug.utils import import_string
+
+_STRIPES = 1024
+"""Number of write counters of the keys of a :class:`LocalCache`."""
+
+
+class LocalCache(object):
+    """Bounded, thread-safe, in-process cache with expiration.
+
+    When the cache is full, the least recently used entries are evicted.
+    """
+
+    def __init__(self, threshold=1000, default_timeout=5):
+        """Initialize the cache.
+
+        :param threshold: Maximum number of entries.
+        :param default_timeout: Maximum time in seconds an entry is kept.
+        """
+        self.threshold = threshold
+        self.default_timeout = default_timeout
+        # entries are (value, expiration time), in LRU order
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # write counters of the keys (hashed in a fixed number of stripes),
+        # and of the whole cache
+        self._generations = [0] * _STRIPES
+        self._epoch = 0
+
+    def get(self, key):
+        """Get a value, ``None`` if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def generation(self, key):
+        """Get the generation of a key, changed by every write of the key."""
+        with self._lock:
+            return self._epoch, self._generations[hash(key) % _STRIPES]
+
+    def set(self, key, value, timeout=None, generation=None):
+        """Set a value, kept at most ``default_timeout`` seconds.
+
+        :param timeout: Timeout of the value in the backend, a shorter timeout
+            than ``default_timeout`` is honoured. ``None`` and ``0`` (no
+            expiration) mean ``default_timeout``.
+        :param generation: The :meth:`generation` of the key when the value
+            was read elsewhere. The value is not set if the key was written
+            since.
+        """
+        if value is None:
+            # ``None`` can't be told apart from a missing value
+            self.delete(key)
+            return
+        ttl = self.default_timeout
+        if timeout:
+            ttl = min(ttl, timeout)
+        with self._lock:
+            stripe = hash(key) % _STRIPES
+            if generation is not None:
+                if generation != (self._epoch, self._generations[stripe]):
+                    return
+            else:
+                self._generations[stripe] += 1
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.threshold:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        """Delete a value."""
+        with self._lock:
+            self._generations[hash(key) % _STRIPES] += 1
+            self._entries.pop(key, None)
+
+    def delete_prefix(self, prefix):
+        """Delete all the values with keys starting with ``prefix``."""
+        with self._lock:
+            self._epoch += 1
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+
+    def clear(self):
+        """Delete all the values."""
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+
+    def __len__(self):
+        """Number of entries, including the expired ones not removed yet."""
+        return len(self._entries)
+
+
+def _load_backend(app, config, args, kwargs):
+    """Create a cache backend from ``config["CACHE_TYPE"]``.
+
+    Backends are resolved the same way Flask-Caching does.
+    """
+    import_me = config["CACHE_TYPE"]
+    if "." not in import_me:
+        import_me = "flask_caching.backends." + import_me
+
+    cache_factory = import_string(import_me)
+    if isinstance(cache_factory, type) and issubclass(cache_factory, BaseCache):
+        cache_factory = cache_factory.factory
+
+    if import_me.find("cachelib") > -1:
+        return cache_factory(*args, **kwargs)
+    return cache_factory(app, config, args, kwargs)
+
+
+class TwoTierCache(BaseCache):
+    """In-process cache (L1) in front of another cache backend (L2)."""
+
+    def __init__(self, l2, l1=None, default_timeout=300):
+        """Initialize the cache.
+
+        :param l2: The L2 cache backend.
+        :param l1: The L1 :class:`LocalCache`.
+        :param default_timeout: Default timeout of the values.
+        """
+        super().__init__(default_timeout=default_timeout)
+        self.l1 = l1 if l1 is not None else LocalCache()
+        self.l2 = l2
+        self.invalidator = None
+
+    def set_invalidator(self, invalidator):
+        """Publish the writes to, and receive them from, the other processes.
+
+        :param invalidator: The :class:`invenio_cache.invalidation.Invalidator`.
+        """
+        self.invalidator = invalidator
+        invalidator.subscribe(self._on_invalidation)
+
+    def _invalidate(self, *keys, prefix=None):
+        """Publish the invalidation of keys to the other processes."""
+        if self.invalidator is not None:
+            self.invalidator.invalidate(*keys, prefix=prefix)
+
+    def _on_invalidation(self, keys, prefix):
+        """Drop the L1 copies of keys written by another process."""
+        for key in keys:
+            self.l1.delete(key)
+        if prefix is not None:
+            self.l1.delete_prefix(prefix)
+
+    @property
+    def serializer(self):
+        """Serializer of the L2, set by Flask-Caching from ``CACHE_SERIALIZER``."""
+        return self.l2.serializer
+
+    @serializer.setter
+    def serializer(self, serializer):
+        """Set the serializer of the L2."""
+        self.l2.serializer = serializer
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        """Create the cache from the application configuration."""
+        l2_config = dict(config, CACHE_TYPE=config["CACHE_L2_TYPE"])
+        l2 = _load_backend(app, l2_config, list(args), dict(kwargs))
+        l1 = LocalCache(
+            threshold=config["CACHE_L1_THRESHOLD"],
+            default_timeout=config["CACHE_L1_DEFAULT_TIMEOUT"],
+        )
+        return cls(l2, l1=l1, default_timeout=kwargs.get("default_timeout", 300))
+
+    def _read_through(self, keys):
+        """Read values from L2, and keep them in L1 until they expire in L2.
+
+        A value is not kept in L1 if its key is written or invalidated while
+        it is read.
+        """
+        generations = [self.l1.generation(key) for key in keys]
+        values, ttls = self._l2_get_many(keys)
+        for key, value, ttl, generation in zip(keys, values, ttls, generations):
+            if value is not None and (ttl is None or ttl > 0):
+                self.l1.set(key, value, ttl, generation=generation)
+        return values
+
+    def _l2_get_many(self, keys):
+        """Get values from L2, with their remaining time to live.
+
+        :returns: The values, and their time to live in seconds, ``None`` if
+            unknown or if they do not expire.
+        """
+        client = getattr(self.l2, "_read_client", None)
+        if client is not None:
+            # Redis: read the values and their time to live in a single trip
+            prefix = self.l2._get_prefix()
+            names = [prefix + key for key in keys]
+            pipe = client.pipeline(transaction=False)
+            pipe.mget(names)
+            for name in names:
+                pipe.pttl(name)
+            raw, *ttls = pipe.execute()
+            return (
+                [self.l2.serializer.loads(value) for value in raw],
+                [ttl / 1000 if ttl >= 0 else None for ttl in ttls],
+            )
+        values = self.l2.get_many(*keys)
+        entries = getattr(self.l2, "_cache", None)
+        if not isinstance(entries, dict):
+            return values, [None] * len(keys)
+        # simple cache: entries are (expiration time, value)
+        now = time.time()
+        ttls = []
+        for key in keys:
+            expires = entries.get(key, (0,))[0]
+            ttls.append(expires - now if expires else None)
+        return values, ttls
+
+    def get(self, key):
+        """Get a value from L1, or from L2 when missing in L1."""
+        value = self.l1.get(key)
+        if value is None:
+            value = self._read_through([key])[0]
+        return value
+
+    def get_many(self, *keys):
+        """Get values from L1, and the ones missing in L1 from L2."""
+        values = [self.l1.get(key) for key in keys]
+        missing = [i for i, value in enumerate(values) if value is None]
+        if missing:
+            l2_values = self._read_through([keys[i] for i in missing])
+            for i, value in zip(missing, l2_values):
+                values[i] = value
+        return values
+
+    def set(self, key, value, timeout=None):
+        """Set a value in both tiers."""
+        timeout = self._normalize_timeout(timeout)
+        result = self.l2.set(key, value, timeout=timeout)
+        if result:
+            self.l1.set(key, value, timeout)
+        else:
+            self.l1.delete(key)
+        self._invalidate(key)
+        return result
+
+    def add(self, key, value, timeout=None):
+        """Set a value in both tiers if it does not exist in L2."""
+        timeout = self._normalize_timeout(timeout)
+        result = self.l2.add(key, value, timeout=timeout)
+        if result:
+            self.l1.set(key, value, timeout)
+            self._invalidate(key)
+        else:
+            # L2 holds another value
+            self.l1.delete(key)
+        return result
+
+    def set_many(self, mapping, timeout=None):
+        """Set values in both tiers."""
+        timeout = self._normalize_timeout(timeout)
+        result = self.l2.set_many(mapping, timeout=timeout)
+        for key, value in mapping.items():
+            if key in result:
+                self.l1.set(key, value, timeout)
+            else:
+                self.l1.delete(key)
+        self._invalidate(*mapping)
+        return result
+
+    def delete(self, key):
+        """Delete a value from both tiers."""
+        self.l1.delete(key)
+        result = self.l2.delete(key)
+        self._invalidate(key)
+        return result
+
+    def delete_many(self, *keys):
+        """Delete values from both tiers."""
+        for key in keys:
+            self.l1.delete(key)
+        result = self.l2.delete_many(*keys)
+        self._invalidate(*keys)
+        return result
+
+    def has(self, key):
+        """Check if a value exists in L2.
+
+        L2 is always checked, as ``has`` is used to check if locks exist.
+        """
+        return self.l2.has(key)
+
+    def clear(self):
+        """Clear both tiers."""
+        self.l1.clear()
+        result = self.l2.clear()
+        self._invalidate(prefix="")
+        return result
+
+    def inc(self, key, delta=1):
+        """Increment a value in L2."""
+        self.l1.delete(key)
+        result = self.l2.inc(key, delta=delta)
+        self._invalidate(key)
+        return result
+
+    def dec(self, key, delta=1):
+        """Decrement a value in L2."""
+        self.l1.delete(key)
+        result = self.l2.dec(key, delta=delta)
+        self._invalidate(key)
+        return result
+
+
+_missing = object()
+
+
+class _Memo(object):
+    """Values read in an application context."""
+
+    __slots__ = ("values", "saved")
+
+    def __init__(self):
+        """Initialize the memo."""
+        self.values = {}
+        self.saved = 0
+
+
+def unmemoized(backend):
+    """Returns a cache backend without the memoization of the reads, if any.
+
+    :param backend: A cache backend, e.g. ``current_cache.cache``.
+    """
+    if isinstance(backend, RequestCache):
+        return backend.backend
+    return backend
+
+
+class RequestCache(BaseCache):
+    """Memoization of the reads of a cache backend in the request context.
+
+    Outside of a request context, the calls are passed to the backend. Use
+    :func:`unmemoized` to read the values written by other requests.
+    """
+
+    def __init__(self, backend, max_size=1000):
+        """Initialize the cache.
+
+        :param backend: The cache backend.
+        :param max_size: Maximum number of values memoized in a request.
+        """
+        super().__init__(default_timeout=backend.default_timeout)
+        self.backend = backend
+        self.max_size = max_size
+
+    def __getattr__(self, name):
+        """Get the other attributes (e.g. Redis clients) from the backend."""
+        if name == "backend":
+            # not initialized yet, e.g. when copied
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def _memo(self, create=True):
+        """Get the memo of the current request context, if any."""
+        if not has_request_context():
+            return None
+        memo = g.get("_invenio_cache_memo")
+        if memo is None and create:
+            memo = g._invenio_cache_memo = _Memo()
+        return memo
+
+    @property
+    def saved(self):
+        """Number of round trips saved in the current request context."""
+        memo = self._memo(create=False)
+        return memo.saved if memo is not None else 0
+
+    def teardown(self, exc=None):
+        """Drop the memo of the context being torn down."""
+        memo = g.pop("_invenio_cache_memo", None)
+        if memo is not None and memo.saved:
+            current_app.logger.debug(
+                f"Cache memoization saved {memo.saved} round trips."
+            )
+
+    def get(self, key):
+        """Get a value from the memo, or from the backend."""
+        memo = self._memo()
+        if memo is None:
+            return self.backend.get(key)
+        value = memo.values.get(key, _missing)
+        if value is _missing:
+            value = self.backend.get(key)
+            self._remember(memo, key, value)
+        else:
+            memo.saved += 1
+        return value
+
+    def get_many(self, *keys):
+        """Get values from the memo, and the missing ones in a single call."""
+        memo = self._memo()
+        if memo is None:
+            return self.backend.get_many(*keys)
+        values = memo.values
+        # each key is read once
+        missing = [key for key in dict.fromkeys(keys) if key not in values]
+        if not missing:
+            if keys:
+                memo.saved += 1
+            return [values[key] for key in keys]
+        read = dict(zip(missing, self.backend.get_many(*missing)))
+        result = [read[key] if key in read else values[key] for key in keys]
+        for key, value in read.items():
+            self._remember(memo, key, value)
+        return result
+
+    def _remember(self, memo, key, value):
+        """Memoize a value, unless it is missing."""
+        values = memo.values
+        values.pop(key, None)
+        if value is None:
+            return
+        values[key] = value
+        while len(values) > self.max_size:
+            # the oldest value first
+            del values[next(iter(values))]
+
+    def _forget(self, *keys):
+        """Drop keys from the memo."""
+        memo = self._memo(create=False)
+        if memo is not None:
+            for key in keys:
+                memo.values.pop(key, None)
+
+    def set(self, key, value, timeout=None):
+        """Set a value."""
+        result = self.backend.set(key, value, timeout=timeout)
+        memo = self._memo(create=False)
+        if memo is not None:
+            if result:
+                self._remember(memo, key, value)
+            else:
+                memo.values.pop(key, None)
+        return result
+
+    def add(self, key, value, timeout=None):
+        """Set a value if it does not exist."""
+        self._forget(key)
+        return self.backend.add(key, value, timeout=timeout)
+
+    def set_many(self, mapping, timeout=None):
+        """Set values."""
+        self._forget(*mapping)
+        return self.backend.set_many(mapping, timeout=timeout)
+
+    def delete(self, key):
+        """Delete a value."""
+        self._forget(key)
+        return self.backend.delete(key)
+
+    def delete_many(self, *keys):
+        """Delete values."""
+        self._forget(*keys)
+        return self.backend.delete_many(*keys)
+
+    def has(self, key):
+        """Check if a value exists in the backend."""
+        return self.backend.has(key)
+
+    def clear(self):
+        """Clear the backend."""
+        memo = self._memo(create=False)
+        if memo is not None:
+            memo.values.clear()
+        return self.backend.clear()
+
+    def inc(self, key, delta=1):
+        """Increment a value."""
+        self._forget(key)
+        return self.backend.inc(key, delta=delta)
+
+    def dec(self, key, delta=1):
+        """Decrement a value."""
+        self._forget(key)
+        return self.backend.dec(key, delta=delta)
@@ -10,17 +10,177 @@
 
 from __future__ import absolute_import, print_function
 
-from jinja2.bccache import MemcachedBytecodeCache
+import re
+import sys
+import threading
+import time
 
+from jinja2 import TemplateNotFound
+from jinja2.bccache import MemcachedBytecodeCache, bc_version
+
+from . import config
+from .compression import compress, decompress, load_codec
+from .lock import _redis_backend
 from .proxies import current_cache
 
+_glob_re = re.compile(r"([\\*?\[\]^])")
+
+
+def _glob_escape(value):
+    """Escape the characters matching other characters in a Redis pattern."""
+    return _glob_re.sub(r"\\\1", value)
+
 
 class BytecodeCache(MemcachedBytecodeCache):
-    """A bytecode cache."""
+    """A bytecode cache.
+
+    The bytecode of each template is fetched from the cache when the template
+    is first loaded. To avoid one round trip per template in a fresh worker,
+    the bytecode can be preloaded with :meth:`warm_up`, e.g. in an uWSGI
+    ``postfork`` hook:
+
+    .. code-block:: python
+
+        @postfork
+        def warm_up_templates():
+            with app.app_context():
+                app.jinja_env.bytecode_cache.warm_up(app.jinja_env)
+
+    Keys are namespaced by a generation, made of the Python bytecode version,
+    the Jinja bytecode version and the ``CACHE_JINJA_BYTECODE_VERSION`` of the
+    deployment. The preloaded bytecode of the templates not rendered within
+    ``CACHE_JINJA_BYTECODE_PRELOAD_TIMEOUT`` seconds is dropped, at the next
+    template loaded.
+
+    The bytecode of the other generations can be deleted in bulk
+    with :meth:`purge_old_generations`.
+
+    Bytecode can be compressed, see ``CACHE_JINJA_BYTECODE_COMPRESSION``.
+    """
 
     def __init__(self, app):
         """Initialize `BytecodeCache`."""
-        prefix = "{0}jinja::".format(app.config.get("CACHE_KEY_PREFIX"))
+
+        def get_config(key):
+            return app.config.get(key, getattr(config, key))
+
+        generation = "{0}-j{1}".format(sys.implementation.cache_tag, bc_version)
+        if get_config("CACHE_JINJA_BYTECODE_VERSION"):
+            generation += "-{0}".format(get_config("CACHE_JINJA_BYTECODE_VERSION"))
+        self.generation = generation
+        self.base_prefix = "{0}jinja::".format(app.config.get("CACHE_KEY_PREFIX"))
+        prefix = "{0}{1}::".format(self.base_prefix, generation)
         super(self.__class__, self).__init__(
             current_cache, prefix=prefix, timeout=None, ignore_memcache_errors=True
         )
+        self.codec = load_codec(
+            get_config("CACHE_JINJA_BYTECODE_COMPRESSION"),
+            level=get_config("CACHE_JINJA_BYTECODE_COMPRESSION_LEVEL"),
+        )
+        self.compression_min_size = get_config(
+            "CACHE_JINJA_BYTECODE_COMPRESSION_MIN_SIZE"
+        )
+        self.stats = {"stored": 0, "bytes_stored": 0, "bytes_saved": 0}
+        self._stats_lock = threading.Lock()
+        self.preload_timeout = get_config("CACHE_JINJA_BYTECODE_PRELOAD_TIMEOUT")
+        # bytecode fetched by ``warm_up`` and not loaded yet, by cache key
+        self._preloaded = {}
+        self._preloaded_until = 0
+
+    def warm_up(self, environment, names=None):
+        """Preload the bytecode of templates with a single ``get_many``.
+
+        Must be called in an application context.
+
+        :param environment: The Jinja environment loading the templates.
+        :param names: Names of the templates. Default is all the templates of
+            the environment loaders, prefer listing the templates rendered
+            by most requests.
+        :returns: The number of templates with a cached bytecode.
+        """
+        if names is None:
+            names = environment.list_templates()
+
+        keys = []
+        for name in names:
+            try:
+                _, filename, _ = environment.loader.get_source(environment, name)
+            except TemplateNotFound:
+                continue
+            keys.append(self.prefix + self.get_cache_key(name, filename))
+        if not keys:
+            return 0
+
+        try:
+            values = self.client.get_many(*keys)
+        except Exception:
+            if not self.ignore_memcache_errors:
+                raise
+            return 0
+
+        preloaded = {k: v for k, v in zip(keys, values) if v is not None}
+        self._preloaded.update(preloaded)
+        self._preloaded_until = time.monotonic() + self.preload_timeout
+        return len(preloaded)
+
+    def load_bytecode(self, bucket):
+        """Load the bytecode preloaded by ``warm_up``, or fetch it."""
+        key = self.prefix + bucket.key
+        code = self._preloaded.pop(key, None)
+        if self._preloaded and time.monotonic() >= self._preloaded_until:
+            # not rendered in time, likely never
+            self._preloaded.clear()
+        if code is None:
+            try:
+                code = self.client.get(key)
+            except Exception:
+                if not self.ignore_memcache_errors:
+                    raise
+                return
+            if code is None:
+                return
+        bucket.bytecode_from_string(decompress(code, self.codec))
+
+    def dump_bytecode(self, bucket):
+        """Store the bytecode, compressed if large enough."""
+        code = bucket.bytecode_to_string()
+        value = compress(self.codec, code, self.compression_min_size)
+        try:
+            self.client.set(self.prefix + bucket.key, value, self.timeout)
+        except Exception:
+            if not self.ignore_memcache_errors:
+                raise
+            return
+        with self._stats_lock:
+            self.stats["stored"] += 1
+            self.stats["bytes_stored"] += len(value)
+            self.stats["bytes_saved"] += len(code) - len(value)
+
+    def purge_old_generations(self):
+        """Delete the bytecode of the other generations.
+
+        It requires a Redis cache backend, as keys are scanned by pattern.
+
+        :returns: The number of deleted keys.
+        """
+        backend = _redis_backend(current_cache)
+        if backend is None:
+            raise RuntimeError("Purging bytecode requires a Redis cache backend.")
+
+        client = backend._write_client
+        key_prefix = backend._get_prefix()
+        current = (key_prefix + self.prefix).encode("utf-8")
+        pattern = _glob_escape(key_prefix + self.base_prefix) + "*"
+        deleted = 0
+        batch = []
+        for key in client.scan_iter(match=pattern):
+            if isinstance(key, str):
+                key = key.encode("utf-8")
+            if not key.startswith(current):
+                batch.append(key)
+            if len(batch) >= 500:
+                deleted += client.delete(*batch)
+                batch = []
+        if batch:
+            deleted += client.delete(*batch)
+        return deleted
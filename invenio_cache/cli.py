@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Cache commands."""
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .profiler import read_profiles, reset_profiles
+from .proxies import current_cache_ext
+
+
+def _backend():
+    """Get the cache backend, without the profiling of its operations."""
+    profiler = current_cache_ext.profiler
+    if profiler is not None:
+        return profiler.backend
+    return current_app.extensions["cache"][current_cache_ext.cache]
+
+
+@click.group()
+def cache():
+    """Cache commands."""
+
+
+@cache.command()
+@click.option("-n", "--limit", default=20, show_default=True, help="Number of keys.")
+@click.option("--reset", is_flag=True, help="Reset the profiles after showing them.")
+@with_appcontext
+def top(limit, reset):
+    """Show the most read keys and the largest values.
+
+    The keys are profiled when ``CACHE_PROFILER`` is enabled.
+    """
+    backend = _backend()
+    profiles = read_profiles(backend)
+    if not profiles["processes"]:
+        click.echo("No cache profile, is CACHE_PROFILER enabled?")
+    else:
+        click.echo(
+            f"{profiles['processes']} processes, "
+            f"{profiles['sampled']} sampled operations"
+        )
+        click.echo()
+        click.echo(f"{'reads':>10} {'error':>10}  most read keys")
+        for key, count, error in profiles["reads"][:limit]:
+            click.echo(f"{count:>10} {error:>10}  {key}")
+        click.echo()
+        click.echo(f"{'bytes':>10}  largest values")
+        for key, size in profiles["largest"][:limit]:
+            click.echo(f"{size:>10}  {key}")
+    if reset:
+        reset_profiles(backend)
+        click.echo("Profiles reset.")
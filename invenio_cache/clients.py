@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Shared Redis clients.
+
+The Redis clients are created with the connection pool configuration of the
+cache, and shared by URL, so that the other modules talking to the same Redis
+reuse the connections of the cache instead of opening their own pool:
+
+.. code-block:: python
+
+    client = current_cache_ext.redis_clients.get()
+
+The Redis backend of the cache uses the client of ``CACHE_REDIS_URL``. The
+pools are bounded by ``CACHE_REDIS_POOL_SIZE``, and the callers wait up to
+``CACHE_REDIS_POOL_TIMEOUT`` seconds for a free connection when all of them
+are in use. The utilization of the pools, and the time spent getting a
+connection, are in :attr:`RedisClients.stats`.
+"""
+
+import threading
+import time
+
+from flask_caching.backends import RedisCache
+from werkzeug.utils import import_string
+
+from ._compat import string_types
+
+_pool_options = {
+    "CACHE_REDIS_POOL_TIMEOUT": "timeout",
+    "CACHE_REDIS_SOCKET_TIMEOUT": "socket_timeout",
+    "CACHE_REDIS_SOCKET_CONNECT_TIMEOUT": "socket_connect_timeout",
+    "CACHE_REDIS_SOCKET_KEEPALIVE": "socket_keepalive",
+    "CACHE_REDIS_HEALTH_CHECK_INTERVAL": "health_check_interval",
+}
+"""Connection pool options, by configuration variable."""
+
+_pool_classes = {}
+
+_legacy_backends = {
+    "null": "NullCache",
+    "simple": "SimpleCache",
+    "filesystem": "FileSystemCache",
+    "redis": "RedisCache",
+    "redissentinel": "RedisSentinelCache",
+    "rediscluster": "RedisClusterCache",
+    "uwsgi": "UWSGICache",
+    "memcached": "MemcachedCache",
+    "gaememcached": "MemcachedCache",
+    "saslmemcached": "SASLMemcachedCache",
+    "spreadsaslmemcached": "SpreadSASLMemcachedCache",
+}
+"""Backend classes of the ``CACHE_TYPE`` aliases of Flask-Caching 1.x."""
+
+
+class MeteredPool(object):
+    """Mixin of the Redis connection pools, measuring their utilization.
+
+    It is mixed in a ``redis-py`` pool class, e.g. with
+    ``type("Pool", (MeteredPool, redis.BlockingConnectionPool), {})``.
+    """
+
+    def reset(self):
+        """Reset the pool and its metrics, e.g. after a fork."""
+        super().reset()
+        self._metrics_lock = threading.Lock()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.acquired = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def get_connection(self, *args, **kwargs):
+        """Get a connection, measuring the time spent waiting for it."""
+        start = time.perf_counter()
+        connection = super().get_connection(*args, **kwargs)
+        wait_time = time.perf_counter() - start
+        with self._metrics_lock:
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.acquired += 1
+            self.wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+        return connection
+
+    def release(self, connection):
+        """Release a connection."""
+        super().release(connection)
+        with self._metrics_lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    @property
+    def stats(self):
+        """Utilization of the pool, and time spent getting a connection."""
+        with self._metrics_lock:
+            max_connections = self.max_connections
+            return {
+                "max_connections": max_connections,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "utilization": self.in_use / max_connections,
+                "acquired": self.acquired,
+                "wait_time": self.wait_time,
+                "avg_wait_time": self.wait_time / (self.acquired or 1),
+                "max_wait_time": self.max_wait_time,
+            }
+
+
+def pool_class(blocking):
+    """Get the metered ``redis-py`` pool class.
+
+    :param blocking: If ``True``, a pool waiting for a free connection when
+        all of them are in use, otherwise a pool failing.
+    """
+    cls = _pool_classes.get(blocking)
+    if cls is None:
+        import redis
+
+        base = redis.BlockingConnectionPool if blocking else redis.ConnectionPool
+        cls = _pool_classes[blocking] = type(
+            f"Metered{base.__name__}", (MeteredPool, base), {}
+        )
+    return cls
+
+
+def uses_redis_backend(config):
+    """Check if the cache configuration uses the Redis backend of Flask-Caching.
+
+    The backend is the one of ``CACHE_TYPE``, or of ``CACHE_L2_TYPE`` with the
+    two-tier cache.
+    """
+    from .backends import TwoTierCache
+
+    backend = _import_backend(config["CACHE_TYPE"])
+    if backend is TwoTierCache:
+        backend = _import_backend(config["CACHE_L2_TYPE"])
+    return backend is RedisCache
+
+
+def _import_backend(cache_type):
+    """Import a ``CACHE_TYPE`` the way Flask-Caching does, or return ``None``.
+
+    The aliases of Flask-Caching 1.x (e.g. ``"redis"``) are factory functions,
+    they are resolved to the class of the backend they create.
+    """
+    if not isinstance(cache_type, string_types):
+        return cache_type
+    cache_type = _legacy_backends.get(cache_type, cache_type)
+    if "." not in cache_type:
+        cache_type = "flask_caching.backends." + cache_type
+    try:
+        return import_string(cache_type)
+    except ImportError:
+        return None
+
+
+class RedisClients(object):
+    """Registry of the Redis clients, shared by URL."""
+
+    def __init__(self, app):
+        """Initialize the registry.
+
+        :param app: The application, configuring the default URL and the
+            connection pools.
+        """
+        self.url = app.config["CACHE_REDIS_URL"]
+        self.max_connections = app.config["CACHE_REDIS_POOL_SIZE"]
+        self.options = {
+            option: app.config[name]
+            for name, option in _pool_options.items()
+            if app.config[name] is not None
+        }
+        if self.max_connections is None:
+            # the pool of redis-py does not wait for a free connection
+            self.options.pop("timeout", None)
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, url=None):
+        """Get the client of a URL, creating it on first use.
+
+        :param url: The Redis URL. Default is ``CACHE_REDIS_URL``.
+        """
+        url = url or self.url
+        client = self._clients.get(url)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(url)
+                if client is None:
+                    client = self._clients[url] = self.create(url)
+        return client
+
+    def create(self, url):
+        """Create the client of a URL, with its connection pool."""
+        import redis
+
+        options = dict(self.options)
+        if self.max_connections is not None:
+            options["max_connections"] = self.max_connections
+        pool = pool_class(self.max_connections is not None).from_url(url, **options)
+        return redis.Redis(connection_pool=pool)
+
+    def create_async(self, url=None):
+        """Create a ``redis.asyncio`` client of a URL, with its connection pool.
+
+        The asyncio clients are not shared, as their connections belong to the
+        event loop which opened them, and their pools are not metered.
+
+        :param url: The Redis URL. Default is ``CACHE_REDIS_URL``.
+        """
+        import redis.asyncio
+
+        options = dict(self.options)
+        if self.max_connections is not None:
+            options["max_connections"] = self.max_connections
+            pool_class = redis.asyncio.BlockingConnectionPool
+        else:
+            pool_class = redis.asyncio.ConnectionPool
+        pool = pool_class.from_url(url or self.url, **options)
+        return redis.asyncio.Redis(connection_pool=pool)
+
+    @property
+    def stats(self):
+        """Stats of the connection pools, by URL."""
+        return {
+            url: client.connection_pool.stats
+            for url, client in list(self._clients.items())
+        }
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Compression of cached payloads.
+
+Compressed payloads start with a two bytes tag identifying the codec, so that
+payloads compressed with any of the known codecs, or not compressed at all,
+can be read whatever the configured codec is.
+"""
+
+import zlib
+
+from werkzeug.utils import import_string
+
+from ._compat import string_types
+
+TAG_MARK = b"\x00"
+"""First byte of the tags of compressed payloads."""
+
+
+class ZlibCodec(object):
+    """zlib compression."""
+
+    tag = TAG_MARK + b"z"
+
+    def __init__(self, level=None):
+        """Initialize the codec.
+
+        :param level: Compression level, from 0 to 9. Default is zlib's one.
+        """
+        self.level = -1 if level is None else level
+
+    def compress(self, data):
+        """Compress bytes."""
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        """Decompress bytes."""
+        return zlib.decompress(data)
+
+
+class Lz4Codec(object):
+    """LZ4 compression, faster than zlib. Requires the ``lz4`` package."""
+
+    tag = TAG_MARK + b"l"
+
+    def __init__(self, level=None):
+        """Initialize the codec.
+
+        :param level: Compression level, from 0 to 16. Default is 0.
+        """
+        import lz4.frame
+
+        self._lz4 = lz4.frame
+        self.level = level or 0
+
+    def compress(self, data):
+        """Compress bytes."""
+        return self._lz4.compress(data, compression_level=self.level)
+
+    def decompress(self, data):
+        """Decompress bytes."""
+        return self._lz4.decompress(data)
+
+
+codecs = {
+    "zlib": ZlibCodec,
+    "lz4": Lz4Codec,
+}
+"""Known codecs, by name."""
+
+_codecs_by_tag = {}
+
+
+def load_codec(codec, level=None):
+    """Load a codec.
+
+    :param codec: A codec name from :data:`codecs`, an import path or class of
+        a codec, or a codec instance. ``None`` disables compression.
+    :param level: Compression level passed to codec classes.
+    :returns: The codec instance, or ``None``.
+    """
+    if codec is None:
+        return None
+    if isinstance(codec, string_types):
+        codec = codecs[codec] if codec in codecs else import_string(codec)
+    if isinstance(codec, type):
+        codec = codec(level=level)
+    return codec
+
+
+def compress(codec, data, min_size=0):
+    """Compress bytes, if they are at least ``min_size`` bytes long.
+
+    Data that is too small, or not smaller once compressed, is returned as is.
+    """
+    if codec is None or len(data) < min_size:
+        return data
+    compressed = codec.tag + codec.compress(data)
+    if len(compressed) >= len(data):
+        return data
+    return compressed
+
+
+def decompress(data, codec=None):
+    """Decompress bytes compressed by :func:`compress`, with any known codec.
+
+    Data that is not compressed is returned as is.
+    """
+    if data[:1] != TAG_MARK:
+        return data
+    tag = data[:2]
+    if codec is None or codec.tag != tag:
+        codec = _codecs_by_tag.get(tag)
+        if codec is None:
+            for cls in codecs.values():
+                if cls.tag == tag:
+                    codec = _codecs_by_tag[tag] = cls()
+                    break
+            else:
+                raise ValueError(f"Unknown compression tag {tag!r}.")
+    return codec.decompress(data[2:])
@@ -29,9 +29,158 @@ Please refer to Flask-Caching documentation for other cache types.
 CACHE_REDIS_URL = "redis://localhost:6379/0"
 """Redis location and database."""
 
+CACHE_REDIS_POOL_SIZE = None
+"""Maximum number of connections of the Redis connection pools.
+
+When all of them are in use, the callers wait up to ``CACHE_REDIS_POOL_TIMEOUT``
+seconds for a free one. Unbounded if ``None``. See
+:mod:`invenio_cache.clients`.
+"""
+
+CACHE_REDIS_POOL_TIMEOUT = 20
+"""Time in seconds to wait for a free connection of a bounded Redis pool."""
+
+CACHE_REDIS_SOCKET_TIMEOUT = None
+"""Timeout in seconds of the Redis commands. Disabled if ``None``."""
+
+CACHE_REDIS_SOCKET_CONNECT_TIMEOUT = None
+"""Timeout in seconds of the Redis connections. Disabled if ``None``."""
+
+CACHE_REDIS_SOCKET_KEEPALIVE = None
+"""Enable TCP keepalive on the Redis connections."""
+
+CACHE_REDIS_HEALTH_CHECK_INTERVAL = None
+"""Interval in seconds of the health checks of idle Redis connections."""
+
 
 CACHE_IS_AUTHENTICATED_CALLBACK = None
 """Import path to callback.
 
 Callback is executed to determine if request is authenticated.
 """
+
+CACHE_VARY_LOCALE_CALLBACK = None
+"""Import path to callback returning the locale of a request.
+
+Used by the views cached with ``vary=["locale"]``. If ``None``, the locale of
+Flask-Babel if installed, or the best ``Accept-Language`` of the request.
+"""
+
+CACHE_JINJA_BYTECODE_VERSION = None
+"""Version of the deployment, included in the Jinja bytecode cache keys.
+
+Changing it starts a new generation of cached bytecode.
+"""
+
+CACHE_JINJA_BYTECODE_PRELOAD_TIMEOUT = 300
+"""Time in seconds the bytecode preloaded by ``warm_up`` is kept until used."""
+
+CACHE_JINJA_BYTECODE_COMPRESSION = None
+"""Compression of the Jinja bytecode, ``"zlib"``, ``"lz4"`` or ``None``."""
+
+CACHE_JINJA_BYTECODE_COMPRESSION_MIN_SIZE = 1024
+"""Minimum size in bytes of the Jinja bytecode to compress."""
+
+CACHE_JINJA_BYTECODE_COMPRESSION_LEVEL = None
+"""Compression level of the Jinja bytecode, the codec default if ``None``."""
+
+CACHE_L2_TYPE = "redis"
+"""Cache type of the L2 backend of the two-tier cache.
+
+Only used when ``CACHE_TYPE`` is ``"invenio_cache.backends.TwoTierCache"``.
+"""
+
+CACHE_L1_THRESHOLD = 1000
+"""Maximum number of values kept in the in-process L1 of the two-tier cache."""
+
+CACHE_L1_DEFAULT_TIMEOUT = 5
+"""Maximum time in seconds a value is kept in the L1 of the two-tier cache."""
+
+CACHE_INVALIDATION_TRANSPORT = None
+"""Transport of the invalidations of in-process caches across workers.
+
+An import path or a callable, called with the application to create an
+:class:`invenio_cache.invalidation.InvalidationTransport`, e.g.
+``"invenio_cache.invalidation.RedisTransport"``. Disabled if ``None``.
+"""
+
+CACHE_INVALIDATION_CHANNEL = "invenio-cache::invalidation"
+"""Redis pub/sub channel of the invalidations."""
+
+CACHE_SERIALIZER = None
+"""Serializer of the cached values, see :mod:`invenio_cache.serializers`.
+
+``"pickle"``, ``"json"`` (with ``orjson`` if installed), ``"msgpack"``, or an
+import path or instance of a codec or of a ``cachelib`` serializer. If
+``None``, the default serializer of the backend.
+"""
+
+CACHE_COMPRESSION = None
+"""Compression of the cached values, e.g. ``"zlib"`` or ``"lz4"``.
+
+See :class:`invenio_cache.serializers.CompressedSerializer`. Disabled if
+``None``.
+"""
+
+CACHE_COMPRESSION_MIN_SIZE = 1024
+"""Minimum size in bytes of the serialized values to compress."""
+
+CACHE_COMPRESSION_LEVEL = None
+"""Compression level of the cached values. Default is the codec's one."""
+
+CACHE_METRICS_SINK = None
+"""Sink of the metrics of the cache operations, see :mod:`invenio_cache.metrics`.
+
+``"memory"``, ``"prometheus"``, ``"statsd"``, or an import path or a callable,
+called with the application to create a
+:class:`invenio_cache.metrics.MetricsSink`. Disabled if ``None``.
+"""
+
+CACHE_METRICS_MAX_PREFIXES = 50
+"""Maximum number of key prefixes of the metrics, the others are ``other``."""
+
+CACHE_METRICS_STATSD_HOST = "localhost"
+"""Host of the StatsD server of the metrics."""
+
+CACHE_METRICS_STATSD_PORT = 8125
+"""Port of the StatsD server of the metrics."""
+
+CACHE_METRICS_STATSD_PREFIX = "invenio_cache"
+"""Prefix of the names of the metrics sent to StatsD."""
+
+CACHE_METRICS_SAMPLE_RATE = 1.0
+"""Ratio of the cache operations sent to StatsD, from 0 to 1."""
+
+CACHE_PROFILER = False
+"""Profile the hot keys and large values, see :mod:`invenio_cache.profiler`."""
+
+CACHE_PROFILER_TOP_K = 100
+"""Number of keys kept by the profiler of each process."""
+
+CACHE_PROFILER_SAMPLE_RATE = 0.01
+"""Ratio of the cache operations recorded by the profiler, from 0 to 1."""
+
+CACHE_PROFILER_FLUSH_INTERVAL = 10
+"""Interval in seconds between the writes of the profiles in the cache.
+
+The profiles are written by a background thread of each process. If ``None``,
+they are only written by :meth:`invenio_cache.profiler.KeyProfiler.flush`.
+"""
+
+CACHE_REQUEST_MEMOIZATION = False
+"""Memoize the values read through ``current_cache`` in the request context.
+
+See :class:`invenio_cache.backends.RequestCache`.
+"""
+
+CACHE_REQUEST_MEMOIZATION_MAX_SIZE = 1000
+"""Maximum number of values memoized in a request."""
+
+CACHE_ASYNC_TYPE = None
+"""Asyncio cache, see :mod:`invenio_cache.aio`.
+
+An import path or a callable, called with the application to create an
+:class:`invenio_cache.aio.AsyncCache`, e.g.
+``"invenio_cache.aio.InMemoryAsyncCache"``. If ``None``, an asyncio Redis
+client is used with a Redis backend, and other backends are called in threads.
+"""
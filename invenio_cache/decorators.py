@@ -8,33 +8,565 @@
 
 """Decorators to help with caching."""
 
+import asyncio
+import contextvars
 import hashlib
+import inspect
+import math
+import random
+import sys
 import threading
 import time
-from functools import wraps
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial, wraps
 
-from .proxies import current_cache, current_cache_ext
+from flask import current_app, g, make_response, request
+from werkzeug.http import is_resource_modified
 
+from .backends import unmemoized
+from .errors import LockAcquireFailed, LockReleaseFailed
+from .lock import CachedMutex
+from .proxies import current_cache_ext
 
-def cached_unless_authenticated(timeout=50, key_prefix="default"):
-    """Cache anonymous traffic."""
+
+def cached_unless_authenticated(
+    timeout=50,
+    key_prefix="default",
+    beta=None,
+    lock=False,
+    conditional=False,
+    vary=None,
+):
+    """Cache anonymous traffic.
+
+    The view wrapped by the cache decorator is built once per application (see
+    :meth:`invenio_cache.ext.InvenioCache.cached_view`).
+
+    With ``vary``, a response is cached per value of the query arguments, the
+    headers or the locale of the requests, see :class:`VaryKey`:
+
+    .. code-block:: python
+
+        @cached_unless_authenticated(
+            key_prefix="search/%s", vary=["query:q", "query:page", "locale"]
+        )
+        def search():
+            ...
+
+    With ``beta``, the cached response is recomputed before it expires, with a
+    probability growing as the expiration time nears, and with the time taken
+    to compute the response (see :func:`early_recomputed`). It spreads the
+    recomputations of a popular view instead of having all the workers
+    recompute it when it expires.
+
+    With ``conditional``, the cached responses have an ``ETag`` and a
+    ``Last-Modified`` header, and the conditional requests of the clients
+    having the cached response get a ``304 Not Modified`` response, without
+    reading the cached response (see :func:`conditional_view`).
+
+    :param timeout: Cache timeout, in seconds.
+    :param key_prefix: Cache key prefix.
+    :param beta: Eagerness of the early recomputations, e.g. ``1.0``. Larger
+        values recompute earlier. Disabled if ``None``.
+    :param lock: With ``beta``, if ``True``, a single worker recomputes the
+        response while the others serve the previous one.
+    :param conditional: If ``True``, answer the conditional requests.
+    :param vary: The request values the response varies with, see
+        :class:`VaryKey`. The headers among them, and ``Accept-Language`` for the
+        locale, are added to the ``Vary`` header of the responses.
+    """
+    vary_headers = ()
+    if vary:
+        key_prefix = VaryKey(key_prefix, vary)
+        vary_headers = key_prefix.headers
 
     def caching(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
-            cache_fun = current_cache.cached(
-                timeout=timeout,
-                key_prefix=key_prefix,
-                unless=lambda: current_cache_ext.is_authenticated_callback(),
+            view = current_cache_ext.cached_view(
+                f,
+                timeout,
+                key_prefix,
+                beta=beta,
+                lock=lock,
+                conditional=conditional,
             )
-            return cache_fun(f)(*args, **kwargs)
+            rv = view(*args, **kwargs)
+            if vary_headers:
+                # for the HTTP caches, which only key the responses by URL
+                rv = make_response(rv)
+                rv.vary.update(vary_headers)
+            return rv
 
         return wrapper
 
     return caching
 
 
-def cached_with_expiration(f):
+class VaryKey(object):
+    """Cache key of a view, varying with values of the request.
+
+    The values are declared as:
+
+    - ``"query:<name>"``: a query argument (all its values, in order);
+    - ``"query"``: all the query arguments, in any order. Any query string
+      makes a new entry, prefer naming the arguments;
+    - ``"header:<name>"``: a header, without the spaces around its items;
+    - ``"locale"``: the locale of the request, see
+      ``CACHE_VARY_LOCALE_CALLBACK``.
+
+    The key is the key prefix (called if it is a callable, or formatted with the
+    request path if it contains ``%s``), followed by a hash of the canonical form of the values. The keys
+    are memoized by raw request values, so that canonicalizing and hashing
+    only happen for new values.
+    """
+
+    def __init__(self, key_prefix, vary, maxsize=1024):
+        """Initialize the key.
+
+        :param key_prefix: The key prefix, or a callable returning it.
+        :param vary: The request values the key varies with.
+        :param maxsize: The number of memoized keys.
+        """
+        self.key_prefix = key_prefix
+        self.vary = tuple(vary)
+        self.maxsize = maxsize
+        if callable(key_prefix):
+            self._prefix = lambda req: key_prefix()
+        elif "%s" in key_prefix:
+            self._prefix = lambda req: key_prefix % req.path
+        else:
+            # constant
+            self._prefix = None
+        self._getters = [self._getter(item) for item in self.vary]
+        self._keys = {}
+
+    @property
+    def headers(self):
+        """The request headers the key varies with, for the ``Vary`` header."""
+        headers = []
+        for item in self.vary:
+            kind, _, name = item.partition(":")
+            if kind == "header":
+                headers.append(name)
+            elif kind == "locale":
+                headers.append("Accept-Language")
+        return headers
+
+    @staticmethod
+    def _getter(item):
+        """Get the function reading the raw value of a request value."""
+        kind, _, name = item.partition(":")
+        if kind == "query" and name:
+            return lambda req: tuple(req.args.getlist(name))
+        if kind == "query":
+            return lambda req: req.query_string
+        if kind == "header" and name:
+            return lambda req: req.headers.get(name)
+        if kind == "locale" and not name:
+            return lambda req: current_cache_ext.locale_callback()
+        raise ValueError(f"Unknown vary value {item!r}.")
+
+    def __call__(self):
+        """Get the key of the current request."""
+        req = request._get_current_object()
+        raw = tuple(getter(req) for getter in self._getters)
+        if self._prefix is not None:
+            raw += (self._prefix(req),)
+        key = self._keys.get(raw)
+        if key is None:
+            key = self._make_key(raw)
+            if len(self._keys) >= self.maxsize:
+                self._keys.clear()
+            self._keys[raw] = key
+        return key
+
+    def _make_key(self, raw):
+        """Make the key of raw request values."""
+        parts = []
+        for item, value in zip(self.vary, raw):
+            if item == "query":
+                value = sorted(request.args.items(multi=True))
+            elif item.startswith("header:") and value is not None:
+                value = ",".join(part.strip() for part in value.split(","))
+            parts.append(f"{item}={value!r}")
+        digest = hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+        prefix = raw[-1] if self._prefix is not None else self.key_prefix
+        return f"{prefix}::{digest[:16]}"
+
+
+def with_validators(f):
+    """Add an ``ETag`` and a ``Last-Modified`` header to the responses of a view.
+
+    The ``ETag`` is a hash of the body of the response, and ``Last-Modified``
+    the time it is computed at, unless set by the view. Only successful,
+    non-streamed responses are changed.
+    """
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        response = make_response(f(*args, **kwargs))
+        if response.status_code != 200 or response.is_streamed:
+            return response
+        response.add_etag()
+        if response.last_modified is None:
+            response.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        # serializer-neutral values, e.g. JSON reads dates back as strings
+        g._invenio_cache_validators = (
+            response.get_etag()[0],
+            int(response.last_modified.timestamp()),
+        )
+        return response
+
+    return wrapper
+
+
+def conditional_view(view, cached_view, cache, unless=None):
+    """Answer the conditional requests of a cached view without reading it.
+
+    The validators (``ETag`` and ``Last-Modified``) of the responses computed
+    by the view, see :func:`with_validators`, are stored in a small entry next
+    to the cached response. The requests with an ``If-None-Match`` or
+    ``If-Modified-Since`` header matching them get a ``304 Not Modified``
+    response, read from this entry only. The errors of the cache backend
+    reading or writing the validators are logged, and the view is then served
+    without them.
+
+    :param view: The cached view.
+    :param cached_view: The view decorated by the ``cached`` decorator of the
+        cache, making the cache keys.
+    :param cache: The Flask-Caching cache.
+    :param unless: Callable bypassing the cache when it returns ``True``.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if unless is not None and unless():
+            return view(*args, **kwargs)
+        key = cached_view.make_cache_key(*args, use_request=True, **kwargs)
+        key = f"{key}::validators"
+        if request.if_none_match or request.if_modified_since:
+            try:
+                validators = cache.get(key)
+            except Exception:
+                _log_cache_error()
+                validators = None
+            if validators is not None:
+                etag, last_modified = validators
+                last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+                if not is_resource_modified(
+                    request.environ, etag=etag, last_modified=last_modified
+                ):
+                    response = current_app.response_class(status=304)
+                    response.set_etag(etag)
+                    response.last_modified = last_modified
+                    return response
+        g.pop("_invenio_cache_validators", None)
+        rv = view(*args, **kwargs)
+        validators = g.pop("_invenio_cache_validators", None)
+        if validators is not None:
+            # computed by this request
+            timeout = cached_view.cache_timeout or cache.cache.default_timeout
+            try:
+                cache.set(key, validators, timeout=timeout)
+            except Exception:
+                _log_cache_error()
+        return rv
+
+    return wrapper
+
+
+_RecomputedValue = namedtuple("_RecomputedValue", ["value", "delta", "expiry"])
+"""Cached value, with the time taken to compute it and its expiration time."""
+
+_RECOMPUTED_TAG = "__invenio_cache_recomputed__"
+"""Key tagging the stored :class:`_RecomputedValue` entries.
+
+They are stored as dictionaries, which all the serializers read back as such
+(e.g. JSON and msgpack read tuples back as lists).
+"""
+
+
+_MIN_RECOMPUTE_LEASE = 10
+_MAX_RECOMPUTE_LEASE = 60
+"""Bounds of the time in seconds a recomputation is locked for.
+
+If the call recomputing a value dies, the others serve the previous value, or
+wait, until the lock expires.
+"""
+
+
+def _log_cache_error():
+    """Log the error being handled, raised by the cache backend.
+
+    As in the ``cached`` decorator of Flask-Caching, the error is raised again
+    in debug mode, and otherwise the view is served without the cache.
+    """
+    if current_app.debug:
+        raise
+    current_app.logger.exception("Exception possibly due to cache backend.")
+
+
+def _release(mutex):
+    """Release a lock, which may have expired meanwhile."""
+    try:
+        mutex.release()
+    except LockReleaseFailed:
+        pass
+    except Exception:
+        _log_cache_error()
+
+
+def early_recomputed(view, cache, beta=1.0, lock=False, unless=None):
+    """Recompute a view cached by Flask-Caching before it expires.
+
+    The value is stored with the time taken to compute it (``delta``), and is
+    recomputed by a call before its expiration time with a probability
+    growing as the expiration time nears (XFetch, see "Optimal Probabilistic
+    Cache Stampede Prevention", Vattani et al., 2015): a call recomputes it if
+    ``now - delta * beta * log(random()) >= expiry``.
+
+    With ``lock``, the recomputation is guarded by a
+    :class:`invenio_cache.lock.CachedMutex`: the calls failing to acquire it
+    serve the previous value, which is kept in the cache for twice the
+    timeout. When there is no previous value, they wait for the value being
+    computed. The values are read without the memoization of the request (see
+    :func:`invenio_cache.backends.unmemoized`), to see the ones computed
+    meanwhile.
+
+    The errors of the cache backend are logged, and the view is then computed
+    without the cache.
+
+    :param view: The view decorated by the ``cached`` decorator of the cache.
+    :param cache: The Flask-Caching cache.
+    :param beta: Eagerness of the early recomputations.
+    :param lock: If ``True``, a single call recomputes the value.
+    :param unless: Callable bypassing the cache when it returns ``True``.
+    """
+    f = view.uncached
+
+    def compute(key, timeout, args, kwargs):
+        start = time.perf_counter()
+        value = f(*args, **kwargs)
+        delta = time.perf_counter() - start
+        try:
+            cache.set(
+                key,
+                {
+                    _RECOMPUTED_TAG: True,
+                    "value": value,
+                    "delta": delta,
+                    "expiry": time.time() + timeout,
+                },
+                timeout=timeout * 2 if lock else timeout,
+            )
+        except Exception:
+            _log_cache_error()
+        return value
+
+    def read(key):
+        try:
+            entry = unmemoized(cache.cache).get(key)
+        except Exception:
+            _log_cache_error()
+            return None
+        if not isinstance(entry, dict) or not entry.get(_RECOMPUTED_TAG):
+            return None
+        return _RecomputedValue(entry["value"], entry["delta"], entry["expiry"])
+
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if unless is not None and unless():
+            return f(*args, **kwargs)
+        key = view.make_cache_key(*args, use_request=True, **kwargs)
+        timeout = view.cache_timeout or cache.cache.default_timeout
+        entry = read(key)
+        if entry is not None:
+            # 1 - random() is in ]0, 1]
+            gap = -entry.delta * beta * math.log(1 - random.random())
+            if time.time() + gap < entry.expiry:
+                return entry.value
+        if not lock:
+            return compute(key, timeout, args, kwargs)
+
+        mutex = CachedMutex(f"{key}::recompute")
+        lease = min(max(int(timeout), _MIN_RECOMPUTE_LEASE), _MAX_RECOMPUTE_LEASE)
+        try:
+            mutex.acquire(timeout=lease)
+        except LockAcquireFailed:
+            if entry is not None:
+                # served while another call recomputes it
+                return entry.value
+            try:
+                mutex.acquire(timeout=lease, blocking=True, wait_timeout=lease)
+            except LockAcquireFailed:
+                return compute(key, timeout, args, kwargs)
+            except Exception:
+                _log_cache_error()
+                return f(*args, **kwargs)
+            # computed while waiting for the lock
+            entry = read(key)
+            if entry is not None and time.time() < entry.expiry:
+                _release(mutex)
+                return entry.value
+        except Exception:
+            _log_cache_error()
+            return f(*args, **kwargs)
+        try:
+            return compute(key, timeout, args, kwargs)
+        finally:
+            _release(mutex)
+
+    return wrapper
+
+
+class _InflightCall(object):
+    """Computation of a cache entry shared by concurrent callers of a key."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        """Initialize the call."""
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        """Wait for the computation and return its result (or raise its error)."""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def notify(self):
+        """Wake up the callers waiting for the computation."""
+        self.done.set()
+
+
+class _AsyncInflightCall(object):
+    """Computation of a cache entry shared by concurrent awaits of a key."""
+
+    __slots__ = ("done", "result", "error")
+
+    CANCELLED = object()
+
+    def __init__(self):
+        """Initialize the call."""
+        self.done = asyncio.get_running_loop().create_future()
+        self.result = None
+        self.error = None
+
+    async def wait(self):
+        """Wait for the computation and return its result (or raise its error).
+
+        :returns: The result, or ``_AsyncInflightCall.CANCELLED`` if the task
+            computing it was cancelled.
+        """
+        # a cancelled waiter must not cancel the others
+        await asyncio.shield(self.done)
+        if isinstance(self.error, asyncio.CancelledError):
+            return self.CANCELLED
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def notify(self):
+        """Wake up the callers waiting for the computation."""
+        if not self.done.done():
+            self.done.set_result(None)
+
+
+class _HashedKey(list):
+    """Key of an entry, hashing its items only once.
+
+    Tuples do not cache their hash, while the key is hashed several times per
+    call (entry lookup, LRU update, in-flight calls).
+    """
+
+    __slots__ = "hashvalue"
+
+    def __init__(self, items):
+        """Initialize the key."""
+        self[:] = items
+        self.hashvalue = hash(items)
+
+    def __hash__(self):
+        """Return the cached hash."""
+        return self.hashvalue
+
+
+_kwd_mark = (object(),)
+_fasttypes = {int, str}
+
+
+def _make_key(args, kwargs):
+    """Make the key of an entry from the call arguments.
+
+    As in ``functools.lru_cache``, a single ``int`` or ``str`` argument is used
+    as is, and other arguments are flattened in a tuple without sorting the
+    keyword arguments.
+    """
+    key = args
+    if kwargs:
+        key += _kwd_mark
+        for item in kwargs.items():
+            key += item
+    elif len(key) == 1 and type(key[0]) in _fasttypes:
+        return key[0]
+    return _HashedKey(key)
+
+
+def _entropy(key):
+    """Compute the 0-99 seconds added to the expiration time of an entry.
+
+    It prevents entries created at the same time from expiring simultaneously.
+    Hash randomization spreads it further across processes.
+    """
+    return hash(key) % 100
+
+
+CacheInfo = namedtuple(
+    "CacheInfo",
+    [
+        "hits",
+        "misses",
+        "maxsize",
+        "currsize",
+        "maxbytes",
+        "currbytes",
+        "evictions",
+        "expirations",
+    ],
+)
+"""Statistics reported by ``cache_info()`` of ``cached_with_expiration``."""
+
+
+_refresh_executor = None
+_refresh_executor_lock = threading.Lock()
+
+
+def _get_refresh_executor():
+    """Get the thread pool shared by the background refreshes of entries."""
+    global _refresh_executor
+    with _refresh_executor_lock:
+        if _refresh_executor is None:
+            _refresh_executor = ThreadPoolExecutor(
+                max_workers=4, thread_name_prefix="invenio-cache-refresh"
+            )
+        return _refresh_executor
+
+
+def cached_with_expiration(
+    f=None,
+    maxsize=None,
+    maxbytes=None,
+    sizeof=sys.getsizeof,
+    purge_interval=60,
+    stale_ttl=None,
+    executor=None,
+):
     """In-process cache function results, with optional expiration and entropy.
 
     This decorator caches function results in-process and not in a distributed
@@ -44,59 +576,297 @@ def cached_with_expiration(f):
     This implementation is highly inspired by the native functools.lru_cache. This
     func can be replaced if/when lru_cache will accept an expiration time.
 
+    Concurrent calls missing the same key wait for a single computation of the
+    result, while calls for other keys are served without waiting for it.
+
+    The decorator can be used as is, or called with arguments to bound the cache:
+
+    .. code-block:: python
+
+        @cached_with_expiration(maxsize=1000, maxbytes=10 * 1024 * 1024)
+        def get_vocabulary(vocabulary_id):
+            ...
+
+    When a bound is exceeded, the least recently used entries are evicted.
+    Expired entries are removed when looked up, and all of them are purged at
+    most every ``purge_interval`` seconds when a new entry is stored.
+
+    With ``stale_ttl``, an expired entry is still returned during ``stale_ttl``
+    seconds after its expiration, while a single refresh of it is run in the
+    background. The refresh runs in a copy of the caller's context (e.g. the
+    Flask application context), on ``executor`` or on a small thread pool
+    shared by all the decorated functions.
+
+    Coroutine functions can be decorated as well. Concurrent awaits missing the
+    same key then wait for a single computation of the result, and the stale
+    entries are refreshed in a background task instead of on ``executor``.
+
+    :param maxsize: Maximum number of entries. Default is ``None`` (unbounded).
+    :param maxbytes: Maximum total size of the cached results, as measured by
+        ``sizeof``. Results larger than ``maxbytes`` are not cached. Default is
+        ``None`` (unbounded).
+    :param sizeof: Function returning the size of a result in bytes. Default is
+        ``sys.getsizeof``.
+    :param purge_interval: Minimum interval in seconds between two purges of
+        the expired entries. Default is 60 seconds.
+    :param stale_ttl: Time in seconds during which an expired entry is served
+        while being refreshed. Default is ``None`` (disabled).
+    :param executor: ``concurrent.futures.Executor`` running the refreshes.
+        Default is a shared thread pool.
+
     To tune cache ttl and entropy, the decorated function should have the following
     kwargs:
     :param cache_ttl (int): Expiration time in seconds. Default is 3600 seconds.
     :param cache_entropy (bool): Add entropy to cache expiration. Default is True.
     """
-    cache = {}
+    if f is None:
+        return partial(
+            cached_with_expiration,
+            maxsize=maxsize,
+            maxbytes=maxbytes,
+            sizeof=sizeof,
+            purge_interval=purge_interval,
+            stale_ttl=stale_ttl,
+            executor=executor,
+        )
+
+    # entries are (result, timestamp, expiration time, size), in LRU order
+    cache = OrderedDict()
+    # calls currently computing a missing entry, by key
+    inflight = {}
     cache_lock = threading.Lock()
-    hits = misses = 0
+    hits = misses = evictions = expirations = currbytes = 0
+    next_purge = time.time() + purge_interval
+    stale_ttl = stale_ttl or 0
+
+    def _remove(key):
+        """Remove an entry (the lock must be held)."""
+        nonlocal currbytes
+        currbytes -= cache.pop(key)[3]
+
+    def _purge(now):
+        """Remove all the expired entries (the lock must be held)."""
+        nonlocal expirations, next_purge
+        expired = [key for key, entry in cache.items() if entry[2] <= now]
+        for key in expired:
+            _remove(key)
+        expirations += len(expired)
+        next_purge = now + purge_interval
+
+    def _store(key, result, timestamp, expires, now):
+        """Store an entry and evict entries over the bounds (the lock must be held)."""
+        nonlocal currbytes, evictions
+        size = sizeof(result) if maxbytes is not None else 0
+        if maxbytes is not None and size > maxbytes:
+            return
+        if key in cache:
+            _remove(key)
+        cache[key] = (result, timestamp, expires, size)
+        currbytes += size
+
+        if now >= next_purge:
+            _purge(now)
+        while (maxsize is not None and len(cache) > maxsize) or (
+            maxbytes is not None and currbytes > maxbytes
+        ):
+            _remove(next(iter(cache)))
+            evictions += 1
+
+    def _lookup(key, now, cache_ttl, new_call):
+        """Look up an entry, and register a call computing it if needed.
+
+        The lock only guards the bookkeeping, ``f`` is called outside of it so
+        that a slow miss does not block callers of other keys.
+
+        :returns: ``(entry, is_stale, call, is_leader)``, where ``call`` is
+            ``None`` for a fresh entry and ``is_leader`` tells if the caller
+            has to compute the entry.
+        """
+        nonlocal hits, misses, expirations
+        is_stale = False
+        with cache_lock:
+            entry = cache.get(key)
+            if entry is not None:
+                if now - entry[1] < cache_ttl:
+                    # exists and not expired
+                    hits += 1
+                    cache.move_to_end(key)
+                    return entry, False, None, False
+                if now - entry[1] < cache_ttl + stale_ttl:
+                    # stale, serve it and refresh it once in the background
+                    hits += 1
+                    cache.move_to_end(key)
+                    is_stale = True
+                else:
+                    _remove(key)
+                    expirations += 1
+            if not is_stale:
+                misses += 1
+            call = inflight.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = inflight[key] = new_call()
+        return entry, is_stale, call, is_leader
+
+    def _done(call, key, now, cache_ttl, with_entropy):
+        """Store the result of a call and wake up its waiters (lock not held)."""
+        if call.error is None:
+            # entropy is only needed when an entry is stored
+            timestamp = now + _entropy(key) if with_entropy else now
+            expires = timestamp + cache_ttl + stale_ttl
+        with cache_lock:
+            # ``cache_clear`` might have dropped it (and another call started)
+            # in the meantime
+            if inflight.get(key) is call:
+                if call.error is None:
+                    _store(key, call.result, timestamp, expires, now)
+                del inflight[key]
+        call.notify()
+
+    def _get_args(kwargs):
+        """Pop the ttl and entropy arguments of a call."""
+        if kwargs:
+            return kwargs.pop("cache_ttl", 3600), kwargs.pop("cache_entropy", True)
+        return 3600, True
+
+    def _compute(call, key, args, kwargs, now, cache_ttl, with_entropy):
+        """Compute and store an entry (the lock must not be held)."""
+        try:
+            call.result = f(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            _done(call, key, now, cache_ttl, with_entropy)
+        return call.result
+
+    def _refresh(call, key, args, kwargs, cache_ttl, with_entropy):
+        """Refresh an entry in the background."""
+        # On failure the stale entry is kept, and the error is left on the
+        # future: the next call in the stale window schedules a new refresh.
+        _compute(call, key, args, kwargs, time.time(), cache_ttl, with_entropy)
 
     @wraps(f)
     def wrapper(*args, **kwargs):
         """Wrapper."""
-        nonlocal hits, misses
-        cache_ttl = kwargs.pop("cache_ttl", 3600)
-        with_entropy = kwargs.pop("cache_entropy", True)
+        cache_ttl, with_entropy = _get_args(kwargs)
+        key = _make_key(args, kwargs)
+        now = time.time()
+        entry, is_stale, call, is_leader = _lookup(key, now, cache_ttl, _InflightCall)
+        if call is None:
+            return entry[0]
 
-        # Create a hashable key that includes args and the sorted kwargs
-        key = (args) + tuple(sorted(kwargs.items()))
+        if is_stale:
+            if is_leader:
+                try:
+                    (executor or _get_refresh_executor()).submit(
+                        contextvars.copy_context().run,
+                        _refresh,
+                        call,
+                        key,
+                        args,
+                        kwargs,
+                        cache_ttl,
+                        with_entropy,
+                    )
+                except Exception as e:
+                    # e.g. a shut down executor: the stale entry is kept, and
+                    # the next call in the stale window schedules a new refresh
+                    call.error = e
+                    _done(call, key, now, cache_ttl, with_entropy)
+            return entry[0]
 
-        entropy = 0
-        if with_entropy:
-            # calculate entropy
-            key_str = str(key)
-            # calculate 2-digits int from args/kwargs to prevent keys created
-            # at the same time from expiring simultaneously
-            entropy = int(hashlib.md5(key_str.encode()).hexdigest(), 16) % 100
+        if not is_leader:
+            # Another thread is already computing this key, wait for it
+            return call.wait()
 
-        now = time.time()
-        with cache_lock:
-            cache_hit = (
-                key in cache and now - cache[key][1] < cache_ttl
-            )  # exists and not expired
-            if cache_hit:
-                hits += 1
-                return cache[key][0]
-            else:
-                result = f(*args, **kwargs)
-                cache[key] = (result, now + entropy)
-                misses += 1
-                return result
+        return _compute(call, key, args, kwargs, now, cache_ttl, with_entropy)
+
+    if inspect.iscoroutinefunction(f):
+        # strong references to the refresh tasks, until they are done
+        tasks = set()
+
+        async def _acompute(call, key, args, kwargs, now, cache_ttl, with_entropy):
+            """Compute and store an entry.
+
+            If the task is cancelled, the call is dropped and its waiters retry.
+            """
+            try:
+                call.result = await f(*args, **kwargs)
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                _done(call, key, now, cache_ttl, with_entropy)
+            return call.result
+
+        async def _arefresh(call, key, args, kwargs, cache_ttl, with_entropy):
+            """Refresh an entry in the background."""
+            try:
+                await _acompute(
+                    call, key, args, kwargs, time.time(), cache_ttl, with_entropy
+                )
+            except Exception:
+                # The stale entry is kept, the next call in the stale window
+                # schedules a new refresh.
+                pass
+
+        @wraps(f)
+        async def async_wrapper(*args, **kwargs):
+            """Wrapper."""
+            cache_ttl, with_entropy = _get_args(kwargs)
+            key = _make_key(args, kwargs)
+            while True:
+                now = time.time()
+                entry, is_stale, call, is_leader = _lookup(
+                    key, now, cache_ttl, _AsyncInflightCall
+                )
+                if call is None:
+                    return entry[0]
+
+                if is_stale:
+                    if is_leader:
+                        task = asyncio.ensure_future(
+                            _arefresh(call, key, args, kwargs, cache_ttl, with_entropy)
+                        )
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+                    return entry[0]
+
+                if is_leader:
+                    return await _acompute(
+                        call, key, args, kwargs, now, cache_ttl, with_entropy
+                    )
+
+                # Another task is already computing this key, wait for it
+                result = await call.wait()
+                if result is not _AsyncInflightCall.CANCELLED:
+                    return result
+                # its task was cancelled, take over
+
+        wrapper = async_wrapper
 
     def cache_info():
         """Report cache statistics."""
-        nonlocal hits, misses
         with cache_lock:
-            return (hits, misses)
+            return CacheInfo(
+                hits,
+                misses,
+                maxsize,
+                len(cache),
+                maxbytes,
+                currbytes,
+                evictions,
+                expirations,
+            )
 
     def cache_clear():
         """Clear the cache."""
-        nonlocal hits, misses
+        nonlocal hits, misses, evictions, expirations, currbytes
         with cache_lock:
             cache.clear()
-            hits = misses = 0
+            inflight.clear()
+            hits = misses = evictions = expirations = currbytes = 0
 
     wrapper.cache_clear = cache_clear
     wrapper.cache_info = cache_info
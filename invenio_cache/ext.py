@@ -11,11 +11,21 @@
 
 from __future__ import absolute_import, print_function
 
+from flask import current_app, g, request
 from flask_caching import Cache
 from werkzeug.utils import import_string
 
 from . import config
 from ._compat import string_types
+from .aio import create_async_cache
+from .backends import RequestCache, TwoTierCache
+from .clients import RedisClients, uses_redis_backend
+from .decorators import conditional_view, early_recomputed, with_validators
+from .invalidation import Invalidator
+from .loader import CacheLoader
+from .metrics import InstrumentedCache, sinks
+from .profiler import KeyProfiler
+from .serializers import CompressedSerializer, load_serializer
 
 
 class InvenioCache(object):
@@ -29,11 +39,212 @@ class InvenioCache(object):
     def init_app(self, app):
         """Flask application initialization."""
         self.init_config(app)
-        self.cache = Cache(app)
+        # registered first, for the components using the shared clients
+        app.extensions["invenio-cache"] = self
+        self.redis_clients = RedisClients(app)
+        self.cache = Cache(app, config=self.init_backend_config(app))
+        self._cached_views = {}
+        self._async_cache = None
+        self.invalidator = self.init_invalidator(app)
+        self.init_serializer(app)
+        self.compression = self.init_compression(app)
+        self.metrics = self.init_metrics(app)
+        self.init_request_memoization(app)
         self.is_authenticated_callback = _callback_factory(
             app.config["CACHE_IS_AUTHENTICATED_CALLBACK"]
         )
-        app.extensions["invenio-cache"] = self
+        self.locale_callback = _locale_callback_factory(
+            app.config["CACHE_VARY_LOCALE_CALLBACK"]
+        )
+
+    def cached_view(
+        self, f, timeout, key_prefix, beta=None, lock=False, conditional=False
+    ):
+        """Get a view cached unless the request is authenticated.
+
+        The view is wrapped with the ``cached`` decorator of the cache only
+        once per view and decorator arguments, instead of on every request.
+
+        :param f: The view function.
+        :param timeout: Cache timeout, in seconds.
+        :param key_prefix: Cache key prefix, or a callable making the cache key
+            (e.g. a :class:`invenio_cache.decorators.VaryKey`).
+        :param beta: Eagerness of the early recomputations, see
+            :func:`invenio_cache.decorators.early_recomputed`. Disabled if
+            ``None``.
+        :param lock: If ``True``, a single call recomputes the view early.
+        :param conditional: If ``True``, answer the conditional requests, see
+            :func:`invenio_cache.decorators.conditional_view`.
+        """
+        key = (f, timeout, key_prefix, beta, lock, conditional)
+        view = self._cached_views.get(key)
+        if view is None:
+            cached = view = self.cache.cached(
+                timeout=timeout,
+                key_prefix=key_prefix,
+                unless=lambda: self.is_authenticated_callback(),
+            )(with_validators(f) if conditional else f)
+            if beta is not None:
+                view = early_recomputed(
+                    view,
+                    self.cache,
+                    beta=beta,
+                    lock=lock,
+                    unless=lambda: self.is_authenticated_callback(),
+                )
+            if conditional:
+                view = conditional_view(
+                    view,
+                    cached,
+                    self.cache,
+                    unless=lambda: self.is_authenticated_callback(),
+                )
+            view = self._cached_views.setdefault(key, view)
+        return view
+
+    @property
+    def async_cache(self):
+        """The asyncio cache, see :mod:`invenio_cache.aio`.
+
+        It is created on first use, in an application context, so that its
+        connections are not shared with the processes forked before. The Redis
+        asyncio cache creates a client per event loop.
+        """
+        if self._async_cache is None:
+            self._async_cache = create_async_cache(current_app)
+        return self._async_cache
+
+    @property
+    def loader(self):
+        """The batch of deferred reads of the application context.
+
+        See :mod:`invenio_cache.loader`.
+        """
+        loader = g.get("_invenio_cache_loader")
+        if loader is None:
+            loader = g._invenio_cache_loader = CacheLoader(self.cache)
+        return loader
+
+    def defer(self, key):
+        """Defer the read of a key, to batch it with the other deferred reads.
+
+        :returns: A :class:`invenio_cache.loader.DeferredValue`.
+        """
+        return self.loader.defer(key)
+
+    def init_backend_config(self, app):
+        """Get the configuration of the cache backend overriding the one of the app.
+
+        The Redis backend uses the shared client of ``CACHE_REDIS_URL``, see
+        :mod:`invenio_cache.clients`. ``CACHE_SERIALIZER`` is installed by
+        :meth:`init_serializer` instead of Flask-Caching.
+        """
+        config = {"CACHE_SERIALIZER": None}
+        if uses_redis_backend(app.config):
+            config.update(
+                CACHE_REDIS_HOST=self.redis_clients.get(),
+                CACHE_REDIS_URL=None,
+            )
+        return config
+
+    def init_invalidator(self, app):
+        """Initialize the invalidation of in-process caches across workers."""
+        transport = app.config["CACHE_INVALIDATION_TRANSPORT"]
+        if transport is None:
+            return None
+        if isinstance(transport, string_types):
+            transport = import_string(transport)
+        invalidator = Invalidator(transport(app))
+
+        backend = app.extensions["cache"][self.cache]
+        if isinstance(backend, TwoTierCache):
+            backend.set_invalidator(invalidator)
+        return invalidator
+
+    def init_serializer(self, app):
+        """Set the serializer of the backend configured by ``CACHE_SERIALIZER``.
+
+        See :mod:`invenio_cache.serializers`.
+        """
+        serializer = load_serializer(app.config["CACHE_SERIALIZER"])
+        if serializer is None:
+            return
+        backend = app.extensions["cache"][self.cache]
+        if not hasattr(backend, "serializer"):
+            app.logger.warning(
+                "%s has no serializer, CACHE_SERIALIZER is not used.",
+                type(backend).__name__,
+            )
+            return
+        backend.serializer = serializer
+
+    def init_compression(self, app):
+        """Compress the values of the backend, if enabled.
+
+        :returns: The :class:`invenio_cache.serializers.CompressedSerializer`
+            of the backend, with the compression stats, or ``None``.
+        """
+        codec = app.config["CACHE_COMPRESSION"]
+        if codec is None:
+            return None
+        backend = app.extensions["cache"][self.cache]
+        if not hasattr(backend, "serializer"):
+            app.logger.warning(
+                "%s has no serializer, its values are not compressed.",
+                type(backend).__name__,
+            )
+            return None
+        serializer = CompressedSerializer(
+            backend.serializer,
+            codec,
+            min_size=app.config["CACHE_COMPRESSION_MIN_SIZE"],
+            level=app.config["CACHE_COMPRESSION_LEVEL"],
+        )
+        backend.serializer = serializer
+        return serializer
+
+    def init_metrics(self, app):
+        """Record the metrics of the cache operations, and profile the keys.
+
+        The profiler of the keys, if enabled, is set as ``profiler``, see
+        :mod:`invenio_cache.profiler`.
+
+        :returns: The :class:`invenio_cache.metrics.MetricsSink`, or ``None``.
+        """
+        sink = app.config["CACHE_METRICS_SINK"]
+        if sink is not None:
+            if isinstance(sink, string_types):
+                sink = sinks[sink] if sink in sinks else import_string(sink)
+            sink = sink(app)
+        backend = app.extensions["cache"][self.cache]
+        self.profiler = None
+        if app.config["CACHE_PROFILER"]:
+            self.profiler = KeyProfiler(
+                backend,
+                top_k=app.config["CACHE_PROFILER_TOP_K"],
+                sample_rate=app.config["CACHE_PROFILER_SAMPLE_RATE"],
+                flush_interval=app.config["CACHE_PROFILER_FLUSH_INTERVAL"],
+            )
+        if sink is not None or self.profiler is not None:
+            app.extensions["cache"][self.cache] = InstrumentedCache(
+                backend,
+                sink,
+                key_prefix=app.config["CACHE_KEY_PREFIX"],
+                profiler=self.profiler,
+                max_prefixes=app.config["CACHE_METRICS_MAX_PREFIXES"],
+            )
+        return sink
+
+    def init_request_memoization(self, app):
+        """Memoize the values read in the request contexts, if enabled."""
+        if not app.config["CACHE_REQUEST_MEMOIZATION"]:
+            return
+        backend = RequestCache(
+            app.extensions["cache"][self.cache],
+            max_size=app.config["CACHE_REQUEST_MEMOIZATION_MAX_SIZE"],
+        )
+        app.extensions["cache"][self.cache] = backend
+        app.teardown_appcontext(backend.teardown)
 
     def init_config(self, app):
         """Initialize configuration."""
@@ -55,3 +266,18 @@ def _callback_factory(callback_imp):
         return import_string(callback_imp)
     else:
         return callback_imp
+
+
+def _locale_callback_factory(callback_imp):
+    """Factory for creating a locale callback."""
+    if callback_imp is None:
+        try:
+            from flask_babel import get_locale
+
+            return lambda: str(get_locale())
+        except ImportError:
+            return lambda: request.accept_languages.best
+    elif isinstance(callback_imp, string_types):
+        return import_string(callback_imp)
+    else:
+        return callback_imp
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Invalidation of in-process caches across workers.
+
+In-process caches (e.g. the L1 of :class:`invenio_cache.backends.TwoTierCache`)
+are not aware of writes made by other workers. When an invalidation transport
+is configured, every write through ``current_cache`` publishes the written
+keys, and every worker drops its local copies of them:
+
+.. code-block:: python
+
+    CACHE_INVALIDATION_TRANSPORT = "invenio_cache.invalidation.RedisTransport"
+
+Other in-process caches can subscribe to the invalidations with
+``current_cache_ext.invalidator.subscribe(callback)``.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+import weakref
+
+from flask import current_app
+
+
+class InvalidationTransport(object):
+    """Base class of the transports broadcasting invalidation messages."""
+
+    def publish(self, message):
+        """Broadcast a message to all the subscribers, including this one."""
+        raise NotImplementedError
+
+    def subscribe(self, callback):
+        """Call ``callback(message)`` for each message broadcast."""
+        raise NotImplementedError
+
+    def after_fork(self):
+        """Resume receiving messages in a forked process."""
+
+    def close(self):
+        """Stop receiving messages."""
+
+
+class InMemoryTransport(InvalidationTransport):
+    """Transport delivering messages to the subscribers of the same process.
+
+    It is meant for tests and single-process deployments.
+    """
+
+    def __init__(self, app=None):
+        """Initialize the transport."""
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def publish(self, message):
+        """Deliver a message synchronously to all the subscribers."""
+        with self._lock:
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback(message)
+
+    def subscribe(self, callback):
+        """Add a subscriber."""
+        with self._lock:
+            self._callbacks.append(callback)
+
+    def close(self):
+        """Remove all the subscribers."""
+        with self._lock:
+            self._callbacks.clear()
+
+
+class RedisTransport(InvalidationTransport):
+    """Transport using Redis pub/sub.
+
+    Messages are received in a background thread, holding a connection of the
+    pool of the client.
+    """
+
+    def __init__(self, app=None, client=None, channel=None):
+        """Initialize the transport.
+
+        :param app: The application, configuring the channel, and the Redis
+            client: the shared client of ``CACHE_REDIS_URL`` (see
+            :mod:`invenio_cache.clients`).
+        :param client: A Redis client, instead of the shared one.
+        :param channel: The channel, instead of the configured one.
+        """
+        if client is None:
+            client = app.extensions["invenio-cache"].redis_clients.get()
+        self.client = client
+        self.channel = channel or app.config["CACHE_INVALIDATION_CHANNEL"]
+        self.logger = app.logger if app is not None else logging.getLogger(__name__)
+        self._callbacks = []
+        self._thread = None
+
+    def publish(self, message):
+        """Publish a message on the channel."""
+        self.client.publish(self.channel, message)
+
+    def subscribe(self, callback):
+        """Add a subscriber, and start listening to the channel if needed."""
+        self._callbacks.append(callback)
+        if self._thread is None:
+            self._start()
+
+    def _receive(self, message):
+        """Dispatch a message received from Redis.
+
+        Errors are logged, as they would stop the thread receiving the
+        messages.
+        """
+        for callback in self._callbacks:
+            try:
+                callback(message["data"])
+            except Exception:
+                self.logger.exception("Failed to handle cache invalidation.")
+
+    def _start(self):
+        """Start listening to the channel in a background thread."""
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{self.channel: self._receive})
+        self._thread = pubsub.run_in_thread(sleep_time=1, daemon=True)
+
+    def after_fork(self):
+        """Start listening again in a forked process (threads are not copied)."""
+        if self._thread is not None:
+            self._start()
+
+    def close(self):
+        """Stop listening to the channel."""
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+
+
+def _register_after_fork(invalidator):
+    """Reset the invalidator in the forked processes while it is alive."""
+    ref = weakref.ref(invalidator)
+
+    def after_fork():
+        invalidator = ref()
+        if invalidator is not None:
+            invalidator.after_fork()
+
+    os.register_at_fork(after_in_child=after_fork)
+
+
+class Invalidator(object):
+    """Publish and dispatch invalidations of cache keys."""
+
+    def __init__(self, transport):
+        """Initialize the invalidator and subscribe it to the transport.
+
+        :param transport: The :class:`InvalidationTransport`.
+        """
+        self.transport = transport
+        # Identifies the messages sent by this process, which already
+        # invalidated its own copies.
+        self.node_id = uuid.uuid4().hex
+        self._callbacks = []
+        transport.subscribe(self._receive)
+        _register_after_fork(self)
+
+    def after_fork(self):
+        """Reset the invalidator in a forked process (e.g. a uWSGI worker)."""
+        self.node_id = uuid.uuid4().hex
+        self.transport.after_fork()
+
+    def subscribe(self, callback):
+        """Call ``callback(keys, prefix)`` on invalidations from other workers.
+
+        ``keys`` is a list of invalidated keys, and ``prefix`` a prefix of
+        invalidated keys (``""`` for all of them) or ``None``.
+        """
+        self._callbacks.append(callback)
+
+    def invalidate(self, *keys, prefix=None):
+        """Publish the invalidation of keys, or of all keys with a prefix."""
+        message = {"node": self.node_id, "keys": keys, "prefix": prefix}
+        try:
+            self.transport.publish(json.dumps(message))
+        except Exception:
+            # Other workers keep their copies until they expire
+            current_app.logger.exception("Failed to publish cache invalidation.")
+
+    def _receive(self, message):
+        """Dispatch an invalidation message to the subscribers."""
+        if isinstance(message, bytes):
+            message = message.decode("utf-8")
+        message = json.loads(message)
+        if message["node"] == self.node_id:
+            return
+        for callback in self._callbacks:
+            callback(message["keys"], message["prefix"])
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Batching of the cache reads.
+
+Views reading many independent keys can defer the reads, and get all the
+values in a single ``get_many`` when the first one is needed:
+
+.. code-block:: python
+
+    from invenio_cache.proxies import current_cache_loader
+
+    handles = [current_cache_loader.defer(f"fragment::{id}") for id in ids]
+    # a single round trip
+    fragments = [handle.get() for handle in handles]
+
+The keys deferred in an application context (i.e. in a request) are batched
+together, whatever the code deferring them.
+"""
+
+_pending = object()
+
+
+class DeferredValue(object):
+    """Lazy handle on the value of a cache key."""
+
+    __slots__ = ("loader", "key", "_value")
+
+    def __init__(self, loader, key):
+        """Initialize the handle."""
+        self.loader = loader
+        self.key = key
+        self._value = _pending
+
+    @property
+    def resolved(self):
+        """Whether the value was read."""
+        return self._value is not _pending
+
+    def get(self):
+        """Get the value, reading all the pending keys if needed."""
+        if self._value is _pending:
+            self.loader.flush()
+        return self._value
+
+    def __repr__(self):
+        """Handle representation."""
+        state = repr(self._value) if self.resolved else "pending"
+        return f"<DeferredValue {self.key!r}: {state}>"
+
+
+class CacheLoader(object):
+    """Batch of cache reads, flushed with a single ``get_many``."""
+
+    def __init__(self, cache):
+        """Initialize the loader.
+
+        :param cache: The cache, e.g. ``current_cache``.
+        """
+        self.cache = cache
+        # handles to resolve, by key
+        self._pending = {}
+
+    def defer(self, key):
+        """Defer the read of a key.
+
+        :returns: A :class:`DeferredValue`, shared by the deferred reads of
+            the key until it is resolved.
+        """
+        handle = self._pending.get(key)
+        if handle is None:
+            handle = self._pending[key] = DeferredValue(self, key)
+        return handle
+
+    def defer_many(self, *keys):
+        """Defer the reads of keys, returning their handles."""
+        return [self.defer(key) for key in keys]
+
+    def flush(self):
+        """Read the values of all the pending keys in a single call."""
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            values = self.cache.get_many(*pending)
+        except Exception:
+            # the handles are resolved by the next flush
+            for key, handle in pending.items():
+                self._pending.setdefault(key, handle)
+            raise
+        for handle, value in zip(pending.values(), values):
+            handle._value = value
+
+    def __len__(self):
+        """Number of pending keys."""
+        return len(self._pending)
@@ -6,11 +6,16 @@
 # it under the terms of the MIT License; see LICENSE file for more details.
 """Lock mechanisms."""
 
-
+import math
+import random
+import threading
+import time
+import uuid
 from datetime import datetime
 
 from flask import current_app
 
+from invenio_cache.backends import unmemoized
 from invenio_cache.errors import (
     LockAcquireFailed,
     LockReleaseFailed,
@@ -92,6 +97,247 @@ class Lock:
         return f"<Lock {self.lock_id}>"
 
 
+class Backoff:
+    """Jittered exponential backoff between attempts to acquire a lock.
+
+    The delay before a new attempt is drawn uniformly between zero and an
+    exponentially growing cap ("full jitter"), so that contending callers do
+    not retry in lockstep.
+    """
+
+    def __init__(self, initial=0.01, maximum=1.0, multiplier=2.0):
+        """Initialises the backoff.
+
+        :param initial: cap of the first delay, in seconds.
+        :type initial: float
+        :param maximum: maximum delay, in seconds.
+        :type maximum: float
+        :param multiplier: growth factor of the cap after each attempt.
+        :type multiplier: float
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.multiplier = multiplier
+
+    def delay(self, attempt):
+        """Returns the delay after a failed attempt.
+
+        :param attempt: number of the failed attempt, starting at 1.
+        :type attempt: int
+        """
+        cap = min(self.maximum, self.initial * self.multiplier ** (attempt - 1))
+        return random.uniform(0, cap)
+
+
+# Deletes the lock only if it holds the owner token.
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+# Sets the lock timeout only if it holds the owner token (0 means no timeout).
+_RENEW_SCRIPT = """
+if redis.call("get", KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+if tonumber(ARGV[2]) > 0 then
+    redis.call("expire", KEYS[1], ARGV[2])
+else
+    redis.call("persist", KEYS[1])
+end
+return 1
+"""
+
+# Sets all the locks if none of them exists, returns the indexes of the existing ones.
+_MULTI_ACQUIRE_SCRIPT = """
+local contended = {}
+for i, key in ipairs(KEYS) do
+    if redis.call("exists", key) == 1 then
+        table.insert(contended, i)
+    end
+end
+if #contended > 0 then
+    return contended
+end
+for _, key in ipairs(KEYS) do
+    if tonumber(ARGV[2]) > 0 then
+        redis.call("set", key, ARGV[1], "EX", ARGV[2])
+    else
+        redis.call("set", key, ARGV[1])
+    end
+end
+return contended
+"""
+
+# Deletes the locks holding the owner token, returns their number.
+_MULTI_RELEASE_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call("get", key) == ARGV[1] then
+        redis.call("del", key)
+        released = released + 1
+    end
+end
+return released
+"""
+
+# Sets the timeout of the locks holding the owner token, returns their number.
+_MULTI_RENEW_SCRIPT = """
+local renewed = 0
+for _, key in ipairs(KEYS) do
+    if redis.call("get", key) == ARGV[1] then
+        if tonumber(ARGV[2]) > 0 then
+            redis.call("expire", key, ARGV[2])
+        else
+            redis.call("persist", key)
+        end
+        renewed = renewed + 1
+    end
+end
+return renewed
+"""
+
+# Adds ARGV[1] to a counter, without going below 0, and extends its timeout to at least
+# ARGV[2] seconds (0 for no timeout). Returns the new value of the counter.
+_INCR_SCRIPT = """
+local ttl = redis.call("pttl", KEYS[1])
+local value = redis.call("incrby", KEYS[1], ARGV[1])
+if value < 0 then
+    redis.call("incrby", KEYS[1], -value)
+    value = 0
+end
+local timeout = tonumber(ARGV[2]) * 1000
+if timeout == 0 then
+    redis.call("persist", KEYS[1])
+elseif ttl == -2 or (ttl >= 0 and ttl < timeout) then
+    redis.call("pexpire", KEYS[1], timeout)
+end
+return value
+"""
+
+# Serializes the compare-and-set operations on backends without scripting.
+_fallback_lock = threading.Lock()
+
+
+class _Heartbeat(threading.Thread):
+    """Background thread renewing the lease of a lock while it is held."""
+
+    def __init__(self, lock, app):
+        """Initialises the heartbeat of a lock.
+
+        :param lock: the lock to renew.
+        :type lock: CachedMutex
+        :param app: the application, whose context is pushed in the thread.
+        """
+        super().__init__(name=f"lock-heartbeat-{lock.lock_id}", daemon=True)
+        self.lock = lock
+        self.app = app
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Renews the lease every ``heartbeat_interval`` seconds until stopped."""
+        lock = self.lock
+        with self.app.app_context():
+            while not self._stopped.wait(lock.heartbeat_interval):
+                # Not renewed concurrently with a release, which would recreate it
+                with lock._held_lock:
+                    if not lock._held:
+                        continue
+                    try:
+                        lock.acquire_or_renew(lock.lease)
+                    except LockRenewPermissionDenied:
+                        # The lease expired and the lock was acquired by someone else
+                        lock._held = False
+                        lock.lost = True
+                        current_app.logger.warning(
+                            f"Lost the lease of lock {lock.lock_id}."
+                        )
+                    except Exception:
+                        # Already logged, retried at the next beat
+                        pass
+
+    def stop(self):
+        """Stops renewing the lease and waits for the thread to finish."""
+        self._stopped.set()
+        self.join()
+
+
+def _uncached(cache):
+    """Returns the backend of a cache, without the memoization of the reads.
+
+    The locks read values changed by other requests.
+    """
+    return unmemoized(cache.cache)
+
+
+def _redis_backend(cache):
+    """Returns the Redis backend of a cache, ``None`` for other backends."""
+    backend = _uncached(cache)
+    # the L2 of a two-tier cache
+    backend = getattr(backend, "l2", backend)
+    if getattr(backend, "_write_client", None) is None:
+        return None
+    return backend
+
+
+def _written(cache, *keys):
+    """Drops the in-process copies of keys written by a script on the L2.
+
+    With a two-tier cache, the copies in the L1 of this process and of the others (see
+    :mod:`invenio_cache.invalidation`) would be stale until they expire.
+    """
+    backend = _uncached(cache)
+    l1 = getattr(backend, "l1", None)
+    if l1 is None:
+        return
+    for key in keys:
+        l1.delete(key)
+    backend._invalidate(*keys)
+
+
+def _incr(cache, key, delta, timeout):
+    """Atomically adds ``delta`` to a counter and extends its timeout.
+
+    The counter does not go below 0, and its timeout is only ever extended: it expires
+    ``timeout`` seconds after now at the earliest, or never if ``timeout`` is ``0`` or
+    ``None``.
+
+    :returns: the new value of the counter.
+    :rtype: int
+    """
+    backend = _redis_backend(cache)
+    if backend is not None:
+        name = backend._get_prefix() + key
+        value = backend._write_client.eval(_INCR_SCRIPT, 1, name, delta, timeout or 0)
+        _written(cache, key)
+        return value
+
+    expires_key = f"{key}::expires"
+    with _fallback_lock:
+        backend = _uncached(cache)
+        value = backend.get(key)
+        # expiration time of the counter, 0 if it never expires
+        expires = backend.get(expires_key) if value is not None else None
+        value = max((value or 0) + delta, 0)
+        now = time.time()
+        if not timeout or expires == 0:
+            expires = 0
+        else:
+            expires = max(expires or 0, now + timeout)
+        ttl = max(math.ceil(expires - now), 1) if expires else 0
+        cache.set_many({key: value, expires_key: expires}, timeout=ttl)
+        return value
+
+
+def _counter(cache, key):
+    """Returns the value of a counter, read from Redis when possible."""
+    # not from the L1 of a two-tier cache or the memo, which may be stale
+    backend = _redis_backend(cache) or _uncached(cache)
+    return backend.get(key) or 0
+
+
 class CachedMutex(Lock):
     """Implements a Mutex using CacheLib API.
 
@@ -99,28 +345,122 @@ class CachedMutex(Lock):
     the lock is to be deleted.
     This mechanism is based on the principle that the desired cache's backend provides an atomic
     write operation (e.g. "write if not exists").
+
+    The key holds a token identifying the owner of the lock, so that a lock can only be
+    released or renewed by its owner, even after it expired and was acquired by someone else.
+    On Redis, the comparison and the deletion or renewal are made atomically by a script.
+    On other backends, they are only atomic within a process.
+
+    For long-held locks, a ``lease`` can be given. Used as a context manager, the lock is
+    acquired for at most ``lease`` seconds, and a background thread renews it for
+    ``lease`` seconds every ``heartbeat_interval`` seconds while it is held. A lock whose
+    holder crashed clears within ``lease`` seconds, whatever the timeout given to
+    ``acquire``:
+
+    .. code-block:: python
+
+        with CachedMutex(lock_id, lease=30) as lock:
+            lock.acquire(timeout=3600)
+            reindex()
     """
 
     _cache = current_cache
 
-    def acquire(self, timeout):
+    def __init__(self, lock_id, token=None, lease=None):
+        """Initialises the lock instance.
+
+        :param lock_id: id of the lock.
+        :type lock_id: str
+        :param token: owner token, to share the lock with another context. A new token is
+            generated by default.
+        :type token: str
+        :param lease: timeout, in seconds, the lock is renewed with by the heartbeat.
+            ``None`` disables the heartbeat.
+        :type lease: int
+        """
+        super().__init__(lock_id)
+        self.token = token or uuid.uuid4().hex
+        self.lease = lease
+        # Interval, in seconds, between renewals of the lease
+        self.heartbeat_interval = lease / 3 if lease else None
+        self._held = False
+        self._held_lock = threading.Lock()
+        self._heartbeat = None
+
+    lost = False
+    """Whether the lease expired and the lock was acquired by someone else."""
+
+    default_backoff = Backoff()
+    """Backoff used by blocking ``acquire`` calls."""
+
+    attempts = 0
+    """Number of attempts made by the last ``acquire`` call."""
+
+    wait_time = 0
+    """Time in seconds spent by the last ``acquire`` call."""
+
+    def acquire(self, timeout, blocking=False, wait_timeout=None, backoff=None):
         """Attempts to acquire the lock.
 
         The method to adcquire the lock must be atomic.
 
         If an error occurred with the backend, the exception is logged and re-raised.
-        If the lock was not released, a ``LockReleaseFailed`` exception is raised.
+        If the lock was not acquired, a ``LockAcquireFailed`` exception is raised.
+
+        When ``blocking``, failed attempts are retried after a jittered exponential
+        backoff, until the lock is acquired or ``wait_timeout`` is elapsed.
+        The number of attempts and the time spent are available in ``attempts`` and
+        ``wait_time``.
 
         :returns: ``True`` if the lock was acquired, ``False`` otherwise .
         :rtype: boolean
         :param timeout: lock key timeout.
         :type timeout: int
-        :raises: Exception, LockReleaseFailed
+        :param blocking: whether to wait for the lock to be released.
+        :type blocking: bool
+        :param wait_timeout: maximum time to wait, in seconds. ``None`` waits forever.
+        :type wait_timeout: float
+        :param backoff: backoff between attempts, ``default_backoff`` if ``None``.
+        :type backoff: Backoff
+        :raises: Exception, LockAcquireFailed
+        """
+        if self._heartbeat is not None:
+            # Renewed by the heartbeat while held
+            timeout = min(timeout, self.lease) if timeout else self.lease
+        backoff = backoff or self.default_backoff
+        start = time.monotonic()
+        self.attempts = 0
+        while True:
+            self.attempts += 1
+            success = self._try_acquire(timeout)
+            if success or not blocking:
+                break
+
+            delay = backoff.delay(self.attempts)
+            if wait_timeout is not None:
+                remaining = wait_timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+            time.sleep(delay)
+        self.wait_time = time.monotonic() - start
+
+        if not success:
+            raise LockAcquireFailed(self)
+
+        self._held = True
+        return success
+
+    def _try_acquire(self, timeout):
+        """Makes a single attempt to acquire the lock.
+
+        :returns: ``True`` if the lock was acquired, ``False`` otherwise .
+        :rtype: boolean
+        :raises: Exception
         """
-        success = False
         try:
             # Atomic operation to get the lock
-            success = self._cache.add(self.lock_id, True, timeout=timeout)
+            return self._cache.add(self.lock_id, self.token, timeout=timeout)
         except:
             # Unexpected error with the cache, we just log it and re-raise
             current_app.logger.error(
@@ -128,11 +468,6 @@ class CachedMutex(Lock):
             )
             raise
 
-        if not success:
-            raise LockAcquireFailed(self)
-
-        return success
-
     def release(self):
         """Attempts to release the lock.
 
@@ -144,20 +479,36 @@ class CachedMutex(Lock):
         :raises: Exception, LockReleaseFailed
         """
         success = False
-        try:
-            success = self._cache.delete(self.lock_id)
-        except:
-            # Unexpected error with the cache, we just log it and re-raise
-            current_app.logger.error(
-                f"Unexpected backend failure when releasing lock {self.lock_id}."
-            )
-            raise
+        with self._held_lock:
+            self._held = False
+            try:
+                success = self._compare_and_delete()
+            except:
+                # Unexpected error with the cache, we just log it and re-raise
+                current_app.logger.error(
+                    f"Unexpected backend failure when releasing lock {self.lock_id}."
+                )
+                raise
 
         if not success:
             raise LockReleaseFailed(self)
 
         return success
 
+    def __enter__(self):
+        """Entering the context, starts the heartbeat when a lease is given."""
+        if self.lease:
+            self._heartbeat = _Heartbeat(self, current_app._get_current_object())
+            self._heartbeat.start()
+        return self
+
+    def __exit__(self, exc_type, *args):
+        """Stops the heartbeat and releases the lock."""
+        if self._heartbeat is not None:
+            self._heartbeat.stop()
+            self._heartbeat = None
+        super().__exit__(exc_type, *args)
+
     def exists(self):
         """Checks if the lock exists.
 
@@ -177,12 +528,47 @@ class CachedMutex(Lock):
             raise
         return exists
 
-    def _has_permission(self):
-        """Whether the current lock instance has permission on the physical lock.
+    def _compare_and_delete(self):
+        """Deletes the lock if it holds the owner token.
 
-        It is empty for now as it may be needed in the future when locks should be "shared" between contexts.
+        :returns: ``True`` if the lock was deleted, ``False`` otherwise.
+        :rtype: bool
         """
-        return True
+        backend = _redis_backend(self._cache)
+        if backend is not None:
+            key = backend._get_prefix() + self.lock_id
+            token = backend.serializer.dumps(self.token)
+            released = bool(backend._write_client.eval(_RELEASE_SCRIPT, 1, key, token))
+            if released:
+                _written(self._cache, self.lock_id)
+            return released
+
+        with _fallback_lock:
+            if _uncached(self._cache).get(self.lock_id) != self.token:
+                return False
+            return self._cache.delete(self.lock_id)
+
+    def _compare_and_extend(self, timeout):
+        """Sets the lock timeout if it holds the owner token.
+
+        :returns: ``True`` if the lock was renewed, ``False`` otherwise.
+        :rtype: bool
+        """
+        backend = _redis_backend(self._cache)
+        if backend is not None:
+            key = backend._get_prefix() + self.lock_id
+            token = backend.serializer.dumps(self.token)
+            renewed = bool(
+                backend._write_client.eval(_RENEW_SCRIPT, 1, key, token, timeout)
+            )
+            if renewed:
+                _written(self._cache, self.lock_id)
+            return renewed
+
+        with _fallback_lock:
+            if _uncached(self._cache).get(self.lock_id) != self.token:
+                return False
+            return self._cache.set(self.lock_id, self.token, timeout=timeout)
 
     def acquire_or_renew(self, timeout):
         """Attempts to acquire the lock. If not possible, renews its timeout.
@@ -191,7 +577,7 @@ class CachedMutex(Lock):
 
         .. note::
 
-            This method requires that the caller has the necessary permission.
+            This method requires that the caller owns the lock, i.e. has the same token.
 
         .. warning::
 
@@ -202,23 +588,429 @@ class CachedMutex(Lock):
         :raises: Exception, LockAcquireFailed, LockRenewPermissionDenied
         """
         success = False
-        if not self._has_permission():
-            raise LockRenewPermissionDenied(self)
-
         # Overwrites previous timeout. If it didn't exist, the lock is created.
         try:
             success = self.acquire(timeout=timeout)
         except LockAcquireFailed:
-            # Renew the lock if it already existed before
-            success = self._cache.set(self.lock_id, True, timeout)
+            # Renew the lock if it already existed before, and is owned by this instance
+            try:
+                success = self._compare_and_extend(timeout)
+            except:
+                # Unexpected error with the cache, we just log it and re-raise
+                current_app.logger.error(
+                    f"Unexpected backend failure when renewing lock {self.lock_id}."
+                )
+                raise
+            if not success:
+                raise LockRenewPermissionDenied(self)
+
+        return success
+
+
+class CachedSemaphore(CachedMutex):
+    """Implements a counting semaphore using CacheLib API.
+
+    The semaphore can be held by at most ``n`` owners at the same time. It is made of ``n``
+    slots, each being a :class:`CachedMutex`, and acquiring the semaphore acquires the first
+    free slot. Slots are tried from a random one, to spread the contention.
+    """
+
+    def __init__(self, lock_id, n, token=None, lease=None):
+        """Initialises the semaphore instance.
+
+        :param lock_id: id of the semaphore.
+        :type lock_id: str
+        :param n: maximum number of owners.
+        :type n: int
+        :param token: owner token, see :class:`CachedMutex`.
+        :type token: str
+        :param lease: lease renewed by the heartbeat, see :class:`CachedMutex`.
+        :type lease: int
+        """
+        super().__init__(lock_id, token=token, lease=lease)
+        self.n = n
+        self.slots = [
+            CachedMutex(f"{lock_id}::{i}", token=self.token) for i in range(n)
+        ]
+        self._slot = None
+
+    def _try_acquire(self, timeout):
+        """Makes a single attempt to acquire a free slot.
+
+        :returns: ``True`` if a slot was acquired, ``False`` otherwise .
+        :rtype: boolean
+        :raises: Exception
+        """
+        if self._slot is not None:
+            # Only the held slot, as for a mutex acquired twice
+            return self._slot._try_acquire(timeout)
+
+        start = random.randrange(self.n)
+        for slot in self.slots[start:] + self.slots[:start]:
+            if slot._try_acquire(timeout):
+                self._slot = slot
+                return True
+        return False
+
+    def _compare_and_delete(self):
+        """Releases the held slot.
+
+        :returns: ``True`` if the slot was released, ``False`` otherwise.
+        :rtype: bool
+        """
+        slot, self._slot = self._slot, None
+        if slot is None:
+            return False
+        return slot._compare_and_delete()
+
+    def _compare_and_extend(self, timeout):
+        """Sets the timeout of the held slot.
+
+        :returns: ``True`` if the slot was renewed, ``False`` otherwise.
+        :rtype: bool
+        """
+        if self._slot is None:
+            return False
+        return self._slot._compare_and_extend(timeout)
+
+    def exists(self):
+        """Checks if the semaphore is held by anyone.
+
+        :return: ``True`` if any slot is held, ``False`` otherwise.
+        :rtype: bool
+        :raises: Exception
+        """
+        try:
+            values = _uncached(self._cache).get_many(
+                *[slot.lock_id for slot in self.slots]
+            )
         except:
             # Unexpected error with the cache, we just log it and re-raise
             current_app.logger.error(
-                f"Unexpected backend failure when releasing lock {self.lock_id}."
+                f"Unexpected backend failure when checking semaphore {self.lock_id}."
             )
             raise
+        return any(value is not None for value in values)
 
-        if not success:
-            raise LockAcquireFailed(self)
+    def __repr__(self):
+        """Semaphore string representation."""
+        return f"<CachedSemaphore {self.lock_id} ({self.n})>"
+
+
+class CachedRWLock(CachedMutex):
+    """Implements a reader/writer lock using CacheLib API.
+
+    The lock is held either by any number of readers, or by a single writer:
+
+    .. code-block:: python
+
+        with CachedRWLock(lock_id) as lock:
+            lock.acquire(timeout=60)
+            read()
 
+        with CachedRWLock(lock_id, write=True) as lock:
+            lock.acquire(timeout=60, blocking=True)
+            write()
+
+    A writer first acquires a writer key, which prevents new readers from acquiring the
+    lock, then waits for the current readers to release it. The readers are counted with
+    the atomic increments of the backend. As a counter has no owner, the count of a reader
+    that crashed is only cleared when the counter expires: its timeout is extended by the
+    readers acquiring or renewing the lock, and never shortened, so it expires when the
+    lock of the last reader would.
+    """
+
+    def __init__(self, lock_id, write=False, token=None, lease=None):
+        """Initialises the lock instance.
+
+        :param lock_id: id of the lock.
+        :type lock_id: str
+        :param write: whether to acquire the lock as a writer, instead of a reader.
+        :type write: bool
+        :param token: owner token of the writer, see :class:`CachedMutex`.
+        :type token: str
+        :param lease: lease renewed by the heartbeat, see :class:`CachedMutex`.
+        :type lease: int
+        """
+        super().__init__(lock_id, token=token, lease=lease)
+        self.write = write
+        self._writer = CachedMutex(f"{lock_id}::writer", token=self.token)
+        self._readers_id = f"{lock_id}::readers"
+        self._reading = False
+        self._timeout = None
+        self._writer_pending = False
+
+    def acquire(self, timeout, **kwargs):
+        """Attempts to acquire the lock, see :meth:`CachedMutex.acquire`.
+
+        When ``blocking``, a writer keeps new readers out while it waits for the current
+        ones.
+        """
+        success = False
+        try:
+            success = super().acquire(timeout, **kwargs)
+        finally:
+            if not success and self._writer_pending:
+                # Let the readers in again
+                self._writer_pending = False
+                self._writer._compare_and_delete()
         return success
+
+    def _try_acquire(self, timeout):
+        """Makes a single attempt to acquire the lock.
+
+        :returns: ``True`` if the lock was acquired, ``False`` otherwise .
+        :rtype: boolean
+        :raises: Exception
+        """
+        if self.write:
+            if not self._writer_pending:
+                if not self._writer._try_acquire(timeout):
+                    return False
+                self._writer_pending = True
+            if self._readers() > 0:
+                return False
+            self._writer_pending = False
+            return True
+
+        if self._reading:
+            # As for a mutex acquired twice
+            return False
+        try:
+            if self._cache.has(self._writer.lock_id):
+                return False
+            _incr(self._cache, self._readers_id, 1, timeout)
+            # A writer may have come in the meantime, it is waiting for this reader
+            if self._cache.has(self._writer.lock_id):
+                _incr(self._cache, self._readers_id, -1, timeout)
+                return False
+            self._timeout = timeout
+        except:
+            # Unexpected error with the cache, we just log it and re-raise
+            current_app.logger.error(
+                f"Unexpected backend failure when acquiring lock {self.lock_id}."
+            )
+            raise
+        self._reading = True
+        return True
+
+    def _readers(self):
+        """Returns the number of readers holding the lock."""
+        return _counter(self._cache, self._readers_id)
+
+    def _compare_and_delete(self):
+        """Releases the lock held as a writer or a reader.
+
+        :returns: ``True`` if the lock was released, ``False`` otherwise.
+        :rtype: bool
+        """
+        if self.write:
+            return self._writer._compare_and_delete()
+        if not self._reading:
+            return False
+        self._reading = False
+        _incr(self._cache, self._readers_id, -1, self._timeout)
+        return True
+
+    def _compare_and_extend(self, timeout):
+        """Sets the timeout of the lock held as a writer or a reader.
+
+        :returns: ``True`` if the lock was renewed, ``False`` otherwise.
+        :rtype: bool
+        """
+        if self.write:
+            return self._writer._compare_and_extend(timeout)
+        if not self._reading:
+            return False
+        self._timeout = timeout
+        _incr(self._cache, self._readers_id, 0, timeout)
+        return True
+
+    def exists(self):
+        """Checks if the lock is held by a writer or by readers.
+
+        :return: ``True`` if the lock is held, ``False`` otherwise.
+        :rtype: bool
+        :raises: Exception
+        """
+        try:
+            return self._writer.exists() or self._readers() > 0
+        except:
+            # Unexpected error with the cache, we just log it and re-raise
+            current_app.logger.error(
+                f"Unexpected backend failure when checking lock {self.lock_id}."
+            )
+            raise
+
+    def __repr__(self):
+        """Lock string representation."""
+        mode = "write" if self.write else "read"
+        return f"<CachedRWLock {self.lock_id} ({mode})>"
+
+
+class MultiLock(CachedMutex):
+    """Implements the all-or-nothing acquisition of many mutexes.
+
+    The locks are compatible with :class:`CachedMutex` instances of the same ids. They are
+    acquired, released and renewed in a single backend operation:
+
+    .. code-block:: python
+
+        lock = MultiLock(record_ids)
+        try:
+            lock.acquire(timeout=60)
+        except LockAcquireFailed:
+            retry_later(lock.contended)
+
+    On Redis, each operation is made atomically by a script (with Redis Cluster, the ids
+    must be in the same hash slot). On other backends, an operation reads the locks with a
+    ``get_many`` and writes them with a ``set_many`` or a ``delete_many``, which is only
+    atomic within a process.
+    """
+
+    def __init__(self, lock_ids, token=None, lease=None):
+        """Initialises the lock instance.
+
+        :param lock_ids: ids of the locks.
+        :type lock_ids: list
+        :param token: owner token, see :class:`CachedMutex`.
+        :type token: str
+        :param lease: lease renewed by the heartbeat, see :class:`CachedMutex`.
+        :type lease: int
+        """
+        super().__init__(tuple(lock_ids), token=token, lease=lease)
+        self.lock_ids = self.lock_id
+
+    contended = ()
+    """Ids of the locks held by others at the last attempt to acquire the locks."""
+
+    def _try_acquire(self, timeout):
+        """Makes a single attempt to acquire all the locks.
+
+        :returns: ``True`` if the locks were acquired, ``False`` otherwise .
+        :rtype: boolean
+        :raises: Exception
+        """
+        try:
+            self.contended = self._acquire_many(timeout)
+        except:
+            # Unexpected error with the cache, we just log it and re-raise
+            current_app.logger.error(
+                f"Unexpected backend failure when acquiring {len(self.lock_ids)} locks."
+            )
+            raise
+        return not self.contended
+
+    def _acquire_many(self, timeout):
+        """Sets all the locks if none of them exists.
+
+        :returns: the ids of the existing locks.
+        :rtype: list
+        """
+        backend = _redis_backend(self._cache)
+        if backend is not None:
+            prefix = backend._get_prefix()
+            indexes = backend._write_client.eval(
+                _MULTI_ACQUIRE_SCRIPT,
+                len(self.lock_ids),
+                *[prefix + lock_id for lock_id in self.lock_ids],
+                backend.serializer.dumps(self.token),
+                backend._normalize_timeout(timeout),
+            )
+            if not indexes:
+                _written(self._cache, *self.lock_ids)
+            return [self.lock_ids[i - 1] for i in indexes]
+
+        with _fallback_lock:
+            values = _uncached(self._cache).get_many(*self.lock_ids)
+            contended = [
+                lock_id
+                for lock_id, value in zip(self.lock_ids, values)
+                if value is not None
+            ]
+            if not contended:
+                mapping = dict.fromkeys(self.lock_ids, self.token)
+                self._cache.set_many(mapping, timeout=timeout)
+            return contended
+
+    def _owned(self):
+        """Returns the ids of the locks holding the owner token."""
+        values = _uncached(self._cache).get_many(*self.lock_ids)
+        return [
+            lock_id
+            for lock_id, value in zip(self.lock_ids, values)
+            if value == self.token
+        ]
+
+    def _compare_and_delete(self):
+        """Deletes the locks holding the owner token.
+
+        :returns: ``True`` if all the locks were deleted, ``False`` otherwise.
+        :rtype: bool
+        """
+        backend = _redis_backend(self._cache)
+        if backend is not None:
+            prefix = backend._get_prefix()
+            released = backend._write_client.eval(
+                _MULTI_RELEASE_SCRIPT,
+                len(self.lock_ids),
+                *[prefix + lock_id for lock_id in self.lock_ids],
+                backend.serializer.dumps(self.token),
+            )
+            if released:
+                _written(self._cache, *self.lock_ids)
+            return released == len(self.lock_ids)
+
+        with _fallback_lock:
+            owned = self._owned()
+            if owned:
+                self._cache.delete_many(*owned)
+            return len(owned) == len(self.lock_ids)
+
+    def _compare_and_extend(self, timeout):
+        """Sets the timeout of the locks holding the owner token.
+
+        :returns: ``True`` if all the locks were renewed, ``False`` otherwise.
+        :rtype: bool
+        """
+        backend = _redis_backend(self._cache)
+        if backend is not None:
+            prefix = backend._get_prefix()
+            renewed = backend._write_client.eval(
+                _MULTI_RENEW_SCRIPT,
+                len(self.lock_ids),
+                *[prefix + lock_id for lock_id in self.lock_ids],
+                backend.serializer.dumps(self.token),
+                backend._normalize_timeout(timeout),
+            )
+            if renewed:
+                _written(self._cache, *self.lock_ids)
+            return renewed == len(self.lock_ids)
+
+        with _fallback_lock:
+            owned = self._owned()
+            if owned:
+                mapping = dict.fromkeys(owned, self.token)
+                self._cache.set_many(mapping, timeout=timeout)
+            return len(owned) == len(self.lock_ids)
+
+    def exists(self):
+        """Checks if any of the locks exists.
+
+        :return: ``True`` if any lock exists, ``False`` otherwise.
+        :rtype: bool
+        :raises: Exception
+        """
+        try:
+            values = _uncached(self._cache).get_many(*self.lock_ids)
+        except:
+            # Unexpected error with the cache, we just log it and re-raise
+            current_app.logger.error(
+                f"Unexpected backend failure when checking {len(self.lock_ids)} locks."
+            )
+            raise
+        return any(value is not None for value in values)
+
+    def __repr__(self):
+        """Lock string representation."""
+        return f"<MultiLock {len(self.lock_ids)} locks>"
@@ -0,0 +1,512 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Instrumentation of the cache.
+
+When a sink is configured, the operations of ``current_cache`` on the cache
+backend are measured and recorded in the sink:
+
+.. code-block:: python
+
+    CACHE_METRICS_SINK = "memory"  # or "statsd", "prometheus", an import path
+
+For each operation and key prefix, the sinks record the number of calls, the
+hits and misses of the reads, the latency and the size of the serialized
+payloads read and written. The key prefix is the beginning of the key up to
+the first ``::`` or ``/`` (e.g. ``jinja::`` or ``view/``), after the
+``CACHE_KEY_PREFIX``. Batched operations are recorded under the prefix of their
+first key. Keys starting with an identifier would make a prefix each, so at
+most ``CACHE_METRICS_MAX_PREFIXES`` prefixes are recorded, and the keys of
+other prefixes are recorded under ``other``.
+
+The in-memory and Prometheus sinks aggregate the measures in the process,
+available with ``current_cache_ext.metrics.snapshot()``, and in the Prometheus
+text format with ``current_cache_ext.metrics.render()``. The StatsD sink sends
+them to a StatsD server, configured by ``CACHE_METRICS_STATSD_HOST``,
+``CACHE_METRICS_STATSD_PORT`` and ``CACHE_METRICS_STATSD_PREFIX``. Sending a
+datagram per operation costs more than aggregating in memory, and only a ratio
+of the operations can be sent with ``CACHE_METRICS_SAMPLE_RATE``.
+"""
+
+import bisect
+import random
+import re
+import socket
+import threading
+import time
+
+from cachelib.serializers import BaseSerializer
+from flask_caching.backends.base import BaseCache
+
+DURATION_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+"""Upper bounds of the latency histograms, in seconds."""
+
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+"""Upper bounds of the payload size histograms, in bytes."""
+
+_prefix_re = re.compile(r"::|/")
+
+
+class MetricsSink(object):
+    """Base class of the sinks of the cache metrics."""
+
+    def record(self, operation, prefix, duration, hits=0, misses=0, size=None):
+        """Record an operation.
+
+        :param operation: The name of the operation, e.g. ``"get"``.
+        :param prefix: The key prefix.
+        :param duration: The duration of the operation, in seconds.
+        :param hits: The number of values found by a read.
+        :param misses: The number of values not found by a read.
+        :param size: The size of the payloads read or written, if known.
+        """
+        raise NotImplementedError
+
+
+class _Series(object):
+    """Measures of an operation on a key prefix."""
+
+    __slots__ = ("calls", "hits", "misses", "durations", "duration_sum", "sizes")
+
+    def __init__(self):
+        """Initialize the series."""
+        self.calls = 0
+        self.hits = 0
+        self.misses = 0
+        # one bucket per bound, and one for the larger values
+        self.durations = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration_sum = 0.0
+        self.sizes = None
+
+
+class InMemorySink(MetricsSink):
+    """Sink aggregating the metrics in the process."""
+
+    def __init__(self, app=None):
+        """Initialize the sink."""
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation, prefix, duration, hits=0, misses=0, size=None):
+        """Record an operation."""
+        with self._lock:
+            series = self._series.get((operation, prefix))
+            if series is None:
+                series = self._series[(operation, prefix)] = _Series()
+            series.calls += 1
+            series.hits += hits
+            series.misses += misses
+            series.durations[bisect.bisect_left(DURATION_BUCKETS, duration)] += 1
+            series.duration_sum += duration
+            if size is not None:
+                if series.sizes is None:
+                    series.sizes = [0] * (len(SIZE_BUCKETS) + 2)
+                series.sizes[bisect.bisect_left(SIZE_BUCKETS, size)] += 1
+                # the last item is the sum of the sizes
+                series.sizes[-1] += size
+
+    def snapshot(self):
+        """Get the metrics, by operation and key prefix.
+
+        :returns: A dictionary of dictionaries with the number of ``calls``,
+            ``hits`` and ``misses``, the latency histogram ``durations`` (the
+            number of calls per bucket of :data:`DURATION_BUCKETS`, the last
+            one counting the slower calls) and their ``duration_sum``, and
+            the ``sizes`` histogram and ``size_sum`` of the payloads.
+        """
+        with self._lock:
+            metrics = {}
+            for (operation, prefix), series in self._series.items():
+                sizes = series.sizes or [0] * (len(SIZE_BUCKETS) + 2)
+                metrics.setdefault(operation, {})[prefix] = {
+                    "calls": series.calls,
+                    "hits": series.hits,
+                    "misses": series.misses,
+                    "durations": list(series.durations),
+                    "duration_sum": series.duration_sum,
+                    "sizes": sizes[:-1],
+                    "size_sum": sizes[-1],
+                }
+            return metrics
+
+    def hit_ratio(self, prefix=None):
+        """Get the ratio of the values found by the reads.
+
+        :param prefix: Only the reads of this key prefix. Default is all.
+        :returns: The ratio, or ``None`` if nothing was read.
+        """
+        with self._lock:
+            hits = misses = 0
+            for (_, series_prefix), series in self._series.items():
+                if prefix is None or series_prefix == prefix:
+                    hits += series.hits
+                    misses += series.misses
+        if not hits + misses:
+            return None
+        return hits / (hits + misses)
+
+    def reset(self):
+        """Drop the metrics."""
+        with self._lock:
+            self._series.clear()
+
+
+def _label(value):
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PrometheusSink(InMemorySink):
+    """In-memory sink, rendering the metrics in the Prometheus text format."""
+
+    namespace = "invenio_cache"
+
+    def render(self):
+        """Render the metrics in the Prometheus text exposition format."""
+        metrics = self.snapshot()
+        ns = self.namespace
+        lines = []
+        for name, field, help_ in (
+            ("operations_total", "calls", "Cache operations."),
+            ("hits_total", "hits", "Values found by the cache reads."),
+            ("misses_total", "misses", "Values not found by the cache reads."),
+        ):
+            lines.append(f"# HELP {ns}_{name} {help_}")
+            lines.append(f"# TYPE {ns}_{name} counter")
+            for operation, prefixes in sorted(metrics.items()):
+                for prefix, series in sorted(prefixes.items()):
+                    labels = f'operation="{operation}",prefix="{_label(prefix)}"'
+                    lines.append(f"{ns}_{name}{{{labels}}} {series[field]}")
+        for name, field, bounds, help_ in (
+            (
+                "operation_duration_seconds",
+                "duration",
+                DURATION_BUCKETS,
+                "Latency of the cache operations.",
+            ),
+            ("payload_bytes", "size", SIZE_BUCKETS, "Size of the cached payloads."),
+        ):
+            lines.append(f"# HELP {ns}_{name} {help_}")
+            lines.append(f"# TYPE {ns}_{name} histogram")
+            for operation, prefixes in sorted(metrics.items()):
+                for prefix, series in sorted(prefixes.items()):
+                    buckets = series[f"{field}s"]
+                    count = sum(buckets)
+                    if not count:
+                        continue
+                    labels = f'operation="{operation}",prefix="{_label(prefix)}"'
+                    cumulative = 0
+                    for bound, n in zip(bounds, buckets):
+                        cumulative += n
+                        lines.append(
+                            f'{ns}_{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                        )
+                    lines.append(f'{ns}_{name}_bucket{{{labels},le="+Inf"}} {count}')
+                    lines.append(
+                        f"{ns}_{name}_sum{{{labels}}} {series[field + '_sum']}"
+                    )
+                    lines.append(f"{ns}_{name}_count{{{labels}}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+class StatsDSink(MetricsSink):
+    """Sink sending the metrics to a StatsD server over UDP."""
+
+    def __init__(self, app=None, host=None, port=None, prefix=None, sample_rate=None):
+        """Initialize the sink.
+
+        :param app: The application, configuring the server, the prefix of
+            the metrics and the sample rate.
+        :param host: The host of the server, instead of the configured one.
+        :param port: The port of the server, instead of the configured one.
+        :param prefix: The prefix of the metrics, instead of the configured one.
+        :param sample_rate: The ratio of the operations sent, from 0 to 1,
+            instead of the configured one.
+        """
+        config = app.config if app else {}
+        self.address = (
+            host or config.get("CACHE_METRICS_STATSD_HOST", "localhost"),
+            port or config.get("CACHE_METRICS_STATSD_PORT", 8125),
+        )
+        self.prefix = prefix or config.get(
+            "CACHE_METRICS_STATSD_PREFIX", "invenio_cache"
+        )
+        if sample_rate is None:
+            sample_rate = config.get("CACHE_METRICS_SAMPLE_RATE", 1.0)
+        self.sample_rate = sample_rate
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+        self._names = {}
+
+    def _name(self, operation, prefix):
+        """Get the name of the metrics of an operation on a key prefix."""
+        name = self._names.get((operation, prefix))
+        if name is None:
+            label = re.sub(r"[^A-Za-z0-9_-]+", "_", prefix).strip("_") or "other"
+            name = self._names[(operation, prefix)] = (
+                f"{self.prefix}.{operation}.{label}"
+            )
+        return name
+
+    def record(self, operation, prefix, duration, hits=0, misses=0, size=None):
+        """Send an operation, if sampled."""
+        rate = self.sample_rate
+        if rate < 1:
+            if random.random() >= rate:
+                return
+            sample = f"|@{rate}"
+        else:
+            sample = ""
+        name = self._name(operation, prefix)
+        lines = [
+            f"{name}.calls:1|c{sample}",
+            f"{name}.duration:{duration * 1000:.3f}|ms{sample}",
+        ]
+        if hits:
+            lines.append(f"{name}.hits:{hits}|c{sample}")
+        if misses:
+            lines.append(f"{name}.misses:{misses}|c{sample}")
+        if size is not None:
+            lines.append(f"{name}.payload_bytes:{size}|h{sample}")
+        self.send("\n".join(lines))
+
+    def send(self, data):
+        """Send a datagram, ignoring the errors."""
+        try:
+            self._socket.sendto(data.encode("utf-8"), self.address)
+        except OSError:
+            pass
+
+
+sinks = {
+    "memory": InMemorySink,
+    "prometheus": PrometheusSink,
+    "statsd": StatsDSink,
+}
+"""Known sinks, by name."""
+
+
+class _Sizes(threading.local):
+    """Size of the payloads of a thread."""
+
+    size = None
+
+
+class MeteredSerializer(BaseSerializer):
+    """Serializer measuring the size of the payloads, per thread."""
+
+    def __init__(self, serializer):
+        """Initialize the serializer.
+
+        :param serializer: The ``cachelib`` serializer of the values.
+        """
+        self.serializer = serializer
+        self._local = _Sizes()
+
+    def take_size(self):
+        """Get the size of the payloads of the thread since the last call."""
+        local = self._local
+        size = local.size
+        local.size = None
+        return size
+
+    def _add_size(self, data):
+        """Count the size of a payload."""
+        if data is not None:
+            self._local.size = (self._local.size or 0) + len(data)
+
+    def dumps(self, value, protocol=None):
+        """Serialize a value."""
+        data = self.serializer.dumps(value)
+        self._add_size(data)
+        return data
+
+    def loads(self, data):
+        """Deserialize a value."""
+        self._add_size(data)
+        return self.serializer.loads(data)
+
+    def dump(self, value, f, protocol=None):
+        """Serialize a value to a file."""
+        f.write(self.dumps(value))
+
+    def load(self, f):
+        """Deserialize a value from a file."""
+        return self.loads(f.read())
+
+
+class InstrumentedCache(BaseCache):
+    """Cache backend recording the metrics of the operations of another one."""
+
+    def __init__(
+        self, backend, sink=None, key_prefix="", profiler=None, max_prefixes=50
+    ):
+        """Initialize the cache.
+
+        :param backend: The cache backend.
+        :param sink: The :class:`MetricsSink` of the metrics, if any.
+        :param key_prefix: The prefix of all the keys, ignored when getting
+            the prefix of a key.
+        :param profiler: The :class:`invenio_cache.profiler.KeyProfiler` of the
+            keys, if any.
+        :param max_prefixes: The number of prefixes recorded, the others are
+            recorded as ``"other"``.
+        """
+        super().__init__(default_timeout=backend.default_timeout)
+        self.backend = backend
+        self.sink = sink
+        self.profiler = profiler
+        self.key_prefix = key_prefix or ""
+        self.max_prefixes = max_prefixes
+        self._prefixes = set()
+        self._serializer = None
+        serializer = getattr(backend, "serializer", None)
+        if serializer is not None:
+            self._serializer = backend.serializer = MeteredSerializer(serializer)
+
+    def __getattr__(self, name):
+        """Get the other attributes (e.g. Redis clients) from the backend."""
+        if name == "backend":
+            # not initialized yet, e.g. when copied
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def prefix(self, key):
+        """Get the prefix of a key, up to the first separator.
+
+        Once ``max_prefixes`` prefixes were seen, the new ones are ``"other"``.
+        """
+        start = len(self.key_prefix) if key.startswith(self.key_prefix) else 0
+        match = _prefix_re.search(key, start, start + 64)
+        prefix = key[start : match.end()] if match else ""
+        if prefix not in self._prefixes:
+            if len(self._prefixes) >= self.max_prefixes:
+                return "other"
+            self._prefixes.add(prefix)
+        return prefix
+
+    def _start(self):
+        """Start measuring an operation."""
+        if self._serializer is not None:
+            self._serializer.take_size()
+        return time.perf_counter()
+
+    def _record(self, operation, key, start, hits=0, misses=0, keys=None):
+        """Record an operation started at ``start``.
+
+        :param keys: All the keys of a batched operation.
+        """
+        duration = time.perf_counter() - start
+        size = self._serializer.take_size() if self._serializer is not None else None
+        if self.sink is not None:
+            self.sink.record(
+                operation,
+                self.prefix(key) if key is not None else "",
+                duration,
+                hits=hits,
+                misses=misses,
+                size=size,
+            )
+        if self.profiler is not None and key is not None:
+            self.profiler.record(operation, keys or (key,), size=size)
+
+    def get(self, key):
+        """Get a value."""
+        start = self._start()
+        value = self.backend.get(key)
+        found = value is not None
+        self._record("get", key, start, hits=int(found), misses=int(not found))
+        return value
+
+    def get_many(self, *keys):
+        """Get values."""
+        start = self._start()
+        values = self.backend.get_many(*keys)
+        hits = sum(1 for value in values if value is not None)
+        key = keys[0] if keys else None
+        self._record(
+            "get_many", key, start, hits=hits, misses=len(keys) - hits, keys=keys
+        )
+        return values
+
+    def has(self, key):
+        """Check if a value exists."""
+        start = self._start()
+        found = self.backend.has(key)
+        self._record("has", key, start, hits=int(found), misses=int(not found))
+        return found
+
+    def set(self, key, value, timeout=None):
+        """Set a value."""
+        start = self._start()
+        result = self.backend.set(key, value, timeout=timeout)
+        self._record("set", key, start)
+        return result
+
+    def add(self, key, value, timeout=None):
+        """Set a value if it does not exist."""
+        start = self._start()
+        result = self.backend.add(key, value, timeout=timeout)
+        self._record("add", key, start)
+        return result
+
+    def set_many(self, mapping, timeout=None):
+        """Set values."""
+        start = self._start()
+        result = self.backend.set_many(mapping, timeout=timeout)
+        self._record("set_many", next(iter(mapping), None), start, keys=tuple(mapping))
+        return result
+
+    def delete(self, key):
+        """Delete a value."""
+        start = self._start()
+        result = self.backend.delete(key)
+        self._record("delete", key, start)
+        return result
+
+    def delete_many(self, *keys):
+        """Delete values."""
+        start = self._start()
+        result = self.backend.delete_many(*keys)
+        self._record("delete_many", keys[0] if keys else None, start, keys=keys)
+        return result
+
+    def clear(self):
+        """Clear the backend."""
+        start = self._start()
+        result = self.backend.clear()
+        self._record("clear", None, start)
+        return result
+
+    def inc(self, key, delta=1):
+        """Increment a value."""
+        start = self._start()
+        result = self.backend.inc(key, delta=delta)
+        self._record("inc", key, start)
+        return result
+
+    def dec(self, key, delta=1):
+        """Decrement a value."""
+        start = self._start()
+        result = self.backend.dec(key, delta=delta)
+        self._record("dec", key, start)
+        return result
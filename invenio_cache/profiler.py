@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Sampling profiler of the hot keys and large values of the cache.
+
+When enabled, a sample of the operations of ``current_cache`` is recorded to
+find the most read keys, and the keys with the largest values:
+
+.. code-block:: python
+
+    CACHE_PROFILER = True
+    CACHE_PROFILER_SAMPLE_RATE = 0.01
+
+Each process keeps its top ``CACHE_PROFILER_TOP_K`` keys, with approximate
+counts in constant memory (the Space-Saving algorithm), and a background thread
+stores them in the cache every ``CACHE_PROFILER_FLUSH_INTERVAL`` seconds. The
+profiles of all the processes are merged and shown with:
+
+.. code-block:: console
+
+    $ invenio cache top
+    $ invenio cache top --reset
+
+The read counts are estimated from the sample, and are upper bounds of the
+actual ones: a key can be counted with the reads of the keys it replaced in
+the top keys, shown as the error.
+"""
+
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+
+from flask import current_app, has_app_context
+
+PROFILES_KEY = "cache_profiler::profiles"
+"""Cache key of the registry of the profiles of the processes."""
+
+REGISTRY_LOCK_KEY = "cache_profiler::profiles::lock"
+"""Cache key of the lock of the registry of the profiles."""
+
+RESET_KEY = "cache_profiler::reset"
+"""Cache key of the time of the last reset of the profiles."""
+
+PROFILE_KEY = "cache_profiler::profile::{0}"
+"""Cache key of the profile of a process."""
+
+_reads = frozenset(("get", "get_many", "has"))
+
+
+class SpaceSaving(object):
+    """Approximate counts of the most frequent items, in constant memory.
+
+    At most ``capacity`` items are counted. A new item replaces the least
+    counted one, and inherits its count as error.
+    """
+
+    def __init__(self, capacity):
+        """Initialize the counter.
+
+        :param capacity: The number of counted items.
+        """
+        self.capacity = capacity
+        self.counts = {}
+
+    def add(self, item, count=1):
+        """Count an item."""
+        counter = self.counts.get(item)
+        if counter is not None:
+            counter[0] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = [count, 0]
+        else:
+            least = min(self.counts, key=lambda item: self.counts[item][0])
+            error = self.counts.pop(least)[0]
+            self.counts[item] = [error + count, error]
+
+    def top(self, n=None):
+        """Get the most counted items, as ``(item, count, error)`` tuples."""
+        items = sorted(
+            ((item, count, error) for item, (count, error) in self.counts.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+        return items[:n] if n else items
+
+
+class LargestValues(object):
+    """Sizes of the largest values, in constant memory."""
+
+    def __init__(self, capacity):
+        """Initialize the sizes.
+
+        :param capacity: The number of values kept.
+        """
+        self.capacity = capacity
+        self.sizes = {}
+        self._min_size = 0
+
+    def add(self, item, size):
+        """Record the size of a value."""
+        sizes = self.sizes
+        if item in sizes or len(sizes) < self.capacity:
+            sizes[item] = size
+        elif size > self._min_size:
+            del sizes[min(sizes, key=sizes.get)]
+            sizes[item] = size
+        else:
+            return
+        if len(sizes) == self.capacity:
+            self._min_size = min(sizes.values())
+
+    def top(self, n=None):
+        """Get the largest values, as ``(item, size)`` tuples."""
+        items = sorted(self.sizes.items(), key=lambda item: item[1], reverse=True)
+        return items[:n] if n else items
+
+
+class _Flusher(threading.Thread):
+    """Background thread writing the profile of the process in the cache."""
+
+    def __init__(self, profiler, app):
+        """Initialize the thread.
+
+        :param profiler: The profiler to flush.
+        :param app: The application logging the errors, if any.
+        """
+        super().__init__(name="cache-profiler-flush", daemon=True)
+        self.profiler = profiler
+        self.app = app
+        self._stopped = threading.Event()
+
+    def run(self):
+        """Write the profile every ``flush_interval`` seconds until stopped."""
+        while not self._stopped.wait(self.profiler.flush_interval):
+            try:
+                self.profiler.flush()
+            except Exception:
+                if self.app is not None:
+                    self.app.logger.exception("Failed to write the cache profile.")
+
+    def stop(self):
+        """Stop writing the profile and wait for the thread to finish."""
+        self._stopped.set()
+        self.join()
+
+
+class KeyProfiler(object):
+    """Sampling profiler of the keys read and written in a cache backend."""
+
+    registry_lock_timeout = 5
+    """Time in seconds after which the lock of the registry expires."""
+
+    registry_lock_attempts = 10
+    """Number of attempts to acquire the lock of the registry on a flush."""
+
+    def __init__(self, backend, top_k=100, sample_rate=0.01, flush_interval=10):
+        """Initialize the profiler.
+
+        :param backend: The cache backend storing the profiles.
+        :param top_k: The number of keys kept.
+        :param sample_rate: The ratio of the operations recorded, from 0 to 1.
+        :param flush_interval: The interval in seconds between the writes of
+            the profile in the cache, by a background thread started on the
+            first recorded operation. Only written by :meth:`flush` if ``None``.
+        """
+        self.backend = backend
+        self.top_k = top_k
+        self.sample_rate = sample_rate
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flusher = None
+        self._flusher_pid = None
+        self.reset()
+
+    @property
+    def process_id(self):
+        """Identifier of the profiled process."""
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def reset(self):
+        """Drop the recorded operations."""
+        with self._lock:
+            self.reads = SpaceSaving(self.top_k)
+            self.largest = LargestValues(self.top_k)
+            self.sampled = 0
+            self.started = time.time()
+
+    def record(self, operation, keys, size=None):
+        """Record an operation, if sampled.
+
+        :param operation: The name of the operation, e.g. ``"get"``.
+        :param keys: The keys of the operation.
+        :param size: The size of the payloads, if known.
+        """
+        if random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            self.sampled += 1
+            if operation in _reads:
+                for key in keys:
+                    self.reads.add(key)
+            if size is not None and len(keys) == 1:
+                self.largest.add(keys[0], size)
+        if self.flush_interval is not None and self._flusher_pid != os.getpid():
+            self._start_flusher()
+
+    def _start_flusher(self):
+        """Start the thread writing the profile, once per process."""
+        app = current_app._get_current_object() if has_app_context() else None
+        with self._lock:
+            # the thread of the parent does not survive a fork
+            pid = os.getpid()
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+            self._flusher = _Flusher(self, app)
+            self._flusher.start()
+
+    def snapshot(self):
+        """Get the profile of the process.
+
+        :returns: A dictionary with the estimated number of ``reads`` (a list
+            of ``[key, count, error]``), the ``largest`` values (a list of
+            ``[key, size]``), and the number of ``sampled`` operations.
+        """
+        scale = 1 / self.sample_rate if self.sample_rate else 0
+        with self._lock:
+            return {
+                "reads": [
+                    [key, round(count * scale), round(error * scale)]
+                    for key, count, error in self.reads.top()
+                ],
+                "largest": [list(item) for item in self.largest.top()],
+                "sampled": self.sampled,
+                "started": self.started,
+            }
+
+    def flush(self):
+        """Write the profile of the process in the cache.
+
+        The profile is reset first if all the profiles were reset since.
+        """
+        now = time.time()
+        interval = self.flush_interval or 0
+        # kept a while after the process stopped
+        timeout = int(max(interval * 10, 60))
+        reset = self.backend.get(RESET_KEY)
+        if reset is not None and reset > self.started:
+            self.reset()
+        process_id = self.process_id
+        self.backend.set(
+            PROFILE_KEY.format(process_id), self.snapshot(), timeout=timeout
+        )
+        self._register(process_id, now, timeout)
+
+    def _register(self, process_id, now, timeout):
+        """Add the process to the registry of the profiles.
+
+        The registry is updated under a lock, so that the concurrent flushes of
+        the processes do not drop each other. If the lock is not acquired, the
+        process is registered on the next flush.
+
+        :returns: ``True`` if the registry was updated.
+        """
+        token = uuid.uuid4().hex
+        for attempt in range(self.registry_lock_attempts):
+            if self.backend.add(
+                REGISTRY_LOCK_KEY, token, timeout=self.registry_lock_timeout
+            ):
+                break
+            time.sleep(0.05 * (attempt + 1))
+        else:
+            return False
+        try:
+            profiles = self.backend.get(PROFILES_KEY) or {}
+            # drop the processes which stopped flushing
+            profiles = {
+                id_: seen for id_, seen in profiles.items() if seen > now - timeout
+            }
+            profiles[process_id] = now
+            self.backend.set(PROFILES_KEY, profiles, timeout=timeout)
+        finally:
+            if self.backend.get(REGISTRY_LOCK_KEY) == token:
+                self.backend.delete(REGISTRY_LOCK_KEY)
+        return True
+
+
+def read_profiles(backend):
+    """Merge the profiles of the processes stored in the cache.
+
+    :returns: A dictionary with the ``reads`` (a list of ``(key, count,
+        error)``, most read first), the ``largest`` values (a list of ``(key,
+        size)``, largest first), the number of ``sampled`` operations and of
+        ``processes``.
+    """
+    ids = list(backend.get(PROFILES_KEY) or {})
+    reads = {}
+    largest = {}
+    sampled = processes = 0
+    for profile in backend.get_many(*[PROFILE_KEY.format(id_) for id_ in ids]):
+        if profile is None:
+            continue
+        processes += 1
+        sampled += profile["sampled"]
+        for key, count, error in profile["reads"]:
+            total = reads.setdefault(key, [0, 0])
+            total[0] += count
+            total[1] += error
+        for key, size in profile["largest"]:
+            largest[key] = max(size, largest.get(key, 0))
+    return {
+        "reads": sorted(
+            ((key, count, error) for key, (count, error) in reads.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        ),
+        "largest": sorted(largest.items(), key=lambda item: item[1], reverse=True),
+        "sampled": sampled,
+        "processes": processes,
+    }
+
+
+def reset_profiles(backend):
+    """Reset the profiles of all the processes.
+
+    The processes reset their profile when they write it next.
+    """
+    ids = list(backend.get(PROFILES_KEY) or {})
+    backend.set(RESET_KEY, time.time(), timeout=0)
+    backend.delete_many(*[PROFILE_KEY.format(id_) for id_ in ids])
+    backend.delete(PROFILES_KEY)
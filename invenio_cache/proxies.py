@@ -19,3 +19,15 @@ current_cache_ext = LocalProxy(lambda: current_app.extensions["invenio-cache"])
 
 current_cache = LocalProxy(lambda: current_app.extensions["invenio-cache"].cache)
 """Helper proxy to access cache object."""
+
+
+current_cache_loader = LocalProxy(
+    lambda: current_app.extensions["invenio-cache"].loader
+)
+"""Helper proxy to access the batch of deferred cache reads of the context."""
+
+
+current_async_cache = LocalProxy(
+    lambda: current_app.extensions["invenio-cache"].async_cache
+)
+"""Helper proxy to access the asyncio cache object."""
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Serialization of cached values.
+
+By default, the cache backends pickle the values. Large dict- and list-shaped
+values are faster to serialize with JSON or msgpack, selected with:
+
+.. code-block:: python
+
+    CACHE_SERIALIZER = "json"  # or "pickle", "msgpack", an import path
+
+Serialized values start with a tag identifying their format, so that values
+in any of the known formats can be read whatever the configured one is, and
+the format of a deployment can be changed without clearing the cache. The
+format of the values serialized by the default Redis serializer (pickle, and
+integers as plain digits) is kept, so that they can be read as well, and the
+integers can still be incremented by Redis.
+
+.. warning::
+
+    JSON and msgpack do not preserve all the Python types, e.g. tuples are read
+    as lists. Values they can't serialize at all are pickled.
+
+Large serialized values can be compressed as well, with:
+
+.. code-block:: python
+
+    CACHE_COMPRESSION = "zlib"  # or "lz4"
+    CACHE_COMPRESSION_MIN_SIZE = 1024
+"""
+
+import json
+import pickle
+import threading
+
+from cachelib.serializers import BaseSerializer
+from werkzeug.utils import import_string
+
+from ._compat import string_types
+from .compression import TAG_MARK, compress, decompress, load_codec
+
+
+class PickleCodec(object):
+    """Pickle, as the default Redis serializer."""
+
+    tag = b"!"
+
+    def dumps(self, value):
+        """Serialize a value."""
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data):
+        """Deserialize a value."""
+        return pickle.loads(data)
+
+
+class JSONCodec(object):
+    """JSON, with ``orjson`` if installed or the standard library otherwise."""
+
+    tag = b"\x02"
+
+    def __init__(self):
+        """Initialize the codec."""
+        try:
+            import orjson
+        except ImportError:
+            self.dumps = self._dumps
+            self.loads = json.loads
+        else:
+            self.dumps = orjson.dumps
+            self.loads = orjson.loads
+
+    @staticmethod
+    def _dumps(value):
+        """Serialize a value with the standard library."""
+        return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+class MsgpackCodec(object):
+    """msgpack. Requires the ``msgpack`` package."""
+
+    tag = b"\x01"
+
+    def __init__(self):
+        """Initialize the codec."""
+        import msgpack
+
+        self._msgpack = msgpack
+
+    def dumps(self, value):
+        """Serialize a value."""
+        return self._msgpack.packb(value, use_bin_type=True)
+
+    def loads(self, data):
+        """Deserialize a value."""
+        return self._msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+codecs = {
+    "pickle": PickleCodec,
+    "json": JSONCodec,
+    "orjson": JSONCodec,
+    "msgpack": MsgpackCodec,
+}
+"""Known codecs, by name."""
+
+_pickle = PickleCodec()
+
+
+class TaggedSerializer(BaseSerializer):
+    """Serializer tagging the values with their format.
+
+    A codec is an object with a one byte ``tag``, and ``dumps`` and ``loads``
+    methods converting values from and to bytes.
+    """
+
+    def __init__(self, codec="pickle"):
+        """Initialize the serializer.
+
+        :param codec: A codec name from :data:`codecs`, or a codec instance.
+        """
+        if isinstance(codec, string_types):
+            codec = codecs[codec]()
+        self.codec = codec
+        self._codecs_by_tag = {_pickle.tag: _pickle, codec.tag: codec}
+
+    def dumps(self, value, protocol=None):
+        """Serialize a value with the codec, or pickle if the codec can't."""
+        # plain digits, as Redis increments them
+        if type(value) is int:
+            return str(value).encode("ascii")
+        codec = self.codec
+        try:
+            return codec.tag + codec.dumps(value)
+        except (TypeError, ValueError, OverflowError):
+            if codec is _pickle:
+                raise
+            return _pickle.tag + _pickle.dumps(value)
+
+    def loads(self, data):
+        """Deserialize a value in any known format."""
+        if data is None:
+            return None
+        codec = self._codecs_by_tag.get(data[:1])
+        if codec is None:
+            codec = self._get_codec(data[:1])
+            if codec is None:
+                try:
+                    return int(data)
+                except ValueError:
+                    # not serialized, as by old versions of the Redis backend
+                    return data
+        try:
+            return codec.loads(data[1:])
+        except Exception as e:
+            self._warn(e)
+            return None
+
+    def _get_codec(self, tag):
+        """Get the known codec of a tag, if any."""
+        for cls in codecs.values():
+            if cls.tag == tag:
+                try:
+                    codec = cls()
+                except ImportError:
+                    return None
+                self._codecs_by_tag[tag] = codec
+                return codec
+        return None
+
+    def dump(self, value, f, protocol=None):
+        """Serialize a value to a file."""
+        f.write(self.dumps(value))
+
+    def load(self, f):
+        """Deserialize a value from a file."""
+        return self.loads(f.read())
+
+
+class CompressedSerializer(BaseSerializer):
+    """Serializer compressing the values serialized by another serializer.
+
+    Serialized values of at least ``min_size`` bytes are compressed, see
+    :mod:`invenio_cache.compression`. Smaller values are stored as serialized.
+    Compressed values are recognized by their tag when read, so that values
+    stored before the compression was enabled can still be read.
+
+    The ``stats`` count the values large enough to be compressed, and their
+    size before and after compression.
+    """
+
+    def __init__(self, serializer, codec="zlib", min_size=1024, level=None):
+        """Initialize the serializer.
+
+        :param serializer: The ``cachelib`` serializer of the values.
+        :param codec: A compression codec, see
+            :func:`invenio_cache.compression.load_codec`.
+        :param min_size: Minimum size in bytes of the compressed values.
+        :param level: Compression level.
+        """
+        self.serializer = serializer
+        self.codec = load_codec(codec, level=level)
+        self.min_size = min_size
+        self.stats = {"compressed": 0, "bytes_in": 0, "bytes_out": 0}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def ratio(self):
+        """Size of the compressed values divided by their size before."""
+        with self._stats_lock:
+            if not self.stats["bytes_in"]:
+                return 1.0
+            return self.stats["bytes_out"] / self.stats["bytes_in"]
+
+    def dumps(self, value, protocol=None):
+        """Serialize a value, and compress it if large enough."""
+        data = self.serializer.dumps(value)
+        if data is None or len(data) < self.min_size:
+            return data
+        compressed = compress(self.codec, data)
+        with self._stats_lock:
+            self.stats["compressed"] += 1
+            self.stats["bytes_in"] += len(data)
+            self.stats["bytes_out"] += len(compressed)
+        return compressed
+
+    def loads(self, data):
+        """Decompress a value if compressed, and deserialize it."""
+        if data is not None and data[:1] == TAG_MARK:
+            try:
+                data = decompress(data, self.codec)
+            except Exception as e:
+                self._warn(e)
+                return None
+        return self.serializer.loads(data)
+
+    def dump(self, value, f, protocol=None):
+        """Serialize a value to a file."""
+        f.write(self.dumps(value))
+
+    def load(self, f):
+        """Deserialize a value from a file."""
+        return self.loads(f.read())
+
+
+def load_serializer(serializer):
+    """Load the serializer configured by ``CACHE_SERIALIZER``.
+
+    :param serializer: A codec name from :data:`codecs`, an import path, a
+        codec or ``cachelib`` serializer (class or instance), or ``None`` for
+        the default serializer of the backend.
+    :returns: A ``cachelib`` serializer instance, or ``None``.
+    """
+    if serializer is None:
+        return None
+    if isinstance(serializer, string_types):
+        if serializer in codecs:
+            return TaggedSerializer(serializer)
+        serializer = import_string(serializer)
+    if isinstance(serializer, type):
+        serializer = serializer()
+    if isinstance(serializer, BaseSerializer):
+        return serializer
+    return TaggedSerializer(serializer)
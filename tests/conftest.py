@@ -62,20 +62,31 @@ def cache_config():
 
 
 @pytest.fixture()
-def base_app(instance_path, template_folder, cache_config):
+def create_app(instance_path, template_folder, cache_config):
+    """Flask application factory, overriding the cache configuration."""
+
+    def factory(**config):
+        app_ = Flask(
+            "testapp",
+            instance_path=instance_path,
+            template_folder=template_folder,
+        )
+        app_.config.update(
+            SECRET_KEY="SECRET_KEY",
+            TESTING=True,
+        )
+        app_.config.update(cache_config)
+        app_.config.update(config)
+        InvenioCache(app_)
+        return app_
+
+    return factory
+
+
+@pytest.fixture()
+def base_app(create_app):
     """Flask application fixture."""
-    app_ = Flask(
-        "testapp",
-        instance_path=instance_path,
-        template_folder=template_folder,
-    )
-    app_.config.update(
-        SECRET_KEY="SECRET_KEY",
-        TESTING=True,
-    )
-    app_.config.update(cache_config)
-    InvenioCache(app_)
-    return app_
+    return create_app()
 
 
 @pytest.yield_fixture()
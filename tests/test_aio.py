@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Asyncio API tests."""
+
+import asyncio
+
+import pytest
+
+from invenio_cache import current_cache
+from invenio_cache.aio import (
+    AsyncCachedMutex,
+    InMemoryAsyncCache,
+    RedisAsyncCache,
+    ThreadedAsyncCache,
+)
+from invenio_cache.errors import (
+    LockAcquireFailed,
+    LockReleaseFailed,
+    LockRenewPermissionDenied,
+)
+from invenio_cache.lock import CachedMutex
+from invenio_cache.proxies import current_async_cache
+
+
+class FakeRedis(object):
+    """Asyncio Redis client storing the values in a dictionary."""
+
+    def __init__(self):
+        """Initialize the client."""
+        self.data = {}
+        self.calls = []
+
+    async def get(self, name):
+        """Get a value."""
+        return self.data.get(name)
+
+    async def mget(self, names):
+        """Get values."""
+        return [self.data.get(name) for name in names]
+
+    async def set(self, name, value, ex=None, nx=False):
+        """Set a value."""
+        self.calls.append(("set", name, ex))
+        if nx and name in self.data:
+            return None
+        self.data[name] = value
+        return True
+
+    async def delete(self, name):
+        """Delete a value."""
+        return int(self.data.pop(name, None) is not None)
+
+    async def eval(self, script, numkeys, name, value, *args):
+        """Run the release or renew script."""
+        if self.data.get(name) != value:
+            return 0
+        if "del" in script:
+            del self.data[name]
+        return 1
+
+
+def test_async_cache(app):
+    """Test the default asyncio cache, sharing the values of the cache."""
+    assert isinstance(app.extensions["invenio-cache"].async_cache, ThreadedAsyncCache)
+
+    async def run():
+        assert await current_async_cache.set("key", "value")
+        assert current_cache.get("key") == "value"
+        current_cache.set("other", [1, 2])
+        assert await current_async_cache.get_many("key", "other", "no") == [
+            "value",
+            [1, 2],
+            None,
+        ]
+        assert not await current_async_cache.add("key", "value")
+        assert await current_async_cache.delete("key")
+        assert await current_async_cache.get("key") is None
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize(
+    "cache",
+    [
+        InMemoryAsyncCache(),
+        RedisAsyncCache(client=FakeRedis(), key_prefix="prefix::"),
+    ],
+)
+def test_async_cache_backends(app, cache):
+    """Test the asyncio caches."""
+
+    async def run():
+        assert await cache.get("key") is None
+        assert await cache.add("key", {"a": 1}, timeout=10)
+        assert not await cache.add("key", "other")
+        assert await cache.get("key") == {"a": 1}
+        assert await cache.set("key", 1)
+        assert await cache.get_many("key", "no") == [1, None]
+        assert not await cache.compare_and_delete("key", 2)
+        assert await cache.compare_and_expire("key", 1, 10)
+        assert await cache.compare_and_delete("key", 1)
+        assert not await cache.delete("key")
+
+    asyncio.run(run())
+
+
+def test_redis_async_cache():
+    """Test the storage of values in Redis."""
+    client = FakeRedis()
+    cache = RedisAsyncCache(client=client, key_prefix="prefix::", default_timeout=30)
+
+    async def run():
+        await cache.set("key", "value")
+        await cache.set("int", 1, timeout=0)
+
+    asyncio.run(run())
+    # the same as the Redis backend of the cache
+    assert client.data["prefix::key"].startswith(b"!")
+    assert client.data["prefix::int"] == b"1"
+    assert client.calls == [("set", "prefix::key", 30), ("set", "prefix::int", None)]
+
+
+def test_redis_async_cache_loops(app, ext, mocker):
+    """Test creating a Redis client per event loop."""
+    create_async = mocker.patch.object(
+        ext.redis_clients, "create_async", side_effect=lambda: FakeRedis()
+    )
+    cache = RedisAsyncCache(app, key_prefix="prefix::")
+
+    async def run():
+        await cache.set("key", "value")
+        assert await cache.get("key") == "value"
+        return cache.client
+
+    first = asyncio.run(run())
+    # the value was set with the client of the first loop
+    assert asyncio.run(cache.get("key")) is None
+    second = asyncio.run(run())
+    assert first is not second
+    assert create_async.call_count == 3
+    # the clients of the closed loops are dropped
+    assert len(cache._clients) == 1
+
+
+def test_async_mutex(app):
+    """Test the asyncio lock."""
+
+    async def run():
+        async with AsyncCachedMutex("lock") as lock:
+            assert await lock.acquire(timeout=10)
+            assert await lock.exists()
+            # Locks the ids of the synchronous locks
+            with pytest.raises(LockAcquireFailed):
+                CachedMutex("lock").acquire(timeout=10)
+
+            second_lock = AsyncCachedMutex("lock")
+            with pytest.raises(LockAcquireFailed):
+                await second_lock.acquire(timeout=10)
+            with pytest.raises(LockReleaseFailed):
+                await second_lock.release()
+            with pytest.raises(LockRenewPermissionDenied):
+                await second_lock.acquire_or_renew(10)
+            assert await lock.acquire_or_renew(10)
+        assert not await lock.exists()
+
+    asyncio.run(run())
+
+
+def test_async_mutex_blocking(app):
+    """Test waiting for an asyncio lock."""
+    app.config["CACHE_ASYNC_TYPE"] = "invenio_cache.aio.InMemoryAsyncCache"
+    order = []
+
+    async def worker(i):
+        async with AsyncCachedMutex("lock") as lock:
+            await lock.acquire(timeout=10, blocking=True)
+            order.append(("in", i))
+            await asyncio.sleep(0.01)
+            order.append(("out", i))
+
+    async def run():
+        await asyncio.gather(*[worker(i) for i in range(3)])
+
+    asyncio.run(run())
+    assert isinstance(current_async_cache._get_current_object(), InMemoryAsyncCache)
+    # the holders did not overlap
+    assert [step for step, _ in order] == ["in", "out"] * 3
+
+
+def test_async_mutex_heartbeat(app):
+    """Test the renewal of the lease of an asyncio lock."""
+    app.config["CACHE_ASYNC_TYPE"] = "invenio_cache.aio.InMemoryAsyncCache"
+
+    async def run():
+        lock = AsyncCachedMutex("lock", lease=0.2)
+        lock.heartbeat_interval = 0.02
+        async with lock:
+            assert await lock.acquire(timeout=0.2)
+            await asyncio.sleep(0.4)
+            assert await lock.exists()
+            assert not lock.lost
+
+            # The lease is lost to another owner
+            await current_async_cache.set("lock", "other")
+            await asyncio.sleep(0.05)
+            assert lock.lost
+            await current_async_cache.delete("lock")
+            await AsyncCachedMutex("lock", token=lock.token).acquire(timeout=10)
+
+    asyncio.run(run())
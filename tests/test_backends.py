@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Cache backends tests."""
+
+import time
+
+import pytest
+from flask import g
+
+from invenio_cache import current_cache
+from invenio_cache.backends import (
+    LocalCache,
+    RequestCache,
+    TwoTierCache,
+    unmemoized,
+)
+from invenio_cache.errors import LockAcquireFailed
+from invenio_cache.lock import CachedMutex, CachedRWLock
+
+
+@pytest.fixture()
+def two_tier_app(create_app, cache_config):
+    """Application using the two-tier cache with the tested cache as L2."""
+    app = create_app(
+        CACHE_TYPE="invenio_cache.backends.TwoTierCache",
+        CACHE_L2_TYPE=cache_config["CACHE_TYPE"],
+        CACHE_L1_THRESHOLD=2,
+    )
+    with app.app_context():
+        yield app
+
+
+def test_local_cache(mocker):
+    """Test the bounded in-process cache."""
+    cache = LocalCache(threshold=2, default_timeout=5)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    cache.set("a", None)
+    assert cache.get("a") is None
+
+    monotonic = mocker.patch("time.monotonic", return_value=100)
+    cache.set("short", 1, timeout=1)
+    cache.set("long", 1, timeout=0)
+    monotonic.return_value = 102
+    assert cache.get("short") is None
+    assert cache.get("long") == 1
+    monotonic.return_value = 106
+    assert cache.get("long") is None
+
+
+def test_two_tier_cache(two_tier_app):
+    """Test read-through and write-through of the two-tier cache."""
+    cache = current_cache.cache
+    assert isinstance(cache, TwoTierCache)
+    assert cache.l1.threshold == 2
+
+    assert current_cache.set("key", "value")
+    assert cache.l1.get("key") == "value"
+    assert cache.l2.get("key") == "value"
+
+    # read-through
+    cache.l1.clear()
+    assert current_cache.get("key") == "value"
+    assert cache.l1.get("key") == "value"
+
+    # served from L1 without reaching L2
+    cache.l2.set("key", "other")
+    assert current_cache.get("key") == "value"
+
+    assert current_cache.delete("key")
+    assert current_cache.get("key") is None
+    assert cache.l2.get("key") is None
+
+    assert current_cache.set_many({"a": 1, "b": 2})
+    cache.l1.clear()
+    cache.l1.set("a", 10)
+    assert current_cache.get_many("a", "b", "c") == [10, 2, None]
+
+    current_cache.delete_many("a", "b")
+    assert current_cache.get_many("a", "b") == [None, None]
+
+    assert current_cache.add("counter", 1)
+    assert not current_cache.add("counter", 5)
+    assert current_cache.cache.inc("counter") == 2
+    assert current_cache.get("counter") == 2
+
+    assert current_cache.clear()
+    assert not current_cache.has("counter")
+
+
+def test_two_tier_cache_read_through_ttl(two_tier_app):
+    """Test keeping the values read through from L2 until they expire in L2."""
+    cache = current_cache.cache
+    cache.l2.set("short", "value", timeout=1)
+    cache.l2.set("forever", "value", timeout=0)
+    assert current_cache.get_many("short", "forever") == ["value", "value"]
+    now = time.monotonic()
+    assert cache.l1._entries["short"][1] <= now + 1
+    assert cache.l1._entries["forever"][1] > now + 1
+
+
+def test_two_tier_cache_read_through_race(two_tier_app, mocker):
+    """Test that a value invalidated while it is read is not kept in L1."""
+    cache = current_cache.cache
+    cache.l2.set("key", "stale")
+    l2_get_many = cache._l2_get_many
+
+    def invalidated_meanwhile(keys):
+        values = l2_get_many(keys)
+        cache._on_invalidation(["key"], None)
+        return values
+
+    mocker.patch.object(cache, "_l2_get_many", side_effect=invalidated_meanwhile)
+    assert current_cache.get("key") == "stale"
+    assert cache.l1.get("key") is None
+
+    # written by this process while read
+    def written_meanwhile(keys):
+        values = l2_get_many(keys)
+        cache.l1.set("key", "fresh")
+        return values
+
+    cache._l2_get_many.side_effect = written_meanwhile
+    current_cache.get("key")
+    assert cache.l1.get("key") == "fresh"
+
+
+def test_two_tier_cache_lock(two_tier_app):
+    """Test that locks see the L2 state."""
+    cache = current_cache.cache
+    lock = CachedMutex("lock")
+    assert lock.acquire(timeout=10)
+    # another process released it
+    cache.l2.delete("lock")
+    assert not lock.exists()
+
+
+@pytest.fixture()
+def memoized_app(create_app):
+    """Application memoizing the reads in the application context."""
+    return create_app(CACHE_REQUEST_MEMOIZATION=True)
+
+
+def test_request_cache(memoized_app, mocker):
+    """Test the memoization of the reads in the request context."""
+    with memoized_app.app_context():
+        cache = current_cache.cache
+        assert isinstance(cache, RequestCache)
+        assert unmemoized(cache) is cache.backend
+        backend = cache.backend
+        current_cache.set("a", 1)
+        current_cache.set("b", 2)
+    get = mocker.spy(backend, "get")
+    get_many = mocker.spy(backend, "get_many")
+
+    with memoized_app.test_request_context():
+        assert [current_cache.get("a") for _ in range(3)] == [1, 1, 1]
+        assert get.call_count == 1
+        # missing keys are not memoized
+        assert current_cache.get("missing") is None
+        assert current_cache.get("missing") is None
+        assert get.call_count == 3
+
+        # duplicate and memoized keys are not read again
+        assert current_cache.get_many("a", "b", "b", "c") == [1, 2, 2, None]
+        get_many.assert_called_once_with("b", "c")
+        assert current_cache.get_many("b", "a") == [2, 1]
+        assert get_many.call_count == 1
+        assert cache.saved == 3
+
+        # writes are seen
+        current_cache.set("a", 10)
+        current_cache.delete("b")
+        backend.set("d", 3)
+        assert current_cache.get("a") == 10
+        assert current_cache.get("b") is None
+        current_cache.get("d")
+        backend.set("d", 4)
+        # not written through the cache
+        assert current_cache.get("d") == 3
+
+        # the locks see the values written by other requests
+        assert current_cache.get("lock::readers") is None
+        backend.set("lock::readers", 1)
+        with pytest.raises(LockAcquireFailed):
+            CachedRWLock("lock", write=True).acquire(timeout=10)
+
+    # the memo is dropped on teardown
+    with memoized_app.test_request_context():
+        assert cache.saved == 0
+        assert current_cache.get("d") == 4
+
+    # passed to the backend outside of a request context
+    with memoized_app.app_context():
+        get.reset_mock()
+        assert current_cache.get("a") == current_cache.get("a") == 10
+        assert get.call_count == 2
+    assert cache.get("a") == 10
+    assert cache.get_many("a", "d") == [10, 4]
+
+
+def test_request_cache_max_size(memoized_app):
+    """Test the bound of the memo of a request."""
+    with memoized_app.test_request_context():
+        cache = current_cache.cache
+        cache.max_size = 2
+        for key in "abc":
+            current_cache.set(key, key)
+            current_cache.get(key)
+        assert list(g._invenio_cache_memo.values) == ["b", "c"]
+        assert current_cache.get_many("a", "b", "d") == ["a", "b", None]
+        assert list(g._invenio_cache_memo.values) == ["c", "a"]
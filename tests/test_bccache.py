@@ -10,9 +10,13 @@
 
 from __future__ import absolute_import, print_function
 
+import re
+
+import pytest
 from flask import render_template
 
 from invenio_cache import BytecodeCache
+from invenio_cache.compression import ZlibCodec
 
 
 def test_bccache(base_app, ext):
@@ -28,3 +32,100 @@ def test_bccache(base_app, ext):
 
     with app.test_client() as c:
         assert c.get("/").get_data(as_text=True) == "test"
+
+
+def test_bccache_warm_up(base_app, ext, mocker):
+    """Test preloading the bytecode of templates."""
+    app = base_app
+    # the environment was already created by the cache Jinja extension
+    app.jinja_env.bytecode_cache = BytecodeCache(app)
+
+    with app.app_context():
+        # nothing cached yet
+        assert app.jinja_env.bytecode_cache.warm_up(app.jinja_env) == 0
+        assert render_template("template.html", msg="test") == "test"
+
+        # a fresh worker
+        bytecode_cache = BytecodeCache(app)
+        app.jinja_env.bytecode_cache = bytecode_cache
+        app.jinja_env.cache.clear()
+        get = mocker.spy(ext.cache, "get")
+        get_many = mocker.spy(ext.cache, "get_many")
+
+        assert bytecode_cache.warm_up(app.jinja_env) == 1
+        assert bytecode_cache.warm_up(app.jinja_env, ["missing.html"]) == 0
+        assert get_many.call_count == 1
+        assert render_template("template.html", msg="test") == "test"
+        assert get.call_count == 0
+        assert not bytecode_cache._preloaded
+
+        # the bytecode not loaded in time is dropped
+        bytecode_cache.preload_timeout = 0
+        app.jinja_env.cache.clear()
+        assert bytecode_cache.warm_up(app.jinja_env) == 1
+        bytecode_cache._preloaded["unused"] = b""
+        assert render_template("template.html", msg="test") == "test"
+        assert not bytecode_cache._preloaded
+
+
+def test_bccache_compression(base_app, ext):
+    """Test compressed bytecode and stats."""
+    app = base_app
+    app.config.update(
+        CACHE_JINJA_BYTECODE_COMPRESSION="zlib",
+        CACHE_JINJA_BYTECODE_COMPRESSION_MIN_SIZE=0,
+        CACHE_JINJA_BYTECODE_VERSION="v2",
+    )
+    bytecode_cache = BytecodeCache(app)
+    app.jinja_env.bytecode_cache = bytecode_cache
+    assert bytecode_cache.generation.endswith("-v2")
+    assert bytecode_cache.prefix.endswith("-v2::")
+
+    with app.app_context():
+        assert render_template("template.html", msg="test") == "test"
+        assert bytecode_cache.stats["stored"] == 1
+        assert bytecode_cache.stats["bytes_saved"] > 0
+
+        (key,) = [k for k in ext.cache.cache._cache if k.startswith("cache::jinja::")]
+        assert ext.cache.get(key).startswith(ZlibCodec.tag)
+
+        # loaded from the cache by a fresh worker
+        app.jinja_env.bytecode_cache = BytecodeCache(app)
+        app.jinja_env.cache.clear()
+        assert render_template("template.html", msg="test") == "test"
+        assert app.jinja_env.bytecode_cache.stats["stored"] == 0
+
+
+def test_bccache_purge_old_generations(base_app, ext, mocker):
+    """Test deleting the bytecode of the other generations."""
+
+    class FakeRedis:
+        def __init__(self, keys):
+            self.keys = set(keys)
+
+        def scan_iter(self, match):
+            # only trailing wildcards and escaped characters
+            prefix = re.sub(r"\\(.)", r"\1", match[:-1])
+            return [k.encode() for k in self.keys if k.startswith(prefix)]
+
+        def delete(self, *keys):
+            self.keys -= {k.decode() for k in keys}
+            return len(keys)
+
+    bytecode_cache = BytecodeCache(base_app)
+    current = "pre*fix::" + bytecode_cache.prefix + "abc"
+    old = "pre*fix::cache::jinja::old::abc"
+    # matched by an unescaped pattern
+    other = "preXfix::cache::jinja::old::abc"
+    client = FakeRedis([current, old, other, "pre*fix::cache::other"])
+
+    with base_app.app_context():
+        with pytest.raises(RuntimeError):
+            bytecode_cache.purge_old_generations()
+
+        mocker.patch.object(ext.cache.cache, "_write_client", client, create=True)
+        mocker.patch.object(
+            ext.cache.cache, "_get_prefix", lambda: "pre*fix::", create=True
+        )
+        assert bytecode_cache.purge_old_generations() == 1
+        assert client.keys == {current, other, "pre*fix::cache::other"}
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Shared Redis clients tests."""
+
+import pytest
+from flask import Flask
+
+from invenio_cache import InvenioCache
+from invenio_cache.clients import MeteredPool, RedisClients, uses_redis_backend
+
+
+class FakePool(object):
+    """Connection pool handing out numbered connections."""
+
+    def __init__(self, max_connections=10):
+        """Initialize the pool."""
+        self.max_connections = max_connections
+        self.reset()
+
+    def reset(self):
+        """Reset the pool."""
+        self.created = 0
+
+    def get_connection(self, command_name=None, *keys, **options):
+        """Get a connection."""
+        self.created += 1
+        return self.created
+
+    def release(self, connection):
+        """Release a connection."""
+
+
+class FakeMeteredPool(MeteredPool, FakePool):
+    """Metered fake pool."""
+
+
+def test_metered_pool():
+    """Test the utilization metrics of a pool."""
+    pool = FakeMeteredPool(max_connections=4)
+    first = pool.get_connection("GET")
+    pool.get_connection("GET")
+    stats = pool.stats
+    assert stats["in_use"] == 2
+    assert stats["utilization"] == 0.5
+    assert stats["acquired"] == 2
+    assert stats["max_wait_time"] >= stats["avg_wait_time"] >= 0
+
+    pool.release(first)
+    pool.release(first)
+    pool.release(first)
+    stats = pool.stats
+    assert stats["in_use"] == 0
+    assert stats["max_in_use"] == 2
+
+    pool.reset()
+    assert pool.stats["acquired"] == 0
+
+
+def test_uses_redis_backend():
+    """Test detecting the Redis backend."""
+    assert uses_redis_backend({"CACHE_TYPE": "RedisCache"})
+    assert uses_redis_backend(
+        {"CACHE_TYPE": "flask_caching.backends.rediscache.RedisCache"}
+    )
+    assert not uses_redis_backend({"CACHE_TYPE": "SimpleCache"})
+    assert not uses_redis_backend({"CACHE_TYPE": "RedisSentinelCache"})
+    # aliases of Flask-Caching 1.x
+    assert uses_redis_backend({"CACHE_TYPE": "redis"})
+    assert not uses_redis_backend({"CACHE_TYPE": "simple"})
+    assert not uses_redis_backend({"CACHE_TYPE": "redissentinel"})
+    assert uses_redis_backend(
+        {
+            "CACHE_TYPE": "invenio_cache.backends.TwoTierCache",
+            "CACHE_L2_TYPE": "RedisCache",
+        }
+    )
+
+
+def test_redis_clients(app):
+    """Test the registry of clients."""
+    app.config.update(
+        CACHE_OPTIONS={"retry_on_timeout": True},
+        CACHE_REDIS_SOCKET_TIMEOUT=2,
+        CACHE_REDIS_HEALTH_CHECK_INTERVAL=30,
+    )
+    clients = RedisClients(app)
+    assert clients.max_connections is None
+    # the options of the cache backend are not options of the pools
+    assert clients.options == {
+        "socket_timeout": 2,
+        "health_check_interval": 30,
+    }
+
+    app.config["CACHE_REDIS_POOL_SIZE"] = 8
+    clients = RedisClients(app)
+    assert clients.options["timeout"] == 20
+
+    created = []
+    clients.create = lambda url: created.append(url) or object()
+    assert clients.get() is clients.get(app.config["CACHE_REDIS_URL"])
+    assert clients.get("redis://other:6379/1") is not clients.get()
+    assert created == [app.config["CACHE_REDIS_URL"], "redis://other:6379/1"]
+    assert app.extensions["invenio-cache"].redis_clients.stats == {}
+
+
+def test_redis_backend_client():
+    """Test the Redis backend using the shared client."""
+    pytest.importorskip("redis")
+    app = Flask("testapp")
+    app.config.update(CACHE_TYPE="RedisCache", CACHE_REDIS_POOL_SIZE=8)
+    ext = InvenioCache(app)
+    client = ext.redis_clients.get()
+    assert app.extensions["cache"][ext.cache]._write_client is client
+    assert client.connection_pool.max_connections == 8
+    assert isinstance(client.connection_pool, MeteredPool)
+
+
+def test_redis_async_client(app):
+    """Test creating asyncio clients with the pool configuration."""
+    pytest.importorskip("redis.asyncio")
+    app.config.update(CACHE_REDIS_POOL_SIZE=8, CACHE_REDIS_SOCKET_TIMEOUT=2)
+    clients = RedisClients(app)
+    client = clients.create_async()
+    assert client is not clients.create_async()
+    pool = client.connection_pool
+    assert pool.max_connections == 8
+    assert pool.connection_kwargs["socket_timeout"] == 2
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Compression tests."""
+
+import pytest
+from cachelib.serializers import RedisSerializer
+from flask import Flask
+
+from invenio_cache import InvenioCache, current_cache
+from invenio_cache.compression import ZlibCodec, compress, decompress, load_codec
+from invenio_cache.serializers import CompressedSerializer
+
+
+def test_load_codec():
+    """Test loading codecs."""
+    assert load_codec(None) is None
+    assert isinstance(load_codec("zlib"), ZlibCodec)
+    assert load_codec("invenio_cache.compression.ZlibCodec", level=9).level == 9
+    codec = ZlibCodec()
+    assert load_codec(codec) is codec
+
+
+def test_compress():
+    """Test compressing and decompressing payloads."""
+    codec = ZlibCodec()
+    data = b"a" * 1000
+
+    compressed = compress(codec, data)
+    assert compressed.startswith(codec.tag)
+    assert len(compressed) < len(data)
+    assert decompress(compressed, codec) == data
+    # read without the configured codec
+    assert decompress(compressed) == data
+
+    # too small, or not smaller once compressed
+    assert compress(codec, data, min_size=2000) is data
+    assert compress(codec, b"ab") == b"ab"
+    assert compress(None, data) is data
+    assert decompress(b"ab", codec) == b"ab"
+
+    with pytest.raises(ValueError):
+        decompress(b"\x00?abc")
+
+
+def test_compressed_serializer():
+    """Test compressing the serialized values above the threshold."""
+    serializer = CompressedSerializer(RedisSerializer(), min_size=100)
+    small = serializer.dumps("small")
+    assert small == RedisSerializer().dumps("small")
+    assert serializer.loads(small) == "small"
+    assert serializer.dumps(1) == b"1"
+    assert serializer.stats["compressed"] == 0
+    assert serializer.ratio == 1.0
+
+    large = ["value"] * 100
+    data = serializer.dumps(large)
+    assert data.startswith(ZlibCodec.tag)
+    assert serializer.loads(data) == large
+    assert serializer.stats["compressed"] == 1
+    assert serializer.stats["bytes_out"] == len(data)
+    assert serializer.ratio < 0.5
+
+    # corrupted values are not read
+    assert serializer.loads(ZlibCodec.tag + b"corrupted") is None
+
+
+def test_cache_compression():
+    """Test compressing the values of the cache backend."""
+    app = Flask("testapp")
+    app.config.update(
+        CACHE_TYPE="SimpleCache",
+        CACHE_COMPRESSION="zlib",
+        CACHE_COMPRESSION_MIN_SIZE=100,
+        CACHE_COMPRESSION_LEVEL=9,
+    )
+    ext = InvenioCache(app)
+    with app.app_context():
+        backend = current_cache.cache
+        # values stored before the compression was enabled
+        backend._cache["old"] = (0, backend.serializer.serializer.dumps("old"))
+
+        large = {"key": "value" * 100}
+        current_cache.set_many({"large": large, "small": "small"})
+        assert backend._cache["large"][1].startswith(ZlibCodec.tag)
+        assert not backend._cache["small"][1].startswith(ZlibCodec.tag)
+        assert current_cache.get_many("large", "small", "old") == [
+            large,
+            "small",
+            "old",
+        ]
+        assert ext.compression.codec.level == 9
+        assert ext.compression.stats["compressed"] == 1
+        assert ext.compression.ratio < 0.1
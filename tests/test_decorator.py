@@ -8,13 +8,23 @@
 
 """Module tests."""
 
-import hashlib
+import asyncio
+import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
+from flask import request
 
-from invenio_cache import cached_unless_authenticated
-from invenio_cache.decorators import cached_with_expiration
+from invenio_cache import cached_unless_authenticated, current_cache
+from invenio_cache.decorators import (
+    VaryKey,
+    _entropy,
+    _make_key,
+    cached_with_expiration,
+)
+from invenio_cache.serializers import JSONCodec
 
 
 def test_decorator_cached_unless_authenticated(base_app, ext):
@@ -47,6 +57,276 @@ def test_decorator_cached_unless_authenticated(base_app, ext):
         assert c.get("/").get_data(as_text=True) == "2"
 
 
+def test_decorator_cached_unless_authenticated_early(base_app, ext, mocker):
+    """Test recomputing a cached view before it expires."""
+    ext.is_authenticated_callback = lambda: False
+    calls = []
+
+    @base_app.route("/")
+    @cached_unless_authenticated(key_prefix="early", beta=1e9)
+    def my_cached_view():
+        calls.append(1)
+        return str(len(calls))
+
+    with base_app.test_client() as c:
+        mocker.patch("invenio_cache.decorators.random.random", return_value=0.0)
+        assert c.get("/").get_data(as_text=True) == "1"
+        assert c.get("/").get_data(as_text=True) == "1"
+        # log(1 - random()) is large enough to recompute it early
+        mocker.patch("invenio_cache.decorators.random.random", return_value=0.5)
+        assert c.get("/").get_data(as_text=True) == "2"
+
+    # not cached for authenticated requests
+    ext.is_authenticated_callback = lambda: True
+    with base_app.test_client() as c:
+        assert c.get("/").get_data(as_text=True) == "3"
+
+
+def test_decorator_cached_unless_authenticated_early_json(create_app, mocker):
+    """Test recomputing a cached view stored as JSON by the standard library."""
+    codec = JSONCodec()
+    codec.dumps, codec.loads = JSONCodec._dumps, json.loads
+    app = create_app(CACHE_SERIALIZER=codec)
+    app.extensions["invenio-cache"].is_authenticated_callback = lambda: False
+    calls = []
+
+    @app.route("/")
+    @cached_unless_authenticated(key_prefix="early", beta=1.0)
+    def my_cached_view():
+        calls.append(1)
+        return str(len(calls))
+
+    mocker.patch("invenio_cache.decorators.random.random", return_value=0.0)
+    with app.test_client() as c:
+        assert [c.get("/").get_data(as_text=True) for _ in range(5)] == ["1"] * 5
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("memoized", [False, True])
+@pytest.mark.parametrize("stale", [True, False])
+def test_decorator_cached_unless_authenticated_storm(create_app, stale, memoized):
+    """Test a single recomputation of an expired view by concurrent requests."""
+    base_app = create_app(CACHE_REQUEST_MEMOIZATION=memoized)
+    base_app.extensions["invenio-cache"].is_authenticated_callback = lambda: False
+    calls = []
+
+    @base_app.route("/")
+    @cached_unless_authenticated(key_prefix="storm", beta=1.0, lock=True)
+    def my_cached_view():
+        calls.append(1)
+        time.sleep(0.1)
+        return str(len(calls))
+
+    with base_app.test_client() as c:
+        assert c.get("/").get_data(as_text=True) == "1"
+    with base_app.app_context():
+        entry = current_cache.get("storm")
+        if stale:
+            # expired, but still stored
+            current_cache.set("storm", dict(entry, expiry=0))
+        else:
+            current_cache.delete("storm")
+
+    responses = []
+
+    def request():
+        with base_app.test_client() as c:
+            responses.append(c.get("/").get_data(as_text=True))
+
+    threads = [threading.Thread(target=request) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 2
+    if stale:
+        # served the stale value while recomputing
+        assert set(responses) == {"1", "2"}
+    else:
+        assert set(responses) == {"2"}
+
+
+@pytest.mark.parametrize("lock", [False, True])
+def test_decorator_cached_unless_authenticated_backend_error(base_app, ext, lock):
+    """Test serving a view recomputed early when the cache backend fails."""
+    ext.is_authenticated_callback = lambda: False
+    calls = []
+
+    @base_app.route("/")
+    @cached_unless_authenticated(key_prefix="down", beta=1.0, lock=lock)
+    def my_cached_view():
+        calls.append(1)
+        return str(len(calls))
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("down")
+
+    backend = base_app.extensions["cache"][ext.cache]
+    for name in ("get", "get_many", "set", "add", "delete"):
+        setattr(backend, name, fail)
+    with base_app.test_client() as c:
+        assert c.get("/").get_data(as_text=True) == "1"
+        assert c.get("/").get_data(as_text=True) == "2"
+
+
+def test_decorator_cached_unless_authenticated_conditional(base_app, ext, mocker):
+    """Test answering conditional requests without reading the cached view."""
+    ext.is_authenticated_callback = lambda: False
+    calls = []
+
+    @base_app.route("/")
+    @cached_unless_authenticated(key_prefix="conditional", conditional=True)
+    def my_cached_view():
+        calls.append(1)
+        return "body"
+
+    with base_app.test_client() as c:
+        response = c.get("/")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+        # served from the cache, with the same validators
+        response = c.get("/")
+        assert response.headers["ETag"] == etag
+        assert len(calls) == 1
+
+        get = mocker.spy(ext.cache, "get")
+        response = c.get("/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.get_data() == b""
+        assert response.headers["ETag"] == etag
+        assert get.call_args_list == [mocker.call("conditional::validators")]
+
+        response = c.get("/", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+        response = c.get("/", headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == "body"
+        assert len(calls) == 1
+
+    ext.is_authenticated_callback = lambda: True
+    with base_app.test_client() as c:
+        response = c.get("/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(calls) == 2
+
+
+def test_decorator_cached_unless_authenticated_conditional_backend_error(base_app, ext):
+    """Test serving conditional requests when the cache backend fails."""
+    ext.is_authenticated_callback = lambda: False
+    calls = []
+
+    @base_app.route("/")
+    @cached_unless_authenticated(key_prefix="conditional", conditional=True)
+    def my_cached_view():
+        calls.append(1)
+        return "body"
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("down")
+
+    backend = base_app.extensions["cache"][ext.cache]
+    for name in ("get", "get_many", "set", "add", "delete"):
+        setattr(backend, name, fail)
+    with base_app.test_client() as c:
+        response = c.get("/")
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        response = c.get("/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == "body"
+    assert len(calls) == 2
+
+    base_app.debug = True
+    with base_app.test_client() as c:
+        with pytest.raises(ConnectionError):
+            c.get("/", headers={"If-None-Match": etag})
+
+
+def test_decorator_cached_unless_authenticated_conditional_json(create_app):
+    """Test answering conditional requests with the validators stored as JSON."""
+    app = create_app(CACHE_SERIALIZER="json")
+    app.extensions["invenio-cache"].is_authenticated_callback = lambda: False
+
+    @app.route("/")
+    @cached_unless_authenticated(key_prefix="conditional", conditional=True)
+    def my_cached_view():
+        return "body"
+
+    with app.test_client() as c:
+        response = c.get("/")
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+        response = c.get("/", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        response = c.get("/", headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+
+
+def test_decorator_cached_unless_authenticated_vary(base_app, ext, mocker):
+    """Test caching a view per query arguments, header and locale."""
+    ext.is_authenticated_callback = lambda: False
+    ext.locale_callback = lambda: request.args.get("ln", "en")
+    calls = []
+
+    @base_app.route("/search")
+    @cached_unless_authenticated(
+        key_prefix="search/%s", vary=["query:q", "header:Accept", "locale"]
+    )
+    def search():
+        calls.append(1)
+        return f"{request.args.get('q')} {request.headers.get('Accept')} {len(calls)}"
+
+    with base_app.test_client() as c:
+        assert c.get("/search?q=a").get_data(as_text=True) == "a None 1"
+        assert c.get("/search?q=a&other=1").get_data(as_text=True) == "a None 1"
+        assert c.get("/search?q=b").get_data(as_text=True) == "b None 2"
+        assert c.get("/search?q=a&ln=fr").get_data(as_text=True) == "a None 3"
+        headers = {"Accept": "text/html, application/json"}
+        assert c.get("/search?q=a", headers=headers).get_data(as_text=True) == (
+            "a text/html, application/json 4"
+        )
+        # the same header, without spaces
+        headers = {"Accept": "text/html,application/json"}
+        assert c.get("/search?q=a", headers=headers).get_data(as_text=True) == (
+            "a text/html, application/json 4"
+        )
+        # the HTTP caches vary the responses as well
+        assert c.get("/search?q=a").headers["Vary"] == "Accept, Accept-Language"
+
+
+def test_vary_key(base_app, mocker):
+    """Test making the keys of the varying views."""
+    key = VaryKey("view/%s", ["query", "locale"])
+    make_key = mocker.spy(key, "_make_key")
+    with base_app.test_request_context("/records?b=2&a=1"):
+        first = key()
+        assert first.startswith("view//records::")
+        assert key() == first
+    with base_app.test_request_context("/records?a=1&b=2"):
+        # canonical query arguments
+        assert key() == first
+    with base_app.test_request_context("/records?a=1&b=3"):
+        assert key() != first
+    with base_app.test_request_context("/other?a=1&b=2"):
+        assert key().startswith("view//other::")
+    # made once per raw request values
+    assert make_key.call_count == 4
+
+    key = VaryKey(lambda: f"view/{request.args['a']}", ["query:b"])
+    with base_app.test_request_context("/records?a=1&b=2"):
+        assert key().startswith("view/1::")
+    with base_app.test_request_context("/records?a=2&b=2"):
+        assert key().startswith("view/2::")
+
+    with pytest.raises(ValueError):
+        VaryKey("view", ["cookie:session"])
+    with pytest.raises(ValueError):
+        cached_unless_authenticated(vary=["header"])
+
+
 def test_decorator_cached_with_expiration(mocker):
     """Test cached_with_expiration decorator."""
     one_hour = 3600
@@ -68,11 +348,11 @@ def test_decorator_cached_with_expiration(mocker):
 
     # hit/miss tests without default TTL and no entropy
     assert get_cached_only_args("value1", cache_entropy=False) == "value1"
-    hits, misses = get_cached_only_args.cache_info()
+    hits, misses, *_ = get_cached_only_args.cache_info()
     assert hits == 0
     assert misses == 1
     assert get_cached_only_args("value1", cache_entropy=False) == "value1"
-    hits, misses = get_cached_only_args.cache_info()
+    hits, misses, *_ = get_cached_only_args.cache_info()
     assert hits == 1
     assert misses == 1
 
@@ -80,7 +360,7 @@ def test_decorator_cached_with_expiration(mocker):
     with mocker.patch("time.time", return_value=expired):
         # cache miss because it expired
         assert get_cached_only_args("value1") == "value1"
-        hits, misses = get_cached_only_args.cache_info()
+        hits, misses, *_ = get_cached_only_args.cache_info()
         assert hits == 1
         assert misses == 2
 
@@ -102,28 +382,381 @@ def test_decorator_cached_with_expiration(mocker):
     now = time.time()
 
     assert get_cached_only_args("value1") == "value1"
-    hits, misses = get_cached_only_args.cache_info()
+    hits, misses, *_ = get_cached_only_args.cache_info()
     assert hits == 0
     assert misses == 1
 
     still_valid = now + one_hour
     with mocker.patch("time.time", return_value=still_valid):
         assert get_cached_only_args("value1") == "value1"
-        hits, misses = get_cached_only_args.cache_info()
+        hits, misses, *_ = get_cached_only_args.cache_info()
         assert hits == 1
         assert misses == 1
 
-    entropy = int(hashlib.md5(str(("value1",)).encode()).hexdigest(), 16) % 100
+    entropy = _entropy(_make_key(("value1",), {}))
     still_valid_with_entropy = still_valid + entropy - 1  # -1 sec to be still valid
     with mocker.patch("time.time", return_value=still_valid_with_entropy):
         assert get_cached_only_args("value1") == "value1"
-        hits, misses = get_cached_only_args.cache_info()
+        hits, misses, *_ = get_cached_only_args.cache_info()
         assert hits == 2
         assert misses == 1
 
     expired = still_valid + entropy
     with mocker.patch("time.time", return_value=expired):
         assert get_cached_only_args("value1") == "value1"
-        hits, misses = get_cached_only_args.cache_info()
+        hits, misses, *_ = get_cached_only_args.cache_info()
         assert hits == 2
         assert misses == 2
+
+
+def test_decorator_cached_unless_authenticated_wrapped_once(base_app, ext, mocker):
+    """Test that the cached view is built once and not on every request."""
+    ext.is_authenticated_callback = lambda: False
+    cached = mocker.spy(ext.cache, "cached")
+
+    @base_app.route("/")
+    @cached_unless_authenticated(key_prefix="once")
+    def my_cached_view():
+        return "1"
+
+    with base_app.test_client() as c:
+        for _ in range(3):
+            assert c.get("/").get_data(as_text=True) == "1"
+
+    assert cached.call_count == 1
+    assert len(ext._cached_views) == 1
+
+
+def _wait_for_misses(func, misses, timeout=5):
+    """Wait until ``func`` recorded the given number of misses."""
+    deadline = time.time() + timeout
+    while func.cache_info().misses < misses and time.time() < deadline:
+        time.sleep(0.001)
+
+
+def test_decorator_cached_with_expiration_single_flight():
+    """Test that concurrent misses on a key share one computation."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @cached_with_expiration
+    def slow(arg1):
+        calls.append(arg1)
+        if arg1 == "slow":
+            started.set()
+            release.wait(5)
+        return arg1
+
+    assert slow("fast") == "fast"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(slow("slow"))) for _ in range(5)
+    ]
+    for t in threads:
+        t.start()
+    assert started.wait(5)
+
+    # Other keys are not blocked by the computation in progress
+    assert slow("fast") == "fast"
+    assert slow("other") == "other"
+
+    _wait_for_misses(slow, 1 + 5 + 1)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert results == ["slow"] * 5
+    assert calls.count("slow") == 1
+    assert slow("slow") == "slow"
+    assert calls.count("slow") == 1
+
+
+def test_decorator_cached_with_expiration_single_flight_error():
+    """Test that an error is raised to every waiting caller and not cached."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    @cached_with_expiration
+    def failing(arg1):
+        calls.append(arg1)
+        started.set()
+        release.wait(5)
+        raise ValueError(arg1)
+
+    errors = []
+
+    def call():
+        try:
+            failing("value1")
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for t in threads:
+        t.start()
+    assert started.wait(5)
+    _wait_for_misses(failing, 3)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert len(errors) == 3
+    with pytest.raises(ValueError):
+        failing("value1")
+    assert len(calls) == 2
+
+
+def test_decorator_cached_with_expiration_maxsize():
+    """Test LRU eviction when the number of entries is bounded."""
+
+    @cached_with_expiration(maxsize=2)
+    def get_cached(arg1):
+        return arg1
+
+    get_cached(1)
+    get_cached(2)
+    get_cached(1)  # 1 is now the most recently used
+    get_cached(3)  # evicts 2
+
+    info = get_cached.cache_info()
+    assert info.maxsize == 2
+    assert info.currsize == 2
+    assert info.evictions == 1
+
+    get_cached(1)
+    assert get_cached.cache_info().hits == 2
+    get_cached(2)
+    assert get_cached.cache_info().misses == 4
+
+    get_cached.cache_clear()
+    assert get_cached.cache_info() == (0, 0, 2, 0, None, 0, 0, 0)
+
+
+def test_decorator_cached_with_expiration_maxbytes():
+    """Test eviction when the size of the entries is bounded."""
+
+    @cached_with_expiration(maxbytes=10, sizeof=len)
+    def get_cached(arg1):
+        return arg1
+
+    get_cached("aaaa")
+    get_cached("bbbb")
+    assert get_cached.cache_info().currbytes == 8
+    get_cached("cccc")  # evicts "aaaa"
+    info = get_cached.cache_info()
+    assert info.currsize == 2
+    assert info.currbytes == 8
+    assert info.evictions == 1
+
+    # too large to be cached at all
+    get_cached("d" * 11)
+    info = get_cached.cache_info()
+    assert info.currsize == 2
+    assert info.currbytes == 8
+
+
+def test_decorator_cached_with_expiration_purge(mocker):
+    """Test that expired entries are removed."""
+
+    @cached_with_expiration(purge_interval=10)
+    def get_cached(arg1):
+        return arg1
+
+    now = time.time()
+    get_cached("value1", cache_ttl=5, cache_entropy=False)
+    get_cached("value2", cache_ttl=5, cache_entropy=False)
+    assert get_cached.cache_info().currsize == 2
+
+    # looking up an expired entry removes it
+    mocker.patch("time.time", return_value=now + 6)
+    get_cached("value1", cache_ttl=5, cache_entropy=False)
+    info = get_cached.cache_info()
+    assert info.currsize == 2
+    assert info.expirations == 1
+
+    # storing an entry after the purge interval removes all the expired ones
+    mocker.patch("time.time", return_value=now + 20)
+    get_cached("value3", cache_ttl=5, cache_entropy=False)
+    info = get_cached.cache_info()
+    assert info.currsize == 1
+    assert info.expirations == 3
+
+
+def test_decorator_cached_with_expiration_stale(mocker):
+    """Test serving stale entries while refreshing them in the background."""
+    submitted = []
+
+    class DeferredExecutor:
+        def submit(self, fn, *args):
+            submitted.append((fn, args))
+
+    values = iter(["v1", "v2", "v3"])
+
+    @cached_with_expiration(stale_ttl=10, executor=DeferredExecutor())
+    def get_cached(arg1):
+        return next(values)
+
+    now = time.time()
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v1"
+
+    # stale: the old value is served and a single refresh is scheduled
+    mocker.patch("time.time", return_value=now + 6)
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v1"
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v1"
+    assert len(submitted) == 1
+    assert get_cached.cache_info().hits == 2
+
+    fn, args = submitted.pop()
+    fn(*args)
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v2"
+    assert not submitted
+
+    # past the stale window it is recomputed in the foreground
+    mocker.patch("time.time", return_value=now + 30)
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v3"
+    assert not submitted
+
+
+def test_decorator_cached_with_expiration_stale_executor_shutdown(mocker):
+    """Test serving stale entries when the refresh cannot be scheduled."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.shutdown()
+    values = iter(["v1", "v2"])
+
+    @cached_with_expiration(stale_ttl=10, executor=executor)
+    def get_cached(arg1):
+        return next(values)
+
+    now = time.time()
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v1"
+    mocker.patch("time.time", return_value=now + 6)
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v1"
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v1"
+
+    # past the stale window, it is recomputed instead of waiting forever
+    mocker.patch("time.time", return_value=now + 30)
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == "v2"
+
+
+def test_decorator_cached_with_expiration_stale_shared_executor(mocker):
+    """Test refreshing stale entries on the shared thread pool."""
+    refreshed = threading.Event()
+    calls = []
+
+    @cached_with_expiration(stale_ttl=10)
+    def get_cached(arg1):
+        calls.append(arg1)
+        if len(calls) > 1:
+            refreshed.set()
+        return len(calls)
+
+    now = time.time()
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == 1
+    mocker.patch("time.time", return_value=now + 6)
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == 1
+    assert refreshed.wait(5)
+    for _ in range(5000):
+        # the refreshed entry is stored right after the function returns
+        if get_cached("key", cache_ttl=5, cache_entropy=False) == 2:
+            break
+        time.sleep(0.001)
+    assert get_cached("key", cache_ttl=5, cache_entropy=False) == 2
+    assert len(calls) == 2
+
+
+def test_decorator_cached_with_expiration_keys():
+    """Test the keys of the entries."""
+    assert _make_key((1,), {}) == 1
+    assert _make_key(("value1",), {}) == "value1"
+    assert _make_key(((1, 2),), {}) == _make_key(((1, 2),), {})
+    assert _make_key((1, 2), {}) != _make_key((1,), {"a": 2})
+    assert _make_key((), {"a": 1, "b": 2}) == _make_key((), {"a": 1, "b": 2})
+    assert hash(_make_key((1, 2), {})) == hash((1, 2))
+    assert 0 <= _entropy(_make_key((1, 2), {})) < 100
+
+    @cached_with_expiration
+    def get_cached(*args, **kwargs):
+        return args, kwargs
+
+    assert get_cached(1) == ((1,), {})
+    assert get_cached(1, a=2) == ((1,), {"a": 2})
+    assert get_cached(1) == ((1,), {})
+    assert get_cached(1, a=2) == ((1,), {"a": 2})
+    assert get_cached.cache_info().hits == 2
+
+
+def test_decorator_cached_with_expiration_async():
+    """Test coalescing the concurrent awaits of a coroutine function."""
+    calls = []
+
+    @cached_with_expiration
+    async def get_cached(arg1):
+        calls.append(arg1)
+        await asyncio.sleep(0.01)
+        if arg1 == "error":
+            raise ValueError(arg1)
+        return arg1.upper()
+
+    async def run():
+        results = await asyncio.gather(*[get_cached("key") for _ in range(5)])
+        assert results == ["KEY"] * 5
+        assert await get_cached("key") == "KEY"
+        assert await get_cached("other") == "OTHER"
+
+        errors = await asyncio.gather(
+            *[get_cached("error") for _ in range(3)], return_exceptions=True
+        )
+        assert all(isinstance(e, ValueError) for e in errors)
+
+    asyncio.run(run())
+    assert calls == ["key", "other", "error"]
+    info = get_cached.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 9, 2)
+
+
+def test_decorator_cached_with_expiration_async_cancelled():
+    """Test a waiter taking over when the awaiting leader is cancelled."""
+    calls = []
+
+    @cached_with_expiration
+    async def get_cached(arg1):
+        calls.append(arg1)
+        await asyncio.sleep(0.05)
+        return arg1.upper()
+
+    async def run():
+        leader = asyncio.ensure_future(get_cached("key"))
+        await asyncio.sleep(0)
+        waiters = [asyncio.ensure_future(get_cached("key")) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await asyncio.gather(*waiters) == ["KEY"] * 3
+        assert await get_cached("key") == "KEY"
+
+    asyncio.run(run())
+    assert calls == ["key", "key"]
+
+
+def test_decorator_cached_with_expiration_async_stale(mocker):
+    """Test refreshing a stale entry in a background task."""
+    values = iter(["v1", "v2"])
+
+    @cached_with_expiration(stale_ttl=10)
+    async def get_cached(arg1):
+        return next(values)
+
+    async def run():
+        now = time.time()
+        assert await get_cached("key", cache_ttl=5, cache_entropy=False) == "v1"
+        mocker.patch("time.time", return_value=now + 6)
+        assert await get_cached("key", cache_ttl=5, cache_entropy=False) == "v1"
+        # let the refresh task run
+        await asyncio.sleep(0)
+        assert await get_cached("key", cache_ttl=5, cache_entropy=False) == "v2"
+
+    asyncio.run(run())
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Invalidation tests."""
+
+import json
+
+import pytest
+
+from invenio_cache.invalidation import InMemoryTransport, Invalidator, RedisTransport
+
+
+@pytest.fixture()
+def transport():
+    """In-memory transport shared by the workers."""
+    return InMemoryTransport()
+
+
+@pytest.fixture()
+def workers(transport, create_app, cache_config):
+    """Two workers using the two-tier cache with a shared L2."""
+    apps = [
+        create_app(
+            CACHE_TYPE="invenio_cache.backends.TwoTierCache",
+            CACHE_L2_TYPE=cache_config["CACHE_TYPE"],
+            CACHE_L1_DEFAULT_TIMEOUT=3600,
+            CACHE_INVALIDATION_TRANSPORT=lambda app: transport,
+        )
+        for _ in range(2)
+    ]
+    backends = [
+        app.extensions["cache"][app.extensions["invenio-cache"].cache] for app in apps
+    ]
+    backends[1].l2 = backends[0].l2
+    return backends
+
+
+def test_invalidator(transport):
+    """Test publishing and receiving invalidations."""
+    received = []
+    first = Invalidator(transport)
+    second = Invalidator(transport)
+    second.subscribe(lambda keys, prefix: received.append((keys, prefix)))
+    first.subscribe(lambda keys, prefix: pytest.fail("Received own message"))
+
+    first.invalidate("a", "b")
+    first.invalidate(prefix="cache::")
+    assert received == [(["a", "b"], None), ([], "cache::")]
+
+    # a forked process gets a new identity
+    node_id = first.node_id
+    first.after_fork()
+    assert first.node_id != node_id
+
+
+def test_two_tier_cache_invalidation(workers):
+    """Test that writes drop the L1 copies of the other workers."""
+    first, second = workers
+
+    first.set("key", "v1")
+    assert second.get("key") == "v1"
+    assert second.l1.get("key") == "v1"
+
+    first.set("key", "v2")
+    assert second.l1.get("key") is None
+    assert second.get("key") == "v2"
+    # the writer keeps its own copy
+    assert first.l1.get("key") == "v2"
+
+    first.delete("key")
+    assert second.get("key") is None
+
+    first.set_many({"a": 1, "b": 2})
+    assert second.get_many("a", "b") == [1, 2]
+    first.delete_many("a")
+    assert second.l1.get("a") is None
+    assert second.l1.get("b") == 2
+
+    first.clear()
+    assert second.l1.get("b") is None
+
+
+def test_no_transport(app, ext):
+    """Test that invalidation is disabled by default."""
+    assert ext.invalidator is None
+
+
+def test_redis_transport(app, ext, mocker):
+    """Test receiving the invalidations from Redis pub/sub."""
+    client = mocker.Mock()
+    mocker.patch.object(ext.redis_clients, "create", return_value=client)
+    transport = RedisTransport(app)
+    # the shared client of the cache
+    assert transport.client is ext.redis_clients.get()
+
+    received = []
+    invalidator = Invalidator(transport)
+    invalidator.subscribe(lambda keys, prefix: received.append(keys))
+    client.pubsub().run_in_thread.assert_called_once()
+
+    # errors do not stop the thread receiving the messages
+    transport._receive({"data": b"not json"})
+    transport.subscribe(mocker.Mock(side_effect=RuntimeError))
+    message = {"node": "other", "keys": ["a"], "prefix": None}
+    transport._receive({"data": json.dumps(message).encode("utf-8")})
+    assert received == [["a"]]
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Batched reads tests."""
+
+import pytest
+
+from invenio_cache import current_cache, current_cache_ext
+from invenio_cache.proxies import current_cache_loader
+
+
+def test_deferred_reads(app, mocker):
+    """Test batching the deferred reads in a single get_many."""
+    current_cache.set_many({"a": 1, "b": 2})
+    get_many = mocker.spy(current_cache, "get_many")
+
+    a = current_cache_ext.defer("a")
+    b, missing, a_again = current_cache_loader.defer_many("b", "missing", "a")
+    assert a_again is a
+    assert not a.resolved
+    assert len(current_cache_loader) == 3
+
+    assert b.get() == 2
+    get_many.assert_called_once_with("a", "b", "missing")
+    assert a.resolved
+    assert (a.get(), missing.get()) == (1, None)
+    assert get_many.call_count == 1
+
+    # resolved handles are not read again, new ones are in a new batch
+    current_cache.set("a", 10)
+    assert a.get() == 1
+    c = current_cache_ext.defer("a")
+    assert c is not a
+    assert c.get() == 10
+    assert get_many.call_count == 2
+
+
+def test_deferred_reads_per_context(base_app):
+    """Test that the batches are not shared between application contexts."""
+    with base_app.app_context():
+        handle = current_cache_ext.defer("a")
+    with base_app.app_context():
+        assert len(current_cache_loader) == 0
+    assert handle.get() is None
+
+
+def test_deferred_reads_failure(app, mocker):
+    """Test that the pending reads are kept when the backend fails."""
+    current_cache.set("a", 1)
+    mocker.patch.object(current_cache, "get_many", side_effect=ConnectionError)
+    handle = current_cache_ext.defer("a")
+    with pytest.raises(ConnectionError):
+        handle.get()
+    assert not handle.resolved
+
+    mocker.stopall()
+    assert handle.get() == 1
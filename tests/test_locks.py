@@ -5,10 +5,27 @@
 # Invenio-cache is free software; you can redistribute it and/or modify
 # it under the terms of the MIT License; see LICENSE file for more details.
 """Test locks."""
+
+import threading
+import time
+
 import pytest
 
-from invenio_cache.errors import LockAcquireFailed
-from invenio_cache.lock import CachedMutex
+from invenio_cache.backends import TwoTierCache
+from invenio_cache.errors import (
+    LockAcquireFailed,
+    LockReleaseFailed,
+    LockRenewPermissionDenied,
+)
+from invenio_cache.lock import (
+    Backoff,
+    CachedMutex,
+    CachedRWLock,
+    CachedSemaphore,
+    MultiLock,
+    _incr,
+)
+from invenio_cache.proxies import current_cache
 
 
 def test_cached_mutex(app):
@@ -66,10 +83,83 @@ def test_cached_mutex_renew(app):
     assert lock.acquire(timeout=1)
     assert lock.acquire_or_renew(100)
 
-    # Second caller can renew the lock
+    # Second caller can't renew the lock
     second_lock = CachedMutex(lock_id)
-    assert second_lock.acquire_or_renew(100)
+    with pytest.raises(LockRenewPermissionDenied):
+        second_lock.acquire_or_renew(100)
+
+    # Unless it shares the token of the owner
+    shared_lock = CachedMutex(lock_id, token=lock.token)
+    assert shared_lock.acquire_or_renew(100)
+    assert shared_lock.exists()
+
+
+def test_cached_mutex_owner(app):
+    """Tests that only the owner of a lock can release it."""
+    lock_id = "test_cache_123"
+    lock = CachedMutex(lock_id)
+    assert lock.acquire(timeout=10)
+
+    second_lock = CachedMutex(lock_id)
+    with pytest.raises(LockReleaseFailed):
+        second_lock.release()
+    assert lock.exists()
+
+    # The lock expired and was acquired by another caller
+    app.extensions["invenio-cache"].cache.delete(lock_id)
+    assert second_lock.acquire(timeout=10)
+    with pytest.raises(LockReleaseFailed):
+        lock.release()
     assert second_lock.exists()
+    assert second_lock.release()
+    assert not lock.exists()
+
+
+def test_cached_mutex_redis(app, mocker):
+    """Tests that Redis checks the owner and deletes or renews atomically."""
+    backend = mocker.Mock(spec=["_write_client", "_get_prefix", "serializer"])
+    backend._get_prefix.return_value = "prefix_"
+    backend.serializer.dumps.side_effect = lambda value: b"!" + value.encode()
+    backend._write_client.eval.return_value = 1
+    cache = mocker.Mock(cache=backend)
+    cache.add.return_value = False
+    mocker.patch.object(CachedMutex, "_cache", cache)
+
+    lock = CachedMutex("test_cache_123", token="abc")
+    assert lock.release()
+    script, numkeys, key, token = backend._write_client.eval.call_args[0]
+    assert "del" in script
+    assert (numkeys, key, token) == (1, "prefix_test_cache_123", b"!abc")
+
+    assert lock.acquire_or_renew(100)
+    script, numkeys, key, token, timeout = backend._write_client.eval.call_args[0]
+    assert "expire" in script
+    assert (key, token, timeout) == ("prefix_test_cache_123", b"!abc", 100)
+
+    backend._write_client.eval.return_value = 0
+    with pytest.raises(LockReleaseFailed):
+        lock.release()
+    with pytest.raises(LockRenewPermissionDenied):
+        lock.acquire_or_renew(100)
+
+
+def test_cached_mutex_redis_two_tier(app, mocker):
+    """Tests that the scripts on the L2 drop the L1 copies of the locks."""
+    l2 = mocker.Mock(spec=["_write_client", "_get_prefix", "serializer"])
+    l2._get_prefix.return_value = "prefix_"
+    l2.serializer.dumps.side_effect = lambda value: b"!" + value.encode()
+    l2._write_client.eval.return_value = 1
+    backend = TwoTierCache(l2)
+    backend.invalidator = mocker.Mock()
+    mocker.patch.object(CachedMutex, "_cache", mocker.Mock(cache=backend))
+
+    lock = CachedMutex("test_cache_123", token="abc")
+    backend.l1.set("test_cache_123", "abc")
+    assert lock.release()
+    assert backend.l1.get("test_cache_123") is None
+    backend.invalidator.invalidate.assert_called_once_with(
+        "test_cache_123", prefix=None
+    )
 
 
 def test_cache_failure(app, monkeypatch):
@@ -93,3 +183,334 @@ def test_cache_failure(app, monkeypatch):
 
     with pytest.raises(Exception):
         lock.exists()
+
+
+def test_cached_mutex_blocking(app, mocker):
+    """Tests waiting for a lock to be released."""
+    lock_id = "test_cache_123"
+    lock = CachedMutex(lock_id)
+    assert lock.acquire(timeout=10)
+
+    # The holder releases the lock while the second caller sleeps the second time
+    delays = []
+
+    def sleep(delay):
+        delays.append(delay)
+        if len(delays) == 2:
+            lock.release()
+
+    mocker.patch("time.sleep", side_effect=sleep)
+    second_lock = CachedMutex(lock_id)
+    backoff = Backoff(initial=0.1, maximum=0.15)
+    assert second_lock.acquire(timeout=10, blocking=True, backoff=backoff)
+    assert second_lock.attempts == 3
+    assert 0 <= delays[0] <= 0.1
+    assert 0 <= delays[1] <= 0.15
+
+
+def test_cached_mutex_wait_timeout(app):
+    """Tests giving up waiting for a lock."""
+    lock_id = "test_cache_123"
+    assert CachedMutex(lock_id).acquire(timeout=10)
+
+    second_lock = CachedMutex(lock_id)
+    with pytest.raises(LockAcquireFailed):
+        second_lock.acquire(
+            timeout=10, blocking=True, wait_timeout=0.05, backoff=Backoff(0.01)
+        )
+    assert second_lock.attempts > 1
+    assert second_lock.wait_time >= 0.05
+
+    # Non blocking calls make a single attempt
+    with pytest.raises(LockAcquireFailed):
+        second_lock.acquire(timeout=10)
+    assert second_lock.attempts == 1
+
+
+def test_cached_mutex_heartbeat(app):
+    """Tests the renewal of a lock's lease while it is held."""
+    lock_id = "test_cache_123"
+    lock = CachedMutex(lock_id, lease=2)
+    lock.heartbeat_interval = 0.05
+    with lock:
+        assert lock.acquire(timeout=1)
+        # Held beyond its timeout
+        time.sleep(1.2)
+        assert lock.exists()
+        assert not lock.lost
+    assert not lock.exists()
+
+
+def test_cached_mutex_heartbeat_crash(app):
+    """Tests that the lock of a crashed holder clears after its lease."""
+    lock_id = "test_cache_123"
+    lock = CachedMutex(lock_id, lease=1)
+    lock.heartbeat_interval = 3600
+    lock.__enter__()
+    # Acquired for the lease only
+    assert lock.acquire(timeout=3600)
+
+    # The holder crashes before the first beat
+    lock._heartbeat.stop()
+    time.sleep(1.1)
+    assert CachedMutex(lock_id).acquire(timeout=10)
+
+
+def test_cached_mutex_heartbeat_lost(app):
+    """Tests a lease lost to another caller."""
+    lock_id = "test_cache_123"
+    with pytest.raises(LockReleaseFailed):
+        lock = CachedMutex(lock_id, lease=1)
+        lock.heartbeat_interval = 0.05
+        with lock:
+            assert lock.acquire(timeout=1)
+            # The lock expires and is acquired by someone else
+            app.extensions["invenio-cache"].cache.delete(lock_id)
+            second_lock = CachedMutex(lock_id)
+            assert second_lock.acquire(timeout=10)
+            time.sleep(0.1)
+            assert lock.lost
+    assert second_lock.exists()
+
+
+def test_cached_semaphore(app):
+    """Tests a semaphore held by at most n owners."""
+    lock_id = "test_cache_123"
+    holders = [CachedSemaphore(lock_id, 3) for _ in range(3)]
+    for holder in holders:
+        assert holder.acquire(timeout=10)
+    assert holders[0].exists()
+
+    fourth = CachedSemaphore(lock_id, 3)
+    with pytest.raises(LockAcquireFailed):
+        fourth.acquire(timeout=10)
+    with pytest.raises(LockReleaseFailed):
+        fourth.release()
+
+    # A held semaphore is renewed, without taking another slot
+    assert holders[0].acquire_or_renew(10)
+    with pytest.raises(LockAcquireFailed):
+        fourth.acquire(timeout=10)
+
+    assert holders[1].release()
+    with fourth:
+        assert fourth.acquire(timeout=10)
+    for holder in (holders[0], holders[2]):
+        assert holder.release()
+    assert not fourth.exists()
+
+
+def test_cached_semaphore_threads(app):
+    """Tests the number of concurrent owners of a semaphore."""
+    active = []
+    max_active = []
+    counter_lock = threading.Lock()
+
+    def worker():
+        with app.app_context():
+            for _ in range(5):
+                with CachedSemaphore("test_cache_123", 3) as semaphore:
+                    semaphore.acquire(timeout=10, blocking=True)
+                    with counter_lock:
+                        active.append(1)
+                        max_active.append(len(active))
+                    time.sleep(0.001)
+                    with counter_lock:
+                        active.pop()
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(max_active) == 40
+    assert max(max_active) <= 3
+
+
+def test_cached_rwlock(app):
+    """Tests a lock held by many readers or a single writer."""
+    lock_id = "test_cache_123"
+    readers = [CachedRWLock(lock_id) for _ in range(3)]
+    for reader in readers:
+        assert reader.acquire(timeout=10)
+    assert readers[0].exists()
+
+    # Readers are renewed, without being counted twice
+    assert readers[0].acquire_or_renew(10)
+
+    writer = CachedRWLock(lock_id, write=True)
+    with pytest.raises(LockAcquireFailed):
+        writer.acquire(timeout=10)
+    # The writer let the readers in again
+    assert CachedRWLock(lock_id).acquire(timeout=10)
+    assert CachedRWLock(lock_id)._readers() == 4
+
+    for reader in readers:
+        assert reader.release()
+    with pytest.raises(LockReleaseFailed):
+        readers[0].release()
+    assert CachedRWLock(lock_id)._readers() == 1
+    app.extensions["invenio-cache"].cache.delete(f"{lock_id}::readers")
+
+    with writer:
+        assert writer.acquire(timeout=10)
+        with pytest.raises(LockAcquireFailed):
+            CachedRWLock(lock_id).acquire(timeout=10)
+        with pytest.raises(LockAcquireFailed):
+            CachedRWLock(lock_id, write=True).acquire(timeout=10)
+    assert not writer.exists()
+
+
+def test_cached_rwlock_readers_timeout(app):
+    """Tests that a reader never shortens the timeout of the other readers."""
+    lock_id = "test_cache_123"
+    long_reader = CachedRWLock(lock_id)
+    short_reader = CachedRWLock(lock_id)
+    assert long_reader.acquire(timeout=3600)
+    assert short_reader.acquire(timeout=1)
+    time.sleep(2.1)
+    # the long reader still holds the lock
+    assert long_reader._readers() == 2
+    with pytest.raises(LockAcquireFailed):
+        CachedRWLock(lock_id, write=True).acquire(timeout=10)
+
+    assert short_reader.release()
+    assert long_reader.release()
+    # the count does not go below 0
+    assert _incr(current_cache, f"{lock_id}::readers", -1, 10) == 0
+    assert not long_reader.exists()
+
+
+def test_cached_rwlock_redis(app, mocker):
+    """Tests that Redis counts the readers in one script."""
+    backend = mocker.Mock(spec=["_write_client", "_get_prefix", "get"])
+    backend._get_prefix.return_value = "prefix_"
+    backend.get.return_value = None
+    backend._write_client.eval.return_value = 1
+    cache = mocker.Mock(cache=backend)
+    cache.has.return_value = False
+    mocker.patch.object(CachedMutex, "_cache", cache)
+
+    lock = CachedRWLock("test_cache_123")
+    assert lock.acquire(timeout=10)
+    script, numkeys, key, delta, timeout = backend._write_client.eval.call_args[0]
+    assert "pexpire" in script
+    assert (numkeys, key, delta, timeout) == (
+        1,
+        "prefix_test_cache_123::readers",
+        1,
+        10,
+    )
+    assert lock.release()
+    assert backend._write_client.eval.call_args[0][3:] == (-1, 10)
+
+
+def test_cached_rwlock_threads(app):
+    """Tests readers and writers holding a lock concurrently."""
+    state = {"readers": 0, "writers": 0}
+    violations = []
+    state_lock = threading.Lock()
+
+    def check():
+        if state["writers"] > 1 or (state["writers"] and state["readers"]):
+            violations.append(dict(state))
+
+    def worker(write):
+        with app.app_context():
+            for _ in range(5):
+                with CachedRWLock("test_cache_123", write=write) as lock:
+                    lock.acquire(timeout=10, blocking=True, backoff=Backoff(0.002))
+                    key = "writers" if write else "readers"
+                    with state_lock:
+                        state[key] += 1
+                        check()
+                    time.sleep(0.001)
+                    with state_lock:
+                        check()
+                        state[key] -= 1
+
+    threads = [threading.Thread(target=worker, args=(i < 2,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not violations
+    assert not CachedRWLock("test_cache_123").exists()
+
+
+def test_multi_lock(app):
+    """Tests the all-or-nothing acquisition of many locks."""
+    lock_ids = [f"test_cache_{i}" for i in range(10)]
+    assert CachedMutex("test_cache_3").acquire(timeout=10)
+    assert CachedMutex("test_cache_7").acquire(timeout=10)
+
+    lock = MultiLock(lock_ids)
+    with pytest.raises(LockAcquireFailed):
+        lock.acquire(timeout=10)
+    assert lock.contended == ["test_cache_3", "test_cache_7"]
+    # None of the free locks was acquired
+    assert not CachedMutex("test_cache_0").exists()
+
+    app.extensions["invenio-cache"].cache.delete_many("test_cache_3", "test_cache_7")
+    with lock:
+        assert lock.acquire(timeout=10)
+        assert lock.contended == []
+        assert all(CachedMutex(lock_id).exists() for lock_id in lock_ids)
+        with pytest.raises(LockAcquireFailed):
+            CachedMutex("test_cache_5").acquire(timeout=10)
+        assert lock.acquire_or_renew(10)
+
+        # Only the owner can release the locks
+        with pytest.raises(LockReleaseFailed):
+            MultiLock(lock_ids).release()
+    assert not lock.exists()
+
+
+def test_multi_lock_partial_release(app):
+    """Tests releasing locks of which some were lost."""
+    lock = MultiLock(["test_cache_1", "test_cache_2"])
+    assert lock.acquire(timeout=10)
+    app.extensions["invenio-cache"].cache.delete("test_cache_1")
+    assert CachedMutex("test_cache_1").acquire(timeout=10)
+
+    with pytest.raises(LockReleaseFailed):
+        lock.release()
+    # The owned lock was released anyway
+    assert not CachedMutex("test_cache_2").exists()
+    assert CachedMutex("test_cache_1").exists()
+
+
+def test_multi_lock_redis(app, mocker):
+    """Tests that Redis acquires, renews and releases the locks in one script."""
+    backend = mocker.Mock(
+        spec=["_write_client", "_get_prefix", "_normalize_timeout", "serializer"]
+    )
+    backend._get_prefix.return_value = "prefix_"
+    backend._normalize_timeout.side_effect = lambda timeout: timeout
+    backend.serializer.dumps.side_effect = lambda value: b"!" + value.encode()
+    mocker.patch.object(CachedMutex, "_cache", mocker.Mock(cache=backend))
+    client = backend._write_client
+
+    lock = MultiLock(["a", "b", "c"], token="abc")
+    client.eval.return_value = [2]
+    with pytest.raises(LockAcquireFailed):
+        lock.acquire(timeout=10)
+    assert lock.contended == ["b"]
+
+    client.eval.return_value = []
+    assert lock.acquire(timeout=10)
+    assert client.eval.call_count == 2
+    script, numkeys, *args = client.eval.call_args[0]
+    assert "set" in script
+    assert numkeys == 3
+    assert args == ["prefix_a", "prefix_b", "prefix_c", b"!abc", 10]
+
+    client.eval.return_value = 3
+    assert lock._compare_and_extend(100)
+    assert "expire" in client.eval.call_args[0][0]
+    assert lock.release()
+    assert "del" in client.eval.call_args[0][0]
+
+    client.eval.return_value = 2
+    with pytest.raises(LockReleaseFailed):
+        lock.release()
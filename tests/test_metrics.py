@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Instrumentation tests."""
+
+import socket
+
+import pytest
+
+from invenio_cache import current_cache
+from invenio_cache.metrics import (
+    DURATION_BUCKETS,
+    InMemorySink,
+    InstrumentedCache,
+    PrometheusSink,
+    StatsDSink,
+)
+
+
+@pytest.fixture()
+def metrics_app(create_app):
+    """Application recording the metrics in memory."""
+    app = create_app(CACHE_METRICS_SINK="prometheus")
+    with app.app_context():
+        yield app
+
+
+def test_instrumented_cache(metrics_app):
+    """Test recording the operations of the cache."""
+    sink = metrics_app.extensions["invenio-cache"].metrics
+    assert isinstance(current_cache.cache, InstrumentedCache)
+
+    current_cache.set("jinja::1::template", "x" * 100)
+    assert current_cache.get("jinja::1::template") == "x" * 100
+    assert current_cache.get("view//records") is None
+    current_cache.set_many({"view//a": 1, "view//b": 2})
+    assert current_cache.get_many("view//a", "view//b", "view//c") == [1, 2, None]
+    assert current_cache.has("lock-id") is False
+    assert current_cache.cache.inc("view//a") == 2
+
+    metrics = sink.snapshot()
+    assert metrics["set"]["jinja::"]["calls"] == 1
+    assert metrics["get"]["jinja::"]["hits"] == 1
+    assert metrics["get"]["view/"]["misses"] == 1
+    assert metrics["get_many"]["view/"]["hits"] == 2
+    assert metrics["get_many"]["view/"]["misses"] == 1
+    assert metrics["has"][""]["misses"] == 1
+    assert metrics["inc"]["view/"]["calls"] == 1
+
+    # the sizes of the serialized payloads
+    get = metrics["get"]["jinja::"]
+    assert get["size_sum"] > 100
+    assert sum(get["sizes"]) == 1
+    assert metrics["get"]["view/"]["size_sum"] == 0
+    assert sum(get["durations"]) == 1
+    assert len(get["durations"]) == len(DURATION_BUCKETS) + 1
+
+    assert sink.hit_ratio() == 3 / 6
+    assert sink.hit_ratio("jinja::") == 1
+    assert sink.hit_ratio("other::") is None
+    sink.reset()
+    assert sink.snapshot() == {}
+
+
+def test_key_prefix(metrics_app):
+    """Test the prefixes of the keys."""
+    cache = current_cache.cache
+    assert cache.prefix("cache::jinja::1::name") == "jinja::"
+    assert cache.prefix("jinja::1::name") == "jinja::"
+    assert cache.prefix("view//records/1") == "view/"
+    assert cache.prefix("plain") == ""
+
+    # the number of prefixes is bounded
+    cache._prefixes.clear()
+    cache.max_prefixes = 2
+    assert cache.prefix("jinja::1::name") == "jinja::"
+    assert cache.prefix("1234::lock") == "1234::"
+    assert cache.prefix("5678::lock") == "other"
+    assert cache.prefix("jinja::2::name") == "jinja::"
+
+
+def test_prometheus_sink():
+    """Test rendering the metrics in the Prometheus text format."""
+    sink = PrometheusSink()
+    sink.record("get", "view/", 0.0003, hits=1, size=100)
+    sink.record("get", "view/", 2, misses=1)
+    sink.record("set", 'a"b', 0.001)
+    text = sink.render()
+    assert 'invenio_cache_operations_total{operation="get",prefix="view/"} 2' in text
+    assert 'invenio_cache_hits_total{operation="get",prefix="view/"} 1' in text
+    assert 'invenio_cache_operations_total{operation="set",prefix="a\\"b"} 1' in text
+    assert (
+        'invenio_cache_operation_duration_seconds_bucket{operation="get",'
+        'prefix="view/",le="0.0005"} 1'
+    ) in text
+    assert (
+        'invenio_cache_operation_duration_seconds_bucket{operation="get",'
+        'prefix="view/",le="+Inf"} 2'
+    ) in text
+    assert (
+        'invenio_cache_payload_bytes_bucket{operation="get",prefix="view/",'
+        'le="64"} 0'
+    ) in text
+    assert 'invenio_cache_payload_bytes_sum{operation="get",prefix="view/"} 100' in text
+    # no payload sizes were recorded for the writes
+    assert 'invenio_cache_payload_bytes_count{operation="set"' not in text
+
+
+def test_statsd_sink():
+    """Test sending the metrics to StatsD."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+    server.settimeout(1)
+    sink = StatsDSink(host="127.0.0.1", port=server.getsockname()[1])
+    sink.record("get", "jinja::", 0.0015, hits=1, size=10)
+    assert server.recv(1024).decode("utf-8").split("\n") == [
+        "invenio_cache.get.jinja.calls:1|c",
+        "invenio_cache.get.jinja.duration:1.500|ms",
+        "invenio_cache.get.jinja.hits:1|c",
+        "invenio_cache.get.jinja.payload_bytes:10|h",
+    ]
+    sink.record("delete", "", 0.001)
+    assert server.recv(1024).startswith(b"invenio_cache.delete.other.calls:1|c\n")
+
+    sink.sample_rate = 0
+    sink.record("get", "jinja::", 0.001)
+    sink.sample_rate = 0.999999
+    sink.record("get", "jinja::", 0.001)
+    assert b"|c|@0.999999" in server.recv(1024)
+    server.close()
+
+
+def test_sink_from_config(create_app):
+    """Test configuring a sink with an import path."""
+    app = create_app(CACHE_METRICS_SINK="invenio_cache.metrics.InMemorySink")
+    assert type(app.extensions["invenio-cache"].metrics) is InMemorySink
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Profiler tests."""
+
+import time
+
+import pytest
+from cachelib import SimpleCache
+
+from invenio_cache import current_cache, current_cache_ext
+from invenio_cache.cli import cache as cache_cmd
+from invenio_cache.profiler import (
+    REGISTRY_LOCK_KEY,
+    KeyProfiler,
+    LargestValues,
+    SpaceSaving,
+    read_profiles,
+    reset_profiles,
+)
+
+
+@pytest.fixture()
+def profiled_app(create_app):
+    """Application profiling all the operations."""
+    return create_app(
+        CACHE_PROFILER=True,
+        CACHE_PROFILER_SAMPLE_RATE=1,
+        CACHE_PROFILER_TOP_K=3,
+        CACHE_PROFILER_FLUSH_INTERVAL=None,
+    )
+
+
+def test_space_saving():
+    """Test counting the most frequent items in constant memory."""
+    counter = SpaceSaving(2)
+    for item in "aaaabbbc":
+        counter.add(item)
+    # "c" replaced "b", and inherited its count
+    assert counter.top() == [("a", 4, 0), ("c", 4, 3)]
+    counter.add("a", 10)
+    assert counter.top(1) == [("a", 14, 0)]
+
+
+def test_largest_values():
+    """Test keeping the largest values."""
+    largest = LargestValues(2)
+    largest.add("a", 10)
+    largest.add("b", 5)
+    largest.add("c", 1)
+    assert largest.top() == [("a", 10), ("b", 5)]
+    largest.add("c", 20)
+    largest.add("a", 1)
+    assert largest.top() == [("c", 20), ("a", 1)]
+
+
+def test_profiler():
+    """Test profiling and merging the profiles of the processes."""
+    backend = SimpleCache()
+    profiler = KeyProfiler(backend, top_k=10, sample_rate=0.5, flush_interval=None)
+    profiler.sample_rate = 1
+    profiler.record("get", ("hot",))
+    profiler.record("get", ("hot",), size=100)
+    profiler.record("get_many", ("hot", "cold"))
+    profiler.record("set", ("large",), size=1000)
+    profiler.sample_rate = 0
+    profiler.record("get", ("ignored",))
+    profiler.sample_rate = 0.5
+
+    snapshot = profiler.snapshot()
+    # estimated from the sample rate
+    assert snapshot["reads"] == [["hot", 6, 0], ["cold", 2, 0]]
+    assert snapshot["largest"] == [["large", 1000], ["hot", 100]]
+    assert snapshot["sampled"] == 4
+
+    profiler.flush()
+    other = KeyProfiler(backend, sample_rate=1, flush_interval=None)
+    other.record("get", ("cold",))
+    other.record("get", ("other",), size=2000)
+    backend.set("cache_profiler::profile::other", other.snapshot())
+    backend.set(
+        "cache_profiler::profiles",
+        dict(backend.get("cache_profiler::profiles"), other=other.started),
+    )
+
+    profiles = read_profiles(backend)
+    assert profiles["processes"] == 2
+    assert profiles["sampled"] == 6
+    assert profiles["reads"][:2] == [("hot", 6, 0), ("cold", 3, 0)]
+    assert profiles["largest"][0] == ("other", 2000)
+
+    reset_profiles(backend)
+    assert read_profiles(backend)["processes"] == 0
+    profiler.flush()
+    assert read_profiles(backend)["reads"] == []
+
+
+def test_profiler_registry():
+    """Test registering the processes under the lock of the registry."""
+
+    class Process(KeyProfiler):
+        process_id = None
+
+    backend = SimpleCache()
+    first = Process(backend, sample_rate=1, flush_interval=None)
+    first.process_id = "first"
+    second = Process(backend, sample_rate=1, flush_interval=None)
+    second.process_id = "second"
+    second.registry_lock_attempts = 1
+
+    # another process is updating the registry
+    backend.add(REGISTRY_LOCK_KEY, "other")
+    second.flush()
+    assert backend.get("cache_profiler::profile::second") is not None
+    assert read_profiles(backend)["processes"] == 0
+
+    backend.delete(REGISTRY_LOCK_KEY)
+    first.flush()
+    second.flush()
+    assert read_profiles(backend)["processes"] == 2
+    assert backend.get(REGISTRY_LOCK_KEY) is None
+
+
+def test_profiler_flusher():
+    """Test writing the profile in a background thread."""
+    backend = SimpleCache()
+    profiler = KeyProfiler(backend, sample_rate=1, flush_interval=0.01)
+    profiler.record("get", ("hot",))
+    flusher = profiler._flusher
+    assert flusher.is_alive()
+    # started once per process
+    profiler.record("get", ("hot",))
+    assert profiler._flusher is flusher
+
+    deadline = time.monotonic() + 5
+    while not read_profiles(backend)["processes"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    flusher.stop()
+    profiles = read_profiles(backend)
+    assert profiles["processes"] == 1
+    assert profiles["reads"][0][0] == "hot"
+
+
+def test_top_command(profiled_app):
+    """Test showing the profiles."""
+    runner = profiled_app.test_cli_runner()
+    result = runner.invoke(cache_cmd, ["top"])
+    assert result.exit_code == 0
+    assert "No cache profile" in result.output
+
+    with profiled_app.app_context():
+        current_cache.set("view//large", "x" * 1000)
+        for _ in range(3):
+            current_cache.get("view//hot")
+        current_cache.get_many("view//hot", "jinja::1::template")
+        current_cache_ext.profiler.flush()
+
+    result = runner.invoke(cache_cmd, ["top", "-n", "1", "--reset"])
+    assert result.exit_code == 0, result.output
+    assert "view//hot" in result.output
+    assert "jinja::1::template" not in result.output
+    assert "view//large" in result.output
+    assert "Profiles reset." in result.output
+
+    result = runner.invoke(cache_cmd, ["top"])
+    assert "No cache profile" in result.output
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of Invenio.
+# Copyright (C) 2025 CERN.
+#
+# Invenio is free software; you can redistribute it and/or modify it
+# under the terms of the MIT License; see LICENSE file for more details.
+
+"""Serializers tests."""
+
+import io
+import threading
+
+import pytest
+from cachelib.serializers import RedisSerializer
+from flask import Flask
+
+from invenio_cache import InvenioCache, current_cache
+from invenio_cache.serializers import (
+    JSONCodec,
+    PickleCodec,
+    TaggedSerializer,
+    load_serializer,
+)
+
+RECORD = {
+    "id": "abcd-1234",
+    "metadata": {
+        "title": "A record",
+        "creators": [{"name": "Doe, John", "affiliations": ["CERN"]}],
+        "publication_date": "2025-01-01",
+    },
+    "files": {"enabled": True, "count": 2, "size": 1024.5},
+    "versions": {"index": 1, "is_latest": True},
+    "parent": None,
+}
+
+
+@pytest.mark.parametrize("codec", ["pickle", "json", "msgpack"])
+def test_serializer(codec):
+    """Test serializing values with a codec."""
+    if codec == "msgpack":
+        pytest.importorskip("msgpack")
+    serializer = TaggedSerializer(codec)
+    data = serializer.dumps(RECORD)
+    assert data[:1] == serializer.codec.tag
+    assert serializer.loads(data) == RECORD
+
+    # integers are kept as plain digits
+    assert serializer.dumps(42) == b"42"
+    assert serializer.loads(b"-42") == -42
+    assert serializer.loads(None) is None
+
+    f = io.BytesIO()
+    serializer.dump(RECORD, f)
+    f.seek(0)
+    assert serializer.load(f) == RECORD
+
+
+def test_serializer_migration():
+    """Test reading values serialized in other formats."""
+    json_serializer = TaggedSerializer("json")
+    pickle_serializer = TaggedSerializer()
+
+    # values of the default Redis serializer
+    legacy = RedisSerializer().dumps(RECORD)
+    assert json_serializer.loads(legacy) == RECORD
+    assert pickle_serializer.loads(json_serializer.dumps(RECORD)) == RECORD
+    assert json_serializer.loads(b"not serialized") == b"not serialized"
+
+
+def test_serializer_fallback():
+    """Test pickling values JSON can't serialize."""
+    serializer = TaggedSerializer("json")
+    value = {1: b"bytes"}
+    data = serializer.dumps(value)
+    assert data[:1] == PickleCodec.tag
+    assert serializer.loads(data) == value
+
+    # values pickle can't serialize either
+    with pytest.raises(TypeError):
+        serializer.dumps(threading.Lock())
+
+
+def test_load_serializer():
+    """Test loading the configured serializer."""
+    assert load_serializer(None) is None
+    assert isinstance(load_serializer("json").codec, JSONCodec)
+    redis_serializer = RedisSerializer()
+    assert load_serializer(redis_serializer) is redis_serializer
+    assert isinstance(
+        load_serializer("cachelib.serializers.RedisSerializer"), RedisSerializer
+    )
+    assert isinstance(load_serializer(JSONCodec).codec, JSONCodec)
+    with pytest.raises(ImportError):
+        load_serializer("unknown")
+
+
+def test_cache_serializer():
+    """Test the serializer of the cache backend."""
+    app = Flask("testapp")
+    app.config.update(CACHE_TYPE="SimpleCache", CACHE_SERIALIZER="json")
+    InvenioCache(app)
+    with app.app_context():
+        backend = current_cache.cache
+        assert isinstance(backend.serializer.codec, JSONCodec)
+        # installed by the extension, on any Flask-Caching version
+        assert current_cache.serializer is None
+        current_cache.set("record", RECORD)
+        assert backend._cache["record"][1][:1] == JSONCodec.tag
+        assert current_cache.get("record") == RECORD
+
+        current_cache.set("counter", 1)
+        assert backend.inc("counter") == 2
+
+
+def test_two_tier_cache_serializer():
+    """Test the serializer of the L2 of the two-tier cache."""
+    app = Flask("testapp")
+    app.config.update(
+        CACHE_TYPE="invenio_cache.backends.TwoTierCache",
+        CACHE_L2_TYPE="SimpleCache",
+        CACHE_SERIALIZER="json",
+    )
+    InvenioCache(app)
+    with app.app_context():
+        assert isinstance(current_cache.cache.l2.serializer.codec, JSONCodec)